@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Compare connect-per-query against the pooled connection manager.
+
+Simulates the statement pattern of `add_leaf_record` (plant lookup, insert,
+last-leaf update) on a throwaway database and reports operations per second.
+
+    python benchmarks/bench_connection.py [--ops 2000]
+"""
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from configparser import ConfigParser
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from database import connection  # noqa: E402
+from database.migrations import apply_migrations  # noqa: E402
+from database.queries import GET_PLANT_BY_ID, ADD_LEAF_RECORD  # noqa: E402
+
+# Statement add_leaf_record used to run after each insert
+UPDATE_LAST_LEAF_DATE = '''
+    UPDATE plants
+    SET last_leaf_date = (
+        SELECT MAX(appearance_date)
+        FROM leaf_records
+        WHERE leaf_records.plant_id = plants.id)
+'''
+
+
+def _legacy_execute(config_path: Path, query: str, params=(), fetch=False):
+    """The old `_execute_query`: parse config and open a connection per call"""
+    config = ConfigParser()
+    config.read(config_path)
+    with sqlite3.connect(config['database']['path']) as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        if fetch:
+            return cursor.fetchall()
+        conn.commit()
+
+
+def run_legacy(config_path: Path, ops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(ops):
+        _legacy_execute(config_path, GET_PLANT_BY_ID, (1,), fetch=True)
+        _legacy_execute(config_path, ADD_LEAF_RECORD, (1, datetime.now().isoformat()))
+        _legacy_execute(config_path, UPDATE_LAST_LEAF_DATE)
+    return ops / (time.perf_counter() - start)
+
+
+def run_pooled(db_path: Path, ops: int) -> float:
+    manager = connection.configure(db_path)
+    start = time.perf_counter()
+    for _ in range(ops):
+        with manager.transaction() as conn:
+            conn.execute(GET_PLANT_BY_ID, (1,)).fetchall()
+            conn.execute(ADD_LEAF_RECORD, (1, datetime.now().isoformat()))
+            conn.execute(UPDATE_LAST_LEAF_DATE)
+    elapsed = time.perf_counter() - start
+    connection.close()
+    return ops / elapsed
+
+
+def _prepare(db_path: Path) -> None:
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    apply_migrations(conn)
+    conn.execute("INSERT INTO plants (name, family) VALUES ('Venus', 'Droseraceae')")
+    conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ops', type=int, default=2000, help='Operations per mode')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        legacy_db, pooled_db = tmp / 'legacy.db', tmp / 'pooled.db'
+        config_path = tmp / 'config.ini'
+        config_path.write_text(f"[database]\npath = {legacy_db}\n")
+        _prepare(legacy_db)
+        _prepare(pooled_db)
+
+        legacy = run_legacy(config_path, args.ops)
+        pooled = run_pooled(pooled_db, args.ops)
+
+    print(f"connect-per-query: {legacy:10.1f} ops/sec")
+    print(f"pooled connection: {pooled:10.1f} ops/sec ({pooled / legacy:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Compare `water` throughput with and without the `serve` daemon.
+
+Each mode records `--calls` waterings, spread over the collection:
+a new main.py process per call (how scanners ran it), a new client.py
+process per call forwarding to the daemon, and `forward()` called in this
+process, which leaves only the daemon's own cost per command.
+
+    python benchmarks/bench_daemon.py [--calls 10000] [--concurrency 4] [--plants 1000]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(SRC))
+
+from bench_search import populate  # noqa: E402
+from bench_startup import CONFIG  # noqa: E402
+from cli.daemon import forward  # noqa: E402
+from database import connection  # noqa: E402
+from database import db_operations as db  # noqa: E402
+
+
+def run_processes(script: str, calls: int, plants: int, concurrency: int, cwd: str) -> tuple:
+    """Start one process per call; return (seconds, failed calls)"""
+    def call(i: int) -> int:
+        command = [sys.executable, str(SRC / script), 'water', '--id', str(i % plants + 1)]
+        return subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL).returncode
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        failed = sum(1 for status in pool.map(call, range(calls)) if status)
+    return time.perf_counter() - start, failed
+
+
+def run_forwarded(calls: int, plants: int) -> tuple:
+    """Forward every call from this process; return (seconds, failed calls)"""
+    failed = 0
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for i in range(calls):
+            if forward(['water', '--id', str(i % plants + 1)]) != 0:
+                failed += 1
+    return time.perf_counter() - start, failed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=10000, help='Waterings per mode')
+    parser.add_argument('--concurrency', type=int, default=4, help='Processes started in parallel')
+    parser.add_argument('--plants', type=int, default=1000, help='Number of plants')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / 'config.ini').write_text(CONFIG)
+        (Path(tmp) / 'data').mkdir()
+        connection.configure(Path(tmp) / 'data' / 'plants.db')
+        db.init_db()
+        populate(args.plants)
+        connection.close()
+
+        results = {'process per call': run_processes('main.py', args.calls, args.plants, args.concurrency, tmp)}
+        daemon = subprocess.Popen([sys.executable, str(SRC / 'main.py'), 'serve'],
+                                  cwd=tmp, stdout=subprocess.PIPE, text=True)
+        try:
+            daemon.stdout.readline()  # Serving ... once the socket is bound
+            results['client + daemon'] = run_processes('client.py', args.calls, args.plants,
+                                                       args.concurrency, tmp)
+            os.chdir(tmp)
+            results['forward() only'] = run_forwarded(args.calls, args.plants)
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+    print(f"{args.calls} water calls, {args.concurrency} processes in parallel")
+    baseline = args.calls / results['process per call'][0]
+    for mode, (seconds, failed) in results.items():
+        rate = args.calls / seconds
+        print(f"{mode:17} {rate:9.0f} calls/s ({rate / baseline:5.1f}x)  {failed} failed")
+    return 1 if any(failed for _, failed in results.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
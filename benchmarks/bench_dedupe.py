@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Measure the space content-hash image deduplication saves.
+
+Builds a collection of `--plants` plants sharing `--photos` stock photos
+the way ingestion used to store them (one copy per plant), runs
+`dedupe_images` over it and reports the image bytes removed and the
+database size before and after. Then imports the same plants into a fresh
+database through `add_plants`, which stores each photo once, and checks
+both end with one image row per distinct photo.
+
+    python benchmarks/bench_dedupe.py [--plants 2000] [--photos 20]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from bench_image_derivatives import photo  # noqa: E402
+from bench_search import FAMILIES, GENERA  # noqa: E402
+from database import connection  # noqa: E402
+from database import db_operations as db  # noqa: E402
+from database.queries import GET_DATABASE_SIZE, INSERT_IMAGE, INSERT_PLANT  # noqa: E402
+from models.plant import Plant  # noqa: E402
+
+IMAGE_ROWS = 'SELECT COUNT(*) AS images, SUM(ref_count) AS refs FROM images'
+MIB = 2 ** 20
+
+
+def plants(count: int, photos: list) -> list:
+    return [
+        (Plant(f"{GENERA[i % len(GENERA)]} {i}", FAMILIES[i % len(FAMILIES)], image_mime_type='image/jpeg'),
+         photos[i % len(photos)], None)
+        for i in range(count)
+    ]
+
+
+def store_copies(rows: list) -> None:
+    """One image row per plant, as add_plant stored them before deduplication"""
+    with db.transaction(immediate=True) as conn:
+        for plant, data, _ in rows:
+            content_hash = db._content_hash(data)
+            image = db.StoredImage(conn.execute(INSERT_IMAGE, (data, len(data), content_hash)).lastrowid,
+                                   len(data), content_hash)
+            conn.execute(INSERT_PLANT, db._plant_params(plant, image))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plants', type=int, default=2000, help='Plants with a photo')
+    parser.add_argument('--photos', type=int, default=20, help='Distinct stock photos they share')
+    args = parser.parse_args()
+
+    photos = [photo(i) for i in range(args.photos)]
+    rows = plants(args.plants, photos)
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.configure(Path(tmp) / 'copies.db')
+        db.init_db()
+        store_copies(rows)
+        start = time.perf_counter()
+        result = db.dedupe_images()
+        dedupe_s = time.perf_counter() - start
+        deduped = db._execute_query(IMAGE_ROWS, fetch=True)[0]
+
+        connection.configure(Path(tmp) / 'shared.db')
+        db.init_db()
+        start = time.perf_counter()
+        db.add_plants(rows)
+        ingest_s = time.perf_counter() - start
+        ingested = db._execute_query(IMAGE_ROWS, fetch=True)[0]
+        ingested_size = db._execute_query(GET_DATABASE_SIZE, fetch=True)[0].bytes
+        connection.close()
+
+    print(f"{args.plants} plants sharing {args.photos} photos "
+          f"({sum(map(len, photos)) / len(photos) / 1024:.0f} KiB each)")
+    print(f"dedupe-images: removed {result.duplicates} copies, {result.bytes_saved / MIB:.1f} MiB of image data, "
+          f"in {dedupe_s:.2f}s")
+    print(f"  database {result.size_before / MIB:.1f} MiB -> {result.size_after / MIB:.1f} MiB "
+          f"({result.size_after / result.size_before:.1%} of before)")
+    print(f"deduplicated ingest: {ingested_size / MIB:.1f} MiB after add_plants in {ingest_s:.2f}s")
+    ok = (deduped.images, deduped.refs) == (ingested.images, ingested.refs) == (args.photos, args.plants)
+    print(f"one image row per photo, referenced by every plant: {ok}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Time typo-tolerant search on a large collection.
+
+Uses the same synthetic catalogue as bench_search.py and reports the median
+latency and best match of `fuzzy_search_plants` for misspelled queries.
+
+    python benchmarks/bench_fuzzy_search.py [--plants 100000] [--repeat 20]
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from bench_search import populate, median_ms  # noqa: E402
+from database import connection  # noqa: E402
+from database import db_operations as db  # noqa: E402
+from database.queries import PLANT_LABEL_FIELDS  # noqa: E402
+
+TYPOS = ['Drosseraceae', 'Nepentaceae', 'Sarracenaceae', 'Heliamfora', 'Utriculria', 'red dargon']
+
+
+def fuzzy_search(query: str) -> list:
+    return db.fuzzy_search_plants(query, PLANT_LABEL_FIELDS, limit=10).plants
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plants', type=int, default=100000, help='Number of plants')
+    parser.add_argument('--repeat', type=int, default=20, help='Runs per query')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.configure(Path(tmp) / 'plants.db')
+        db.init_db()
+        populate(args.plants)
+        # The first fuzzy search builds the vocabulary trigram index
+        fuzzy_search(TYPOS[0])
+
+        print(f"{args.plants} plants, median of {args.repeat} runs, budget {db.FUZZY_BUDGET_MS} ms")
+        print(f"{'query':16} {'ms':>8}  best match")
+        for query in TYPOS:
+            elapsed = median_ms(fuzzy_search, query, args.repeat)
+            results = fuzzy_search(query)
+            best = f"{results[0].name} ({results[0].family})" if results else '-'
+            print(f"{query:16} {elapsed:8.2f}  {best}")
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
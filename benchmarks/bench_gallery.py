@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Scroll a headless gallery through a large collection and count what gets loaded.
+
+Stores `--plants` plants, one in `--image-every` with a photo, opens a
+Gallery over all of them and scrolls it from top to bottom one screen of
+`--visible` cells every `--frame-ms`, polling like the window does. Prints
+how long the first screen took to fill, how many thumbnails were loaded
+(versus every plant with a photo, which loading them all up front would
+cost) and checks the thumbnail cache stayed within its bound.
+
+    python benchmarks/bench_gallery.py [--plants 10000] [--image-every 4] [--visible 30] [--frame-ms 5]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from bench_image_derivatives import photo  # noqa: E402
+from bench_search import FAMILIES, GENERA  # noqa: E402
+from database import connection  # noqa: E402
+from database import db_operations as db  # noqa: E402
+from models.plant import Plant  # noqa: E402
+from utils.gallery import Gallery, gallery_plants, load_thumbnail  # noqa: E402
+from utils.image_handler import ImageHandler, ImageSettings  # noqa: E402
+
+PHOTOS = 16
+
+
+def populate(plants: int, image_every: int) -> None:
+    """Plants with a few photos repeated, stored with their renditions like add-plant does"""
+    handler = ImageHandler(ImageSettings())
+    images = []
+    for i in range(PHOTOS):
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as f:
+            f.write(photo(i))
+            f.flush()
+            images.append(handler.process_image(f.name))
+    rows = []
+    for i in range(plants):
+        image = images[i % PHOTOS] if i % image_every == 0 else None
+        plant = Plant(f"{GENERA[i % len(GENERA)]} {i}", FAMILIES[i % len(FAMILIES)],
+                      image_mime_type=image.mime_type if image else None)
+        rows.append((plant, image.data if image else None, image.derivatives if image else None))
+    for start in range(0, plants, 1000):
+        db.add_plants(rows[start:start + 1000])
+
+
+def show(gallery: Gallery, first: int, last: int) -> None:
+    """Show cells first..last-1 and wait until their thumbnails are in"""
+    gallery.set_visible(first, last)
+    while any(gallery.is_loading(i) for i in range(first, last)):
+        gallery.poll()
+        time.sleep(0.001)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plants', type=int, default=10000, help='Plants in the collection')
+    parser.add_argument('--image-every', type=int, default=4, help='One plant in N has a photo')
+    parser.add_argument('--visible', type=int, default=30, help='Cells on one screen')
+    parser.add_argument('--frame-ms', type=float, default=5, help='Time between screens while scrolling')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.configure(Path(tmp) / 'plants.db')
+        db.init_db()
+        populate(args.plants, args.image_every)
+
+        start = time.perf_counter()
+        plants = gallery_plants()
+        loaded_ms = (time.perf_counter() - start) * 1000
+        gallery = Gallery(plants, load_thumbnail)
+
+        start = time.perf_counter()
+        show(gallery, 0, args.visible)
+        first_screen_ms = (time.perf_counter() - start) * 1000
+
+        largest_cache = 0
+        start = time.perf_counter()
+        for first in range(0, len(plants), args.visible):
+            gallery.set_visible(first, first + args.visible)
+            time.sleep(args.frame_ms / 1000)
+            gallery.poll()
+            largest_cache = max(largest_cache, len(gallery.cache))
+        last = max(0, len(plants) - args.visible)
+        show(gallery, last, len(plants))
+        scroll_s = time.perf_counter() - start
+        gallery.close()
+        connection.close()
+
+    with_image = sum(plants.has_image)
+    print(f"{len(plants)} plants, {with_image} with a photo, {args.visible} cells per screen")
+    print(f"plant list loaded in {loaded_ms:.0f} ms, first screen of thumbnails in {first_screen_ms:.0f} ms")
+    print(f"scrolled to the bottom in {scroll_s:.2f}s ({args.frame_ms:g} ms per screen), "
+          f"{gallery.loader.loaded} thumbnails loaded of {with_image} ({gallery.loader.loaded / with_image:.1%})")
+    bounded = largest_cache <= gallery.cache.maxsize
+    print(f"thumbnail cache peaked at {largest_cache} entries (limit {gallery.cache.maxsize}): "
+          f"{'ok' if bounded else 'OVER'}")
+    return 0 if bounded else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
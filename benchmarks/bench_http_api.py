@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Load-test the `serve-http` API and report p50/p99 latency per endpoint.
+
+Starts the server on a temporary collection, then runs `--clients`
+concurrent keep-alive connections. Each sends `--requests` requests drawn
+from a mix of list pages, searches, leaf statistics, waterings, leaf
+records and image fetches (half of them revalidating with If-None-Match).
+Exits 1 if any request fails.
+
+    python benchmarks/bench_http_api.py [--clients 16] [--requests 200] [--plants 10000] [--workers 4]
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(SRC))
+
+from bench_search import QUERIES, populate  # noqa: E402
+from bench_startup import CONFIG  # noqa: E402
+from database import connection  # noqa: E402
+from database import db_operations as db  # noqa: E402
+
+ADD_IMAGES = '''
+    UPDATE plants
+    SET image_id = ?, has_image = 1, image_size = ?, image_mime_type = 'image/jpeg'
+    WHERE id % 10 = 0
+'''
+
+
+class Client:
+    """Minimal HTTP/1.1 client over one keep-alive connection"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.etags = {}
+
+    async def request(self, method: str, path: str, body: dict = None, headers: dict = None) -> tuple:
+        data = json.dumps(body).encode() if body is not None else b''
+        head = [f"{method} {path} HTTP/1.1", "Host: localhost", f"Content-Length: {len(data)}"]
+        head.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        self.writer.write(('\r\n'.join(head) + '\r\n\r\n').encode() + data)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        response_headers = {}
+        while (line := await self.reader.readline()) not in (b'\r\n', b''):
+            name, _, value = line.decode().partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get('transfer-encoding') == 'chunked':
+            chunks = []
+            while size := int(await self.reader.readline(), 16):
+                chunks.append(await self.reader.readexactly(size + 2))
+            await self.reader.readline()
+            payload = b''.join(chunk[:-2] for chunk in chunks)
+        else:
+            payload = await self.reader.readexactly(int(response_headers.get('content-length', 0)))
+        return status, response_headers, payload
+
+
+async def image(client: Client, plant_id: int) -> int:
+    path = f"/plants/{plant_id}/image"
+    headers = {'If-None-Match': client.etags[path]} if path in client.etags and random.random() < 0.5 else {}
+    status, response_headers, _ = await client.request('GET', path, headers=headers)
+    if 'etag' in response_headers:
+        client.etags[path] = response_headers['etag']
+    return status
+
+
+def workload(plants: int) -> list:
+    """(name, weight, request coroutine factory) of each endpoint in the mix"""
+    def plant_id() -> int:
+        return random.randint(1, plants)
+
+    async def call(client, method, path, body=None):
+        return (await client.request(method, path, body))[0]
+
+    return [
+        ('list page', 2, lambda c: call(c, 'GET', f"/plants?after_id={plant_id()}&limit=50")),
+        ('search', 2, lambda c: call(c, 'GET', f"/plants/search?q={random.choice(QUERIES).replace(' ', '+')}&limit=20")),
+        ('leaf-stats', 2, lambda c: call(c, 'GET', f"/plants/{plant_id()}/leaf-stats")),
+        ('water', 2, lambda c: call(c, 'POST', f"/plants/{plant_id()}/water")),
+        ('add-leaf', 1, lambda c: call(c, 'POST', f"/plants/{plant_id()}/leaves", {})),
+        ('image', 2, lambda c: image(c, random.randint(1, plants // 10) * 10)),
+    ]
+
+
+async def run_client(port: int, requests: int, mix: list, latencies: dict) -> int:
+    client = Client(*await asyncio.open_connection('127.0.0.1', port))
+    names, weights = [name for name, _, _ in mix], [weight for _, weight, _ in mix]
+    calls = {name: factory for name, _, factory in mix}
+    failed = 0
+    for _ in range(requests):
+        name = random.choices(names, weights)[0]
+        start = time.perf_counter()
+        status = await calls[name](client)
+        latencies[name].append((time.perf_counter() - start) * 1000)
+        if status not in (200, 201, 304):
+            failed += 1
+    client.writer.close()
+    return failed
+
+
+async def load_test(port: int, clients: int, requests: int, plants: int) -> tuple:
+    latencies = defaultdict(list)
+    mix = workload(plants)
+    start = time.perf_counter()
+    failed = await asyncio.gather(*(run_client(port, requests, mix, latencies) for _ in range(clients)))
+    return time.perf_counter() - start, latencies, sum(failed)
+
+
+async def stream_all(port: int) -> tuple:
+    client = Client(*await asyncio.open_connection('127.0.0.1', port))
+    start = time.perf_counter()
+    status, _, payload = await client.request('GET', '/plants')
+    elapsed = time.perf_counter() - start
+    client.writer.close()
+    return elapsed, len(json.loads(payload)) if status == 200 else None
+
+
+def percentiles(samples: list) -> tuple:
+    if len(samples) < 2:
+        return samples[0], samples[0]
+    cuts = statistics.quantiles(samples, n=100)
+    return cuts[49], cuts[98]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent connections')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per connection')
+    parser.add_argument('--plants', type=int, default=10000, help='Number of plants')
+    parser.add_argument('--workers', type=int, default=4, help='Server database worker threads')
+    args = parser.parse_args()
+    random.seed(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / 'config.ini').write_text(CONFIG)
+        (Path(tmp) / 'data').mkdir()
+        connection.configure(Path(tmp) / 'data' / 'plants.db')
+        db.init_db()
+        populate(args.plants)
+        image = bytes(random.getrandbits(8) for _ in range(64 * 1024))
+        with db.transaction() as conn:
+            image_id = conn.execute("INSERT INTO images (data, size) VALUES (?, ?)", (image, len(image))).lastrowid
+            conn.execute(ADD_IMAGES, (image_id, len(image)))
+        connection.close()
+
+        server = subprocess.Popen(
+            [sys.executable, str(SRC / 'main.py'), 'serve-http', '--port', '0', '--workers', str(args.workers)],
+            cwd=tmp, stdout=subprocess.PIPE, text=True,
+        )
+        try:
+            port = int(server.stdout.readline().split(':')[-1].split()[0])
+            elapsed, latencies, failed = asyncio.run(load_test(port, args.clients, args.requests, args.plants))
+            stream_s, streamed = asyncio.run(stream_all(port))
+        finally:
+            server.terminate()
+            server.wait()
+
+    total = sum(len(samples) for samples in latencies.values())
+    print(f"{total} requests from {args.clients} clients, {args.workers} workers, {args.plants} plants: "
+          f"{total / elapsed:.0f} req/s, {failed} failed")
+    print(f"{'endpoint':12} {'requests':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, samples in sorted(latencies.items()):
+        p50, p99 = percentiles(samples)
+        print(f"{name:12} {len(samples):8} {p50:8.2f} {p99:8.2f}")
+    p50, p99 = percentiles([sample for samples in latencies.values() for sample in samples])
+    print(f"{'all':12} {total:8} {p50:8.2f} {p99:8.2f}")
+    print(f"streamed {streamed} plants from GET /plants in {stream_s * 1000:.0f} ms")
+    return 1 if failed or streamed != args.plants else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
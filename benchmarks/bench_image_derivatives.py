@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Time serving plant images at thumbnail sizes with and without cached derivatives.
+
+Stores `--plants` distinct 800px photos without derivatives, then for each
+`--sizes` entry times three ways to get a thumbnail: decoding the original
+and resizing it on every request (as the viewer did), the first
+`get_plant_image(id, size)` (renders and caches the derivative) and the
+second one (reads the cached derivative). Finally lowers the cache limit,
+renders one more size for every plant and checks eviction keeps the
+derivatives under the limit.
+
+    python benchmarks/bench_image_derivatives.py [--plants 200] [--sizes 64 256] [--cache-mb 1]
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from PIL import Image  # noqa: E402
+from database import connection  # noqa: E402
+from database import db_operations as db  # noqa: E402
+from database.queries import GET_DERIVATIVE_CACHE_BYTES  # noqa: E402
+from models.plant import Plant  # noqa: E402
+from utils.image_handler import ImageSettings  # noqa: E402
+
+
+def photo(seed: int) -> bytes:
+    """A distinct 800x533 JPEG, the size ingestion stores"""
+    texture = Image.effect_noise((80, 54), 30 + seed % 50).resize((800, 533), Image.Resampling.BICUBIC)
+    gradient = Image.linear_gradient('L').resize((800, 533))
+    image = Image.merge('RGB', [texture, gradient, Image.new('L', (800, 533), seed % 256)])
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', quality=85)
+    return buffer.getvalue()
+
+
+def resize_per_view(plant_id: int, size: int) -> bytes:
+    """Thumbnail without the cache: decode the original on every request"""
+    image = db.get_plant_image(plant_id)
+    with Image.open(BytesIO(image.data)) as img:
+        img.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        img.save(buffer, format='JPEG', quality=85, optimize=True)
+        return buffer.getvalue()
+
+
+def median_ms(fetch, plant_ids: list, size: int) -> float:
+    timings = []
+    for plant_id in plant_ids:
+        start = time.perf_counter()
+        fetch(plant_id, size)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plants', type=int, default=200, help='Plants with a photo')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[64, 256], help='Thumbnail sizes requested')
+    parser.add_argument('--cache-mb', type=int, default=1, help='Cache limit for the eviction check')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.configure(Path(tmp) / 'plants.db')
+        db.init_db()
+        db._image_handler().settings = ImageSettings()
+        plant_ids = db.add_plants([
+            (Plant(f"Plant {i}", 'Droseraceae', image_mime_type='image/jpeg'), photo(i), None)
+            for i in range(args.plants)
+        ])
+
+        print(f"{args.plants} plants with 800px photos")
+        print(f"{'size':>5} {'resize per view':>16} {'first (renders)':>16} {'cached':>8}")
+        for size in args.sizes:
+            per_view = median_ms(resize_per_view, plant_ids, size)
+            first = median_ms(db.get_plant_image, plant_ids, size)
+            cached = median_ms(db.get_plant_image, plant_ids, size)
+            print(f"{size:5} {per_view:13.2f} ms {first:13.2f} ms {cached:5.2f} ms ({per_view / cached:.0f}x)")
+
+        with db.transaction() as conn:
+            before = conn.execute(GET_DERIVATIVE_CACHE_BYTES).fetchone()[0]
+        # A new, smaller size, so every plant stores one more derivative
+        db._image_handler().settings = ImageSettings(derivative_sizes=(32,), derivative_cache_mb=args.cache_mb)
+        for plant_id in plant_ids:
+            db.get_plant_image(plant_id, 32)
+        with db.transaction() as conn:
+            after = conn.execute(GET_DERIVATIVE_CACHE_BYTES).fetchone()[0]
+        connection.close()
+
+    limit = args.cache_mb * 2 ** 20
+    print(f"derivative cache: {before / 2 ** 20:.1f} MiB before, {after / 2 ** 20:.1f} MiB after rendering "
+          f"{args.plants} more (32px) with a {args.cache_mb} MiB limit")
+    return 0 if after <= limit else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
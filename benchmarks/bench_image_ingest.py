@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Compare the former full-decode `read_image` with the draft-decoding pipeline.
+
+Writes a corpus of synthetic phone-sized JPEGs (24 MP by default, some with
+an EXIF orientation), then processes it with each pipeline in a fresh
+process, so peak RSS is measured per pipeline. Prints the per-image latency
+and peak RSS, and checks both pipelines produce same-sized, upright images.
+
+    python benchmarks/bench_image_ingest.py [--images 12] [--width 6000] [--height 4000]
+"""
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from PIL import Image, ExifTags, ImageChops  # noqa: E402
+from utils.image_handler import ImageHandler, ImageSettings  # noqa: E402
+
+# Orientations the former pipeline handled (it ignored the mirrored ones)
+ORIENTATIONS = [1, 6, 1, 3, 1, 8]
+
+
+def legacy_read_image(image_path: str) -> bytes:
+    """`ImageHandler.read_image` before draft decoding"""
+    with Image.open(image_path) as img:
+        img = legacy_fix_orientation(img)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        img.thumbnail((800, 800), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        img.save(buffer, format='JPEG', quality=85, optimize=True)
+        return buffer.getvalue()
+
+
+def legacy_fix_orientation(img: Image.Image) -> Image.Image:
+    exif = img._getexif()
+    if not exif:
+        return img
+    for orientation in ExifTags.TAGS.keys():
+        if ExifTags.TAGS[orientation] == 'Orientation':
+            break
+    rotation = {3: 180, 6: 270, 8: 90}.get(exif.get(orientation))
+    return img.rotate(rotation, expand=True) if rotation else img
+
+
+def draft_read_image(image_path: str) -> bytes:
+    return ImageHandler(ImageSettings()).process_image(image_path).data
+
+
+PIPELINES = {'full decode': legacy_read_image, 'draft decode': draft_read_image}
+
+
+def write_corpus(directory: Path, images: int, width: int, height: int) -> list:
+    """Smooth synthetic photos, so they compress like real ones rather than like noise"""
+    paths = []
+    for i in range(images):
+        texture = Image.merge('RGB', [
+            Image.effect_noise((width // 10, height // 10), 60 + 10 * channel).resize((width, height),
+                                                                                         Image.Resampling.BICUBIC)
+            for channel in range(3)
+        ])
+        gradient = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+        photo = Image.blend(texture, gradient, 0.3 + 0.05 * (i % 5))
+        exif = Image.Exif()
+        exif[ExifTags.Base.Orientation] = ORIENTATIONS[i % len(ORIENTATIONS)]
+        path = directory / f"photo_{i}.jpg"
+        photo.save(path, quality=92, exif=exif)
+        paths.append(str(path))
+    return paths
+
+
+def peak_rss_mib() -> float:
+    """Peak RSS of this process
+
+    VmHWM, where there is /proc: ru_maxrss survives exec, so a child would
+    report the peak of the process that spawned it.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_pipeline(name: str, paths: list, output_dir: Path) -> dict:
+    """Process the corpus in this process; returns latencies and peak RSS"""
+    read_image = PIPELINES[name]
+    baseline_mib = peak_rss_mib()
+    latencies = []
+    for i, path in enumerate(paths):
+        start = time.perf_counter()
+        data = read_image(path)
+        latencies.append((time.perf_counter() - start) * 1000)
+        (output_dir / f"{i}.jpg").write_bytes(data)
+    return {
+        'latencies': latencies,
+        'baseline_mib': baseline_mib,
+        'peak_mib': peak_rss_mib(),
+    }
+
+
+def compare(tmp: Path, count: int) -> tuple:
+    """(outputs with equal sizes, largest mean per-pixel difference) between the pipelines"""
+    same_size, worst = 0, 0.0
+    for i in range(count):
+        with Image.open(tmp / 'full decode' / f"{i}.jpg") as full, \
+                Image.open(tmp / 'draft decode' / f"{i}.jpg") as draft:
+            if full.size != draft.size:
+                continue
+            same_size += 1
+            diff = ImageChops.difference(full, draft).convert('L')
+            worst = max(worst, statistics.fmean(diff.getdata()))
+    return same_size, worst
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--images', type=int, default=12, help='Photos in the corpus')
+    parser.add_argument('--width', type=int, default=6000, help='Photo width in pixels')
+    parser.add_argument('--height', type=int, default=4000, help='Photo height in pixels')
+    parser.add_argument('--run', nargs=2, metavar=('PIPELINE', 'CORPUS_DIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        name, corpus = args.run
+        paths = sorted(map(str, Path(corpus).glob('photo_*.jpg')), key=lambda p: int(Path(p).stem.split('_')[1]))
+        output_dir = Path(corpus) / name
+        output_dir.mkdir()
+        print(json.dumps(run_pipeline(name, paths, output_dir)))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_corpus(Path(tmp), args.images, args.width, args.height)
+        results = {
+            name: json.loads(subprocess.run([sys.executable, __file__, '--run', name, tmp],
+                                            check=True, capture_output=True, text=True).stdout)
+            for name in PIPELINES
+        }
+        same_size, worst = compare(Path(tmp), len(paths))
+
+    megapixels = args.width * args.height / 1e6
+    print(f"{args.images} synthetic {megapixels:.0f} MP JPEGs, {args.width}x{args.height}")
+    print(f"{'pipeline':14} {'median ms':>10} {'max ms':>8} {'peak RSS MiB':>13} {'(+ over start)':>15}")
+    for name, result in results.items():
+        latencies = result['latencies']
+        print(f"{name:14} {statistics.median(latencies):10.0f} {max(latencies):8.0f} "
+              f"{result['peak_mib']:13.0f} {result['peak_mib'] - result['baseline_mib']:+15.0f}")
+    speedup = statistics.median(results['full decode']['latencies']) / \
+        statistics.median(results['draft decode']['latencies'])
+    print(f"draft decoding is {speedup:.1f}x faster per image")
+    print(f"same output size: {same_size}/{len(paths)}, mean pixel difference at most {worst:.1f}/255")
+    return 0 if same_size == len(paths) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
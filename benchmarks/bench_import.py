@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Compare `import-plants` with adding the same plants one `add-plant` at a time.
+
+Writes a CSV manifest of `--plants` plants, one in `--image-every` with a
+photo, into a temporary collection. The one-by-one run does what each
+`add-plant` does in-process (read the image, insert and commit, render the
+QR code), so it leaves out the per-run interpreter start-up. The import run
+is `PlantImporter` with `--workers` processes. Exits 1 if the two end up
+with different rows.
+
+    python benchmarks/bench_import.py [--plants 2000] [--image-every 10] [--workers 4]
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from bench_search import CULTIVARS, FAMILIES, GENERA  # noqa: E402
+from database import connection  # noqa: E402
+from database import db_operations as db  # noqa: E402
+from models.plant import Plant  # noqa: E402
+from utils.image_handler import ImageHandler  # noqa: E402
+from utils.plant_import import PlantImporter, parse_row, read_manifest  # noqa: E402
+
+PLANT_ROWS = 'SELECT name, family, has_image, image_size, birthdate FROM plants ORDER BY id'
+PHOTOS = 8
+
+
+def write_manifest(directory: Path, plants: int, image_every: int) -> Path:
+    from PIL import Image
+    rng = random.Random(42)
+    for i in range(PHOTOS):
+        # Phone-sized photos, so every one is resized
+        Image.effect_noise((3000, 2000), 40 + i).convert('RGB').save(directory / f"photo_{i}.jpg", quality=90)
+
+    manifest = directory / 'shipment.csv'
+    with open(manifest, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['name', 'family', 'image', 'birthdate'])
+        for i in range(plants):
+            image = f"photo_{i % PHOTOS}.jpg" if i % image_every == 0 else ''
+            writer.writerow([f"{rng.choice(GENERA)} {rng.choice(CULTIVARS)} {i}", rng.choice(FAMILIES), image,
+                             f"20{rng.randint(15, 24)}-{rng.randint(1, 12):02}-{rng.randint(1, 28):02}"])
+    return manifest
+
+
+def one_by_one(manifest: Path) -> None:
+    handler = ImageHandler()
+    for line, record in read_manifest(manifest):
+        row = parse_row(line, record, manifest.parent)
+        image = handler.read_image(str(row.image)) if row.image else None
+        plant = Plant(row.name, row.family, birthdate=row.birthdate,
+                      image_mime_type=image.mime_type if image else None)
+        db.add_plant(plant, image.data if image else None, image.derivatives if image else None)
+
+
+def timed_run(directory: Path, name: str, run) -> tuple:
+    """Run an import into a fresh database; returns (seconds, rows)"""
+    (directory / name / 'data' / 'qr_codes').mkdir(parents=True)
+    os.chdir(directory / name)
+    connection.configure(Path('data') / 'plants.db')
+    db.init_db()
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    rows = db._execute_query(PLANT_ROWS, fetch=True)
+    connection.close()
+    return elapsed, rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plants', type=int, default=2000, help='Plants in the manifest')
+    parser.add_argument('--image-every', type=int, default=10, help='One plant in N has a photo')
+    parser.add_argument('--workers', type=int, default=4, help='Import worker processes')
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = write_manifest(Path(tmp), args.plants, args.image_every)
+        serial_s, serial_rows = timed_run(Path(tmp), 'serial', lambda: one_by_one(manifest))
+        result = None
+
+        def bulk():
+            nonlocal result
+            result = PlantImporter(workers=args.workers).run(manifest)
+        import_s, import_rows = timed_run(Path(tmp), 'import', bulk)
+        os.chdir(cwd)
+
+    images = len(range(0, args.plants, args.image_every))
+    print(f"{args.plants} plants, {images} with a photo, {args.workers} workers")
+    print(f"one add-plant at a time: {serial_s:7.2f}s ({args.plants / serial_s:7.0f} rows/s)")
+    print(f"import-plants:           {import_s:7.2f}s ({args.plants / import_s:7.0f} rows/s, "
+          f"{serial_s / import_s:.1f}x)")
+    print(f"  of which inserting:    {result.seconds:7.2f}s, QR codes: {result.qr_seconds:.2f}s")
+    same = serial_rows == import_rows and not result.failed
+    print(f"identical rows: {same}")
+    return 0 if same else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Compare the leaf statistics export with the original per-plant path.
+
+Fills a throwaway database with random leaf records, exports with the old
+N+1 approach (load every plant's records and run
+`Plant.calculate_leaf_statistics`) and with `export_leaf_data`, checks that
+both CSV files are identical and reports the timings. This also verifies
+the leaf totals maintained by the leaf_records triggers.
+
+    python benchmarks/bench_leaf_export.py [--plants 10000] [--records 1000000]
+"""
+import argparse
+import csv
+import filecmp
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from database import connection  # noqa: E402
+from database import db_operations as db  # noqa: E402
+from database.queries import GET_LEAF_RECORDS  # noqa: E402
+from models.plant import Plant  # noqa: E402
+
+
+def populate(plants: int, records: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    with db.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO plants (name, family) VALUES (?, ?)",
+            ((f"Plant {i}", f"Family {rng.randrange(300)}") for i in range(plants))
+        )
+        # Mix midnight dates (add-leaf --date) with timestamps carrying microseconds
+        def appearance():
+            moment = start + timedelta(seconds=rng.randrange(4 * 365 * 86400))
+            if rng.random() < 0.3:
+                return moment.replace(hour=0, minute=0, second=0).isoformat()
+            return moment.replace(microsecond=rng.randrange(1000000)).isoformat()
+
+        # Leave roughly one plant in ten without leaves. Records arrive in
+        # date order, as they do in practice, followed by a few back-dated ones.
+        leafy = range(1, plants + 1 - plants // 10)
+        backdated = min(50, records // 100)
+        rows = sorted(((rng.choice(leafy), appearance()) for _ in range(records - backdated)),
+                      key=lambda row: row[1])
+        rows += [(rng.choice(leafy), appearance()) for _ in range(backdated)]
+        conn.executemany(
+            "INSERT INTO leaf_records (plant_id, appearance_date) VALUES (?, ?)",
+            rows
+        )
+
+
+def leaf_statistics_per_plant(plant_id: int) -> dict:
+    """The original `get_leaf_statistics`: load and sort every record in Python"""
+    records = db._execute_query(GET_LEAF_RECORDS, (plant_id,), fetch=True)
+    plant = Plant(name='', family='', leaf_records=[datetime.fromisoformat(row[0]) for row in records])
+    return plant.calculate_leaf_statistics()
+
+
+def export_per_plant(filename: str) -> None:
+    """The original implementation: one statistics lookup per plant"""
+    plants = db._execute_query("SELECT id, name FROM plants ORDER BY family, id", fetch=True)
+    with open(filename, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow([
+            'Plant ID', 'Name', 'Total Leaves', 'Avg Days Between Leaves',
+            'Days Since Last Leaf'
+        ])
+        for plant in plants:
+            stats = leaf_statistics_per_plant(plant.id)
+            writer.writerow([
+                plant.id, plant.name, stats['total_leaves'],
+                round(stats['avg_days_between_leaves'], 1) if stats['avg_days_between_leaves'] else None,
+                stats['days_since_last_leaf']
+            ])
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plants', type=int, default=10000, help='Number of plants')
+    parser.add_argument('--records', type=int, default=1000000, help='Number of leaf records')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        connection.configure(tmp / 'plants.db')
+        db.init_db()
+        populate(args.plants, args.records)
+
+        legacy_csv, set_based_csv = tmp / 'per_plant.csv', tmp / 'set_based.csv'
+        legacy = timed(export_per_plant, str(legacy_csv))
+        set_based = timed(db.export_leaf_data, str(set_based_csv))
+        identical = filecmp.cmp(legacy_csv, set_based_csv, shallow=False)
+        connection.close()
+
+    print(f"{args.plants} plants, {args.records} leaf records")
+    print(f"per-plant queries: {legacy * 1000:9.1f} ms")
+    print(f"single SQL pass:   {set_based * 1000:9.1f} ms ({legacy / set_based:.1f}x)")
+    print(f"identical output:  {identical}")
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
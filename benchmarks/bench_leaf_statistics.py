@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Compare per-plant leaf statistics with the vectorized NumPy engine.
+
+The per-plant path is the one export used to take: fetch each plant's leaf
+dates, parse them and call `Plant.calculate_leaf_statistics` (plus a median
+of the intervals). The engine loads every record as int64 arrays and
+computes all plants at once. Exits 1 if the two disagree.
+
+    python benchmarks/bench_leaf_statistics.py [--records 10000000] [--plants 10000]
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from database import connection  # noqa: E402
+from database import db_operations as db  # noqa: E402
+from database.queries import GET_LEAF_RECORDS  # noqa: E402
+from models.plant import Plant  # noqa: E402
+
+# Sorted records spread over ~3 years, with times of day
+GENERATE_LEAF_RECORDS = '''
+    WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i + 1 < ?)
+    INSERT INTO leaf_records (plant_id, appearance_date)
+    SELECT i / ? + 1,
+           strftime('%Y-%m-%dT%H:%M:%S', '2022-01-01', '+' || ((i % ?) * 97 + (i * 7919) % 90) || ' hours')
+    FROM n
+'''
+
+
+def populate(records: int, plants: int) -> None:
+    per_plant = -(-records // plants)
+    with db.transaction() as conn:
+        conn.executemany("INSERT INTO plants (name, family) VALUES (?, 'Droseraceae')",
+                         ((f"Plant {i}",) for i in range(plants)))
+        # The leaf triggers maintain cached totals nothing here reads
+        for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' "
+                                    "AND tbl_name = 'leaf_records'").fetchall():
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.execute(GENERATE_LEAF_RECORDS, (records, per_plant, per_plant))
+
+
+def per_plant_statistics(now: datetime) -> dict:
+    results = {}
+    for plant_id in db.get_all_plant_ids():
+        dates = [datetime.fromisoformat(record.appearance_date)
+                 for record in db._execute_query(GET_LEAF_RECORDS, (plant_id,), fetch=True) or []]
+        if not dates:
+            continue
+        plant = Plant(name='', family='', leaf_records=dates)
+        stats = plant.calculate_leaf_statistics()
+        ordered = sorted(dates)
+        intervals = [(ordered[i + 1] - ordered[i]).days for i in range(len(ordered) - 1)]
+        results[plant_id] = (
+            stats['total_leaves'],
+            stats['avg_days_between_leaves'],
+            statistics.median(intervals) if intervals else None,
+            (now - ordered[-1]).days,
+        )
+    return results
+
+
+def agrees(per_plant: dict, batch) -> bool:
+    if len(per_plant) != len(batch.plant_ids):
+        return False
+    for i, plant_id in enumerate(batch.plant_ids.tolist()):
+        total, mean_gap, median_gap, since = per_plant[plant_id]
+        if total != batch.total_leaves[i] or since != batch.days_since_last_leaf[i]:
+            return False
+        for expected, actual in ((mean_gap, batch.mean_gap_days[i]), (median_gap, batch.median_gap_days[i])):
+            if expected is None:
+                if not np.isnan(actual):
+                    return False
+            elif abs(expected - actual) > 1e-9:
+                return False
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=10_000_000, help='Number of leaf records')
+    parser.add_argument('--plants', type=int, default=10_000, help='Number of plants')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.configure(Path(tmp) / 'plants.db')
+        db.init_db()
+        populate(args.records, args.plants)
+        now = datetime.now()
+
+        start = time.perf_counter()
+        per_plant = per_plant_statistics(now)
+        per_plant_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = db.get_all_leaf_statistics(now)
+        batch_s = time.perf_counter() - start
+
+        print(f"{args.records} leaf records, {args.plants} plants")
+        print(f"per-plant path:   {per_plant_s:8.2f} s")
+        print(f"numpy engine:     {batch_s:8.2f} s ({per_plant_s / batch_s:.1f}x)")
+        same = agrees(per_plant, batch)
+        print(f"identical output: {same}")
+        connection.close()
+    return 0 if same else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Time the `list` query before and after moving images out of `plants`.
+
+Builds a collection with inline image BLOBs (schema version 2), times
+`SELECT * ... ORDER BY family`, migrates it to the separate image store and
+times the projected `GET_ALL_PLANTS` query.
+
+    python benchmarks/bench_list_images.py [--plants 50000] [--image-kb 30]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from database.migrations import MIGRATIONS, apply_migrations  # noqa: E402
+from database.queries import GET_ALL_PLANTS  # noqa: E402
+
+LEGACY_VERSION = 2
+
+
+def build_legacy_db(db_path: Path, plants: int, image_kb: int) -> None:
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("BEGIN")
+    for migration in MIGRATIONS[:LEGACY_VERSION]:
+        for step in migration.steps:
+            if callable(step):
+                step(conn)
+            else:
+                conn.execute(step)
+    conn.execute(f"PRAGMA user_version = {LEGACY_VERSION}")
+    image = os.urandom(image_kb * 1024)
+    conn.executemany(
+        "INSERT INTO plants (name, family, image_data, image_mime_type, birthdate) VALUES (?, ?, ?, ?, ?)",
+        ((f"Plant {i}", f"Family {i % 200}", image, 'image/jpeg', '2023-01-01T00:00:00')
+         for i in range(plants))
+    )
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def time_list(conn: sqlite3.Connection, query: str) -> float:
+    """Fetch and format rows the way `list` does"""
+    start = time.perf_counter()
+    rows = conn.execute(query).fetchall()
+    formatted = [[row[0], row[1], row[2], "Yes" if row[3] else "No"] for row in rows]
+    assert len(formatted) == len(rows)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plants', type=int, default=50000, help='Number of plants')
+    parser.add_argument('--image-kb', type=int, default=30, help='Size of each image in KB')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'plants.db'
+        build_legacy_db(db_path, args.plants, args.image_kb)
+
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        before = time_list(conn, "SELECT * FROM plants ORDER BY family")
+
+        start = time.perf_counter()
+        apply_migrations(conn)
+        migration_time = time.perf_counter() - start
+
+        after = time_list(conn, GET_ALL_PLANTS)
+        conn.close()
+
+    print(f"{args.plants} plants with {args.image_kb} KB images")
+    print(f"list with inline BLOBs:   {before * 1000:9.1f} ms")
+    print(f"list with image store:    {after * 1000:9.1f} ms ({before / after:.1f}x)")
+    print(f"one-off migration:        {migration_time * 1000:9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
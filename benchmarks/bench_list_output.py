@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Compare buffered and streamed `list` output on a large collection.
+
+The buffered path is the old `list`: fetch every plant, format a second copy
+and tabulate it in one go. The streamed path pages through `iter_plants` and
+writes each format as rows arrive. Reports wall time, time to first output
+and peak traced memory, writing to /dev/null.
+
+    python benchmarks/bench_list_output.py [--plants 100000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from tabulate import tabulate  # noqa: E402
+
+from bench_search import populate  # noqa: E402
+from database import connection  # noqa: E402
+from database import db_operations as db  # noqa: E402
+from database.queries import PLANT_LIST_FIELDS  # noqa: E402
+from main import PlantCatalogueApp  # noqa: E402
+from utils.plant_output import PlantOutput  # noqa: E402
+
+
+class FirstWrite:
+    """Discard output, remembering when the first write happened"""
+
+    def __init__(self, stream) -> None:
+        self.stream = stream
+        self.first = None
+
+    def write(self, text: str) -> int:
+        if self.first is None:
+            self.first = time.perf_counter()
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def buffered(out: FirstWrite) -> None:
+    rows = db.get_all_plants(PLANT_LIST_FIELDS)
+    formatted = [PlantCatalogueApp._format_plant_row(row) for row in rows]
+    out.write(tabulate(formatted, headers=PlantCatalogueApp.PLANT_LIST_HEADERS) + '\n')
+
+
+def streamed(output_format: str):
+    def run(out: FirstWrite) -> None:
+        output = PlantOutput(output_format, PlantCatalogueApp.PLANT_LIST_HEADERS,
+                             PlantCatalogueApp._format_plant_row, stream=out)
+        output.write(db.iter_plants())
+    return run
+
+
+def measure(run) -> tuple:
+    with open(os.devnull, 'w') as devnull:
+        out = FirstWrite(devnull)
+        tracemalloc.start()
+        start = time.perf_counter()
+        run(out)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed * 1000, (out.first - start) * 1000, peak / 2 ** 20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plants', type=int, default=100000, help='Number of plants')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.configure(Path(tmp) / 'plants.db')
+        db.init_db()
+        populate(args.plants)
+
+        print(f"{args.plants} plants (times under tracemalloc)")
+        print(f"{'path':18} {'total ms':>10} {'first ms':>10} {'peak MiB':>10}")
+        runs = [('buffered table', buffered)]
+        runs += [(f"streamed {fmt}", streamed(fmt)) for fmt in ('table', 'csv', 'jsonl')]
+        for name, run in runs:
+            total, first, peak = measure(run)
+            print(f"{name:18} {total:10.0f} {first:10.1f} {peak:10.1f}")
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Measure the plant cache on a plant-menu style workload.
+
+Each step looks up a plant's label and leaf statistics, as the plant menu
+and `leaf-stats --id` do, and one step in `--write-every` waters the plant
+(invalidating its entries). Compares the uncached queries with the cached
+`get_plant_by_id` / `get_leaf_statistics`, after the one
+`refresh_plant_cache` a menu action runs, and checks they return the same.
+
+    python benchmarks/bench_plant_cache.py [--plants 10000] [--working-set 50] [--steps 100000]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from bench_search import populate  # noqa: E402
+from database import connection  # noqa: E402
+from database import db_operations as db  # noqa: E402
+from database.queries import GET_LEAF_TOTALS, PLANT_BY_ID_WHERE, PLANT_LABEL_FIELDS, select_plants  # noqa: E402
+from models.plant import Plant  # noqa: E402
+
+LABEL_QUERY = select_plants(PLANT_LABEL_FIELDS, where=PLANT_BY_ID_WHERE)
+
+
+def uncached(plant_id: int) -> tuple:
+    """The lookups as they ran before the cache"""
+    plant = db._execute_query(LABEL_QUERY, (plant_id,), fetch=True)[0]
+    totals = db._execute_query(GET_LEAF_TOTALS, (plant_id,), fetch=True)[0]
+    return plant, Plant.leaf_statistics_from_totals(totals.total_leaves, totals.gap_days, totals.last_leaf_date)
+
+
+def cached(plant_id: int) -> tuple:
+    db.refresh_plant_cache()
+    return db.get_plant_by_id(plant_id, PLANT_LABEL_FIELDS), db.get_leaf_statistics(plant_id)
+
+
+def run(lookup, steps: list, write_every: int) -> tuple:
+    results = []
+    start = time.perf_counter()
+    for i, plant_id in enumerate(steps):
+        if write_every and i % write_every == 0:
+            db.update_last_watered(plant_id)
+        results.append(lookup(plant_id))
+    return (time.perf_counter() - start) / len(steps) * 1e6, results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plants', type=int, default=10000, help='Number of plants')
+    parser.add_argument('--working-set', type=int, default=50, help='Distinct plants looked up')
+    parser.add_argument('--steps', type=int, default=100000, help='Lookups per run')
+    parser.add_argument('--write-every', type=int, default=20, help='Water a plant every N steps (0: never)')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.configure(Path(tmp) / 'plants.db')
+        db.init_db()
+        populate(args.plants)
+        working_set = rng.sample(range(1, args.plants + 1), args.working_set)
+        steps = [rng.choice(working_set) for _ in range(args.steps)]
+
+        before, uncached_results = run(uncached, steps, args.write_every)
+        counters = db.get_cache_stats()
+        after, cached_results = run(cached, steps, args.write_every)
+        stats = db.get_cache_stats()
+        connection.close()
+
+    hits, misses = stats['hits'] - counters['hits'], stats['misses'] - counters['misses']
+    print(f"{args.steps} steps over {args.working_set} of {args.plants} plants, "
+          f"watering every {args.write_every}")
+    print(f"uncached lookups: {before:7.1f} us/step")
+    print(f"cached lookups:   {after:7.1f} us/step ({before / after:.1f}x)")
+    print(f"cache: {hits} hits, {misses} misses ({hits / (hits + misses):.0%} hit rate)")
+    same = uncached_results == cached_results
+    print(f"identical results: {same}")
+    return 0 if same else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
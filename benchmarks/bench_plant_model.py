@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Measure the memory held by a million plants in each model.
+
+Loads every plant from the database into a list of the former `Plant`
+dataclass (eager date parsing, per-instance __dict__), a list of the
+slotted lazy `Plant`, and a columnar `PlantBatch`. Prints build time and
+the memory the result holds, as traced by tracemalloc.
+
+    python benchmarks/bench_plant_model.py [--plants 1000000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from bench_report import SET_BIRTHDATES  # noqa: E402
+from bench_search import populate  # noqa: E402
+from database import connection  # noqa: E402
+from database import db_operations as db  # noqa: E402
+from models.plant import Plant  # noqa: E402
+
+# The column layout `Plant.from_db_row` reads
+PLANT_ROWS = '''
+    SELECT id, name, family, has_image, image_mime_type, birthdate, created_at, last_leaf_date, last_watered
+    FROM plants
+    ORDER BY id
+'''
+
+
+@dataclass
+class DataclassPlant:
+    """The Plant model before it was slotted"""
+    name: str
+    family: str
+    birthdate: Optional[datetime] = None
+    id: Optional[int] = None
+    image_data: Optional[bytes] = None
+    has_image: bool = False
+    image_mime_type: Optional[str] = None
+    created_at: Optional[datetime] = None
+    last_leaf_date: Optional[datetime] = None
+    leaf_records: List[datetime] = field(default_factory=list)
+    last_watered: Optional[datetime] = None
+
+    @classmethod
+    def from_db_row(cls, row: tuple) -> 'DataclassPlant':
+        return cls(id=row[0], name=row[1], family=row[2], has_image=bool(row[3]), image_mime_type=row[4],
+                   birthdate=Plant._parse_date(row[5]), created_at=Plant._parse_date(row[6]),
+                   last_leaf_date=Plant._parse_date(row[7]), last_watered=Plant._parse_date(row[8]))
+
+
+def measure(build) -> tuple:
+    """(seconds, MiB still allocated) of building the collection
+
+    Timed without tracing, since tracemalloc slows every allocation down.
+    """
+    start = time.perf_counter()
+    held = build()
+    elapsed = time.perf_counter() - start
+    del held
+
+    tracemalloc.start()
+    held = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return elapsed, current / 2 ** 20
+
+
+def build(model) -> list:
+    with connection.get_manager().connection() as conn:
+        return [model.from_db_row(row) for row in conn.execute(PLANT_ROWS)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plants', type=int, default=1_000_000, help='Number of plants')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.configure(Path(tmp) / 'plants.db')
+        db.init_db()
+        with db.transaction() as conn:
+            # Only the rows matter here; skip the search and summary triggers
+            for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' "
+                                        "AND tbl_name = 'plants'").fetchall():
+                conn.execute(f"DROP TRIGGER {name}")
+        populate(args.plants)
+        db._execute_query(SET_BIRTHDATES)
+        db._execute_query("UPDATE plants SET last_watered = created_at WHERE id % 2 = 0")
+
+        results = {
+            'dataclass Plant': measure(lambda: build(DataclassPlant)),
+            'slotted Plant': measure(lambda: build(Plant)),
+            'PlantBatch': measure(db.load_plant_batch),
+        }
+        connection.close()
+
+    print(f"{args.plants} plants, loaded from the database")
+    print(f"{'model':16} {'build s':>8} {'MiB':>8} {'bytes/plant':>12}")
+    for model, (seconds, mib) in results.items():
+        print(f"{model:16} {seconds:8.2f} {mib:8.1f} {mib * 2 ** 20 / args.plants:12.0f}")
+
+
+if __name__ == '__main__':
+    main()
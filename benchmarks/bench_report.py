@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Measure `report` time and peak memory as the collection grows.
+
+For each size, generates the report as `report` does (statistics
+aggregated in SQL, detail rows streamed from a cursor) and prints wall
+time and peak traced memory, which should stay flat as plants are added.
+
+    python benchmarks/bench_report.py [--sizes 1000 10000 100000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from bench_search import populate  # noqa: E402
+from database import connection  # noqa: E402
+from database import db_operations as db  # noqa: E402
+from database.queries import PLANT_REPORT_FIELDS  # noqa: E402
+from utils.report_generator import ReportGenerator  # noqa: E402
+
+SET_BIRTHDATES = '''
+    UPDATE plants
+    SET birthdate = datetime('2015-01-01', '+' || (id * 7919 % 3650) || ' days')
+'''
+
+
+def with_sql_statistics(report: ReportGenerator) -> None:
+    stats = report.statistics_from_aggregates(*db.get_collection_statistics())
+    report.generate_plant_report(db.iter_all_plants(PLANT_REPORT_FIELDS), stats)
+
+
+def measure(run) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 2 ** 20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Collection sizes to measure')
+    args = parser.parse_args()
+
+    print(f"{'plants':>8} {'ms':>8} {'peak MiB':>9}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            connection.configure(Path(tmp) / 'plants.db')
+            db.init_db()
+            populate(size)
+            db._execute_query(SET_BIRTHDATES)
+
+            report = ReportGenerator.__new__(ReportGenerator)
+            report.output_dir = Path(tmp)
+            elapsed_ms, peak_mib = measure(lambda: with_sql_statistics(report))
+            print(f"{size:8} {elapsed_ms:8.0f} {peak_mib:9.1f}")
+            connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Compare `LIKE '%q%'` search latency with the FTS5 index.
+
+Broad queries return thousands of rows, so FTS5 is also timed with the
+`--limit` that `search-plant` accepts.
+
+    python benchmarks/bench_search.py [--plants 100000] [--repeat 20] [--limit 50]
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from database import connection  # noqa: E402
+from database import db_operations as db  # noqa: E402
+from database.queries import PLANT_LIST_FIELDS, select_plants  # noqa: E402
+
+# The search query before the FTS5 index
+LIKE_SEARCH = select_plants(PLANT_LIST_FIELDS, where='name LIKE ? OR family LIKE ?')
+
+GENERA = ['Drosera', 'Dionaea', 'Nepenthes', 'Sarracenia', 'Pinguicula', 'Utricularia',
+          'Cephalotus', 'Heliamphora', 'Darlingtonia', 'Byblis', 'Monstera', 'Philodendron']
+FAMILIES = ['Droseraceae', 'Nepenthaceae', 'Sarraceniaceae', 'Lentibulariaceae',
+            'Cephalotaceae', 'Byblidaceae', 'Araceae', 'Cactaceae', 'Orchidaceae']
+CULTIVARS = ['Red Dragon', 'Akai Ryu', 'Royal Red', 'Fused Tooth', 'Dentate', 'Green Dragon',
+             'Alba', 'Capensis', 'Spatulata', 'Rafflesiana', 'Ampullaria', 'Truncata']
+QUERIES = ['Drosera', 'nepenth', 'Sarraceniaceae', 'Araceae', 'Heliamphora 42',
+           'red drag', 'truncata 7']
+
+
+def populate(plants: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    with db.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO plants (name, family) VALUES (?, ?)",
+            ((f"{rng.choice(GENERA)} {rng.choice(CULTIVARS)} {rng.randrange(1000)}", rng.choice(FAMILIES))
+             for _ in range(plants))
+        )
+
+
+def like_search(query: str) -> list:
+    return db._execute_query(LIKE_SEARCH, (f'%{query}%', f'%{query}%'), fetch=True)
+
+
+def fts_search(query: str, limit: int = None) -> list:
+    return db.search_plants(query, PLANT_LIST_FIELDS, limit=limit)
+
+
+def median_ms(search, query: str, repeat: int, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        search(query, *args)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plants', type=int, default=100000, help='Number of plants')
+    parser.add_argument('--repeat', type=int, default=20, help='Runs per query')
+    parser.add_argument('--limit', type=int, default=50, help='Result limit for the limited FTS5 run')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.configure(Path(tmp) / 'plants.db')
+        db.init_db()
+        populate(args.plants)
+
+        print(f"{args.plants} plants, median of {args.repeat} runs")
+        limited = f"FTS5 /{args.limit}"
+        print(f"{'query':18} {'LIKE ms':>9} {'FTS5 ms':>9} {limited:>10} {'LIKE/FTS rows':>14}")
+        for query in QUERIES:
+            like_ms = median_ms(like_search, query, args.repeat)
+            fts_ms = median_ms(fts_search, query, args.repeat)
+            limited_ms = median_ms(fts_search, query, args.repeat, args.limit)
+            rows = f"{len(like_search(query))}/{len(fts_search(query))}"
+            print(f"{query:18} {like_ms:9.2f} {fts_ms:9.2f} {limited_ms:10.2f} {rows:>14}")
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Check cold start import time of light commands with `python -X importtime`.
+
+Runs `water` and `list` against a small temporary collection and sums the
+cumulative import time of the top-level modules. Exits 1 if a command
+loads a heavy dependency (OpenCV, Tk, Pillow, qrcode, NumPy) or the median
+import time passes `--max-ms`. tests/test_startup.py asserts the former on
+every test run; the time budget depends on the machine, so only this
+script checks it.
+
+    python benchmarks/bench_startup.py [--runs 5] [--max-ms 120]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(SRC))
+
+from bench_search import populate  # noqa: E402
+from database import connection  # noqa: E402
+from database import db_operations as db  # noqa: E402
+
+COMMANDS = {
+    'water': ['water', '--id', '1'],
+    'list': ['list', '--page-size', '50'],
+}
+
+# Only the subcommands that display or render images may import these
+HEAVY_MODULES = ('cv2', 'tkinter', 'PIL', 'qrcode', 'numpy')
+
+CONFIG = '''[database]
+path = data/plants.db
+
+[images]
+storage_path = data/images
+
+[reports]
+output_dir = data/reports
+'''
+
+
+def import_profile(command: list, cwd: str) -> tuple:
+    """Run one cold start; return (total import ms, imported module names)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', str(SRC / 'main.py'), *command],
+        cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'},
+    )
+    total_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        modules.add(name.strip())
+        # Nested imports are indented; their time is already in their parent's
+        if not name[1:].startswith(' '):
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='Cold starts per command')
+    parser.add_argument('--max-ms', type=float, default=120, help='Median import time budget per command')
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / 'config.ini').write_text(CONFIG)
+        (Path(tmp) / 'data').mkdir()
+        connection.configure(Path(tmp) / 'data' / 'plants.db')
+        db.init_db()
+        populate(1000)
+        connection.close()
+
+        for name, command in COMMANDS.items():
+            runs = [import_profile(command, tmp) for _ in range(args.runs)]
+            median = statistics.median(ms for ms, _ in runs)
+            heavy = sorted({module.split('.')[0] for _, modules in runs for module in modules}
+                           & set(HEAVY_MODULES))
+            status = 'ok'
+            if heavy:
+                status = f"FAIL: imports {', '.join(heavy)}"
+            elif median > args.max_ms:
+                status = f"FAIL: over {args.max_ms:.0f} ms"
+            failed = failed or status != 'ok'
+            print(f"{name:6} median import time {median:7.1f} ms  {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Compare the report statistics read from collection_stats with a plants scan.
+
+The scan aggregates every plant the way the report did before the summary
+tables. Also times inserts, which now pay for the summary triggers.
+
+    python benchmarks/bench_summary.py [--plants 100000] [--repeat 20]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from bench_report import SET_BIRTHDATES  # noqa: E402
+from bench_search import populate, median_ms  # noqa: E402
+from database import connection  # noqa: E402
+from database import db_operations as db  # noqa: E402
+
+# The report's aggregates before collection_stats
+SCAN_FAMILY_STATISTICS = '''
+    SELECT family, COUNT(*) AS plants, SUM(has_image) AS with_images
+    FROM plants
+    GROUP BY family
+    ORDER BY family
+'''
+
+SCAN_AGE_STATISTICS = '''
+    SELECT COUNT(*) AS aged,
+           julianday('now', 'localtime') - AVG(julianday(birthdate)) AS mean_age_days,
+           julianday('now', 'localtime') - MAX(julianday(birthdate)) AS min_age_days,
+           julianday('now', 'localtime') - MIN(julianday(birthdate)) AS max_age_days
+    FROM plants
+    WHERE julianday(birthdate) IS NOT NULL
+'''
+
+SCAN_MEDIAN_AGE = '''
+    SELECT julianday('now', 'localtime') - AVG(julianday(birthdate)) AS median_age_days
+    FROM (
+        SELECT birthdate
+        FROM plants
+        WHERE julianday(birthdate) IS NOT NULL
+        ORDER BY birthdate
+        LIMIT 2 - ? % 2 OFFSET (? - 1) / 2
+    )
+'''
+
+
+def scan_statistics(_=None) -> None:
+    with db.transaction():
+        db._execute_query(SCAN_FAMILY_STATISTICS, fetch=True)
+        ages = db._execute_query(SCAN_AGE_STATISTICS, fetch=True)[0]
+        db._execute_query(SCAN_MEDIAN_AGE, (ages.aged, ages.aged), fetch=True)
+
+
+def summary_statistics(_=None) -> None:
+    db.get_collection_statistics()
+
+
+def time_inserts(count: int, triggers: bool) -> float:
+    with db.transaction() as conn:
+        if not triggers:
+            saved = conn.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'collection_stats_%'"
+            ).fetchall()
+            for name, _ in saved:
+                conn.execute(f"DROP TRIGGER {name}")
+        start = time.perf_counter()
+        conn.executemany(
+            "INSERT INTO plants (name, family, birthdate) VALUES (?, ?, '2020-01-01T00:00:00')",
+            ((f"Insert {i}", f"Family {i % 20}") for i in range(count))
+        )
+        elapsed = time.perf_counter() - start
+        # Leave the database as it was
+        conn.execute("DELETE FROM plants WHERE name LIKE 'Insert %'")
+        if not triggers:
+            for _, sql in saved:
+                conn.execute(sql)
+    return elapsed / count * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plants', type=int, default=100000, help='Number of plants')
+    parser.add_argument('--repeat', type=int, default=20, help='Runs per measurement')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.configure(Path(tmp) / 'plants.db')
+        db.init_db()
+        populate(args.plants)
+        db._execute_query(SET_BIRTHDATES)
+
+        scan = median_ms(scan_statistics, None, args.repeat)
+        summary = median_ms(summary_statistics, None, args.repeat)
+        print(f"{args.plants} plants, median of {args.repeat} runs")
+        print(f"statistics from a plants scan:     {scan:8.2f} ms")
+        print(f"statistics from collection_stats:  {summary:8.2f} ms ({scan / summary:.0f}x)")
+        print(f"insert without summary triggers:   {time_inserts(10000, False):8.1f} us/plant")
+        print(f"insert with summary triggers:      {time_inserts(10000, True):8.1f} us/plant")
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
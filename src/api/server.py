@@ -0,0 +1,381 @@
+"""Local HTTP/JSON API over the catalogue operations
+
+Requests are parsed on an asyncio event loop, so slow clients only cost a
+coroutine each. Every db_operations call runs on a bounded thread pool; the
+connection pool is sized to match, so each worker keeps one connection.
+
+    GET  /plants?after_id=&limit=          all plants, streamed as a JSON array
+    GET  /plants/search?q=&fuzzy=&after_id=&limit=
+    POST /plants                           {"name", "family", "age_months"?, "image"?}
+    POST /plants/<id>/leaves               {"date"?: "YYYY-MM-DD"}
+    GET  /plants/<id>/leaf-stats
+    POST /plants/<id>/water
+    GET  /plants/<id>/water
+    GET  /plants/<id>/image?size=          image bytes, with an ETag; `size` picks the
+                                           smallest cached rendition covering size x size
+    GET  /cache-stats                      plant cache hits and misses
+"""
+import asyncio
+import json
+import logging
+import re
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http import HTTPStatus
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from database import connection
+from database import db_operations as db
+from database.queries import PLANT_LIST_FIELDS
+from models.plant import Plant
+from utils.plant_output import row_to_dict
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = 4
+# Rows fetched per thread pool call while streaming a list
+STREAM_CHUNK_ROWS = 500
+MAX_BODY_BYTES = 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPError(Exception):
+    """An error response to send to the client"""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    query: Dict[str, List[str]]
+    headers: Dict[str, str]
+    body: bytes
+    keep_alive: bool
+
+    def param(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        values = self.query.get(name)
+        return values[0] if values else default
+
+    def int_param(self, name: str) -> Optional[int]:
+        value = self.param(name)
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"{name} must be an integer")
+
+    def json(self) -> Dict[str, Any]:
+        if not self.body:
+            return {}
+        try:
+            body = json.loads(self.body)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON")
+        if not isinstance(body, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+        return body
+
+
+class CatalogueAPI:
+    """Routes HTTP requests to db_operations calls on a worker pool"""
+
+    def __init__(self, app, workers: int = DEFAULT_WORKERS) -> None:
+        self.app = app
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='catalogue-db')
+        self.routes: List[Tuple[str, re.Pattern, Callable]] = [
+            ('GET', re.compile(r'/plants'), self.list_plants),
+            ('GET', re.compile(r'/plants/search'), self.search_plants),
+            ('POST', re.compile(r'/plants'), self.add_plant),
+            ('POST', re.compile(r'/plants/(\d+)/leaves'), self.add_leaf),
+            ('GET', re.compile(r'/plants/(\d+)/leaf-stats'), self.leaf_stats),
+            ('POST', re.compile(r'/plants/(\d+)/water'), self.water),
+            ('GET', re.compile(r'/plants/(\d+)/water'), self.water_info),
+            ('GET', re.compile(r'/plants/(\d+)/image'), self.image),
+            ('GET', re.compile(r'/cache-stats'), self.cache_stats),
+        ]
+
+    async def _run(self, func: Callable, *args) -> Any:
+        """Run a blocking call on the worker pool"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection until the client closes it"""
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except HTTPError as e:
+                    await _send_json(writer, e.status, {'error': e.message}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                await self._dispatch(request, writer)
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _dispatch(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        allowed = False
+        for method, pattern, handler in self.routes:
+            match = pattern.fullmatch(request.path)
+            if not match:
+                continue
+            allowed = True
+            if method != request.method:
+                continue
+            try:
+                await self._run(db.refresh_plant_cache)
+                await handler(request, writer, *(int(group) for group in match.groups()))
+            except ConnectionError:
+                raise
+            except HTTPError as e:
+                await _send_json(writer, e.status, {'error': e.message}, request.keep_alive)
+            except Exception as e:
+                logger.error(f"Unexpected error: {e}", exc_info=True)
+                await _send_json(writer, HTTPStatus.INTERNAL_SERVER_ERROR,
+                                 {'error': "Internal error. Check errors.log for details."}, request.keep_alive)
+            return
+
+        status = HTTPStatus.METHOD_NOT_ALLOWED if allowed else HTTPStatus.NOT_FOUND
+        await _send_json(writer, status, {'error': status.phrase}, request.keep_alive)
+
+    async def list_plants(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        try:
+            rows = await self._run(db.iter_plants, request.int_param('after_id'), request.int_param('limit'))
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.NOT_FOUND, str(e))
+        await self._stream_rows(rows, writer, request.keep_alive)
+
+    async def search_plants(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        query = request.param('q')
+        if not query:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "q is required")
+        after_id, limit = request.int_param('after_id'), request.int_param('limit')
+        if request.param('fuzzy') in ('1', 'true'):
+            # Fuzzy results are ranked in memory, so they are small and sent in one piece
+            found = await self._run(db.fuzzy_search_plants, query, PLANT_LIST_FIELDS, limit)
+            if found.timed_out:
+                raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE,
+                                f"Fuzzy search exceeded its {db.FUZZY_BUDGET_MS} ms budget")
+            await _send_json(writer, HTTPStatus.OK, [row_to_dict(row) for row in found.plants], request.keep_alive)
+            return
+        try:
+            rows = await self._run(db.iter_search_plants, query, after_id, limit)
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.NOT_FOUND, str(e))
+        await self._stream_rows(rows, writer, request.keep_alive)
+
+    async def add_plant(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        body = request.json()
+        name, family, age_months = body.get('name'), body.get('family'), body.get('age_months')
+        if not isinstance(name, str) or not name or not isinstance(family, str) or not family:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "name and family are required")
+        if age_months is not None and not isinstance(age_months, int):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "age_months must be an integer")
+        # Same processing as `add-plant`; image is a path on this machine
+        args = Namespace(name=name, family=family, image=body.get('image'), age_months=age_months)
+        plant_id = await self._run(self._add_plant, args)
+        await _send_json(writer, HTTPStatus.CREATED, {'id': plant_id}, request.keep_alive)
+
+    def _add_plant(self, args: Namespace) -> int:
+        plant_data = self.app.plantdata_processor(args)
+        image_data = plant_data.pop('image_data', None)
+        derivatives = plant_data.pop('image_derivatives', None)
+        return db.add_plant(Plant(**plant_data), image_data, derivatives)
+
+    async def add_leaf(self, request: Request, writer: asyncio.StreamWriter, plant_id: int) -> None:
+        date = request.json().get('date')
+        if date is not None:
+            try:
+                date = datetime.strptime(date, '%Y-%m-%d')
+            except (TypeError, ValueError):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid date format. Use YYYY-MM-DD")
+        if not await self._run(db.add_leaf_record, plant_id, date):
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Plant with ID {plant_id} not found")
+        await _send_json(writer, HTTPStatus.CREATED, {'plant_id': plant_id}, request.keep_alive)
+
+    async def leaf_stats(self, request: Request, writer: asyncio.StreamWriter, plant_id: int) -> None:
+        stats = await self._run(db.get_leaf_statistics, plant_id)
+        if not stats:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "No statistics available")
+        await _send_json(writer, HTTPStatus.OK, stats, request.keep_alive)
+
+    async def water(self, request: Request, writer: asyncio.StreamWriter, plant_id: int) -> None:
+        # update_last_watered only fails on database errors, so look the plant up first
+        if not await self._run(db.get_plant_by_id, plant_id, ('id',)):
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Plant with ID {plant_id} not found")
+        if not await self._run(db.update_last_watered, plant_id):
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Failed to record watering")
+        await self.water_info(request, writer, plant_id)
+
+    async def water_info(self, request: Request, writer: asyncio.StreamWriter, plant_id: int) -> None:
+        info = await self._run(db.get_watering_info, plant_id)
+        if not info:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Plant with ID {plant_id} not found")
+        await _send_json(writer, HTTPStatus.OK, info, request.keep_alive)
+
+    async def image(self, request: Request, writer: asyncio.StreamWriter, plant_id: int) -> None:
+        size = request.int_param('size')
+        if size is not None and size < 1:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "size must be at least 1")
+        # The image ID names immutable bytes, so a matching tag skips loading the blob
+        plant = await self._run(db.get_plant_by_id, plant_id, ('image_id',))
+        if not plant or not plant.image_id:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "No image available for this plant")
+        headers = {'Cache-Control': 'no-cache'}
+        if _etag(plant.image_id, size) in _if_none_match(request):
+            headers['ETag'] = _etag(plant.image_id, size)
+            await _send(writer, HTTPStatus.NOT_MODIFIED, b'', None, headers, request.keep_alive)
+            return
+
+        image = await self._run(db.get_plant_image, plant_id, size)
+        if not image:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "No image available for this plant")
+        headers['ETag'] = _etag(image.image_id, size)
+        await _send(writer, HTTPStatus.OK, image.data, image.image_mime_type or 'application/octet-stream',
+                    headers, request.keep_alive)
+
+    async def cache_stats(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        await _send_json(writer, HTTPStatus.OK, db.get_cache_stats(), request.keep_alive)
+
+    async def _stream_rows(self, rows: Iterator[tuple], writer: asyncio.StreamWriter, keep_alive: bool) -> None:
+        """Send rows as a chunked JSON array, fetching one chunk at a time"""
+        writer.write(_head(HTTPStatus.OK, 'application/json', {'Transfer-Encoding': 'chunked'}, keep_alive))
+        separator = b'['
+        while True:
+            try:
+                # Pages are separate queries, so each chunk can run on any worker
+                chunk = await self._run(lambda: list(islice(rows, STREAM_CHUNK_ROWS)))
+            except Exception as e:
+                # The status line is already sent; end the response by dropping the connection
+                logger.error(f"Unexpected error while streaming: {e}", exc_info=True)
+                raise ConnectionAbortedError from e
+            if not chunk:
+                break
+            data = separator + b','.join(_encode(row_to_dict(row)) for row in chunk)
+            separator = b','
+            writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+            await writer.drain()
+        closing = b'[]' if separator == b'[' else b']'
+        writer.write(b'%x\r\n%s\r\n0\r\n\r\n' % (len(closing), closing))
+        await writer.drain()
+
+
+def serve_http(app, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = DEFAULT_WORKERS) -> None:
+    """Serve the API until interrupted"""
+    # One pooled connection per worker thread
+    connection.configure(connection.get_db_path(), pool_size=workers)
+    api = CatalogueAPI(app, workers)
+
+    async def run() -> None:
+        server = await asyncio.start_server(api.handle_connection, host, port)
+        bound_host, bound_port = server.sockets[0].getsockname()[:2]
+        print(f"Serving HTTP API on http://{bound_host}:{bound_port} with {workers} workers", flush=True)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.executor.shutdown()
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """Read one request, or None when the client closed the connection"""
+    line = await _read_line(reader, HTTPStatus.REQUEST_URI_TOO_LONG, "Request line too long")
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode('latin-1').split()
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = await _read_line(reader, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Header line too long")
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if 'transfer-encoding' in headers:
+        # Only Content-Length bodies are read; a chunked one left unread would be parsed as the next request
+        raise HTTPError(HTTPStatus.NOT_IMPLEMENTED, "Transfer-Encoding is not supported, send Content-Length")
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed Content-Length header")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+    body = await reader.readexactly(length) if length else b''
+
+    url = urlsplit(target)
+    connection_header = headers.get('connection', '').lower()
+    keep_alive = connection_header == 'keep-alive' if version == 'HTTP/1.0' else connection_header != 'close'
+    return Request(method, url.path.rstrip('/') or '/', parse_qs(url.query), headers, body, keep_alive)
+
+
+async def _read_line(reader: asyncio.StreamReader, status: HTTPStatus, message: str) -> bytes:
+    """Read one line; a line longer than the reader's limit is answered with `status`"""
+    try:
+        return await reader.readline()
+    except ValueError:
+        # readline turns asyncio.LimitOverrunError into ValueError
+        raise HTTPError(status, message)
+
+
+def _head(status: HTTPStatus, content_type: Optional[str], headers: Dict[str, str], keep_alive: bool) -> bytes:
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+    if content_type:
+        lines.append(f"Content-Type: {content_type}")
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+async def _send(writer: asyncio.StreamWriter, status: HTTPStatus, body: bytes, content_type: Optional[str],
+                headers: Dict[str, str], keep_alive: bool) -> None:
+    writer.write(_head(status, content_type, {**headers, 'Content-Length': str(len(body))}, keep_alive) + body)
+    await writer.drain()
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: HTTPStatus, payload: Any, keep_alive: bool) -> None:
+    await _send(writer, status, _encode(payload), 'application/json', {}, keep_alive)
+
+
+def _encode(payload: Any) -> bytes:
+    return json.dumps(payload, default=_json_default).encode()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} as JSON")
+
+
+def _etag(image_id: int, size: Optional[int] = None) -> str:
+    return f'"image-{image_id}"' if size is None else f'"image-{image_id}-{size}"'
+
+
+def _if_none_match(request: Request) -> List[str]:
+    return [tag.strip() for tag in request.headers.get('if-none-match', '').split(',')]
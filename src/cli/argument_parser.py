@@ -1,6 +1,11 @@
 import argparse
 from datetime import datetime
-from typing import Optional
+
+def _add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    """Paging and output format options shared by the plant listing commands"""
+    parser.add_argument('--page-size', type=int, help='Print one page of this many plants')
+    parser.add_argument('--after-id', type=int, help='Start after this plant ID (from the previous page)')
+    parser.add_argument('--format', choices=['table', 'csv', 'jsonl'], default='table', help='Output format')
 
 def create_parser() -> argparse.ArgumentParser:
     """Create and configure argument parser"""
@@ -9,6 +14,7 @@ def create_parser() -> argparse.ArgumentParser:
 
     # List plants
     list_parser = subparsers.add_parser('list', help='List all plants')
+    _add_output_arguments(list_parser)
 
     # Add plant
     add_parser = subparsers.add_parser('add-plant', help='Add a new plant')
@@ -18,6 +24,13 @@ def create_parser() -> argparse.ArgumentParser:
     add_parser.add_argument('--age-months', type=int, help='Plant age in months')
     add_parser.add_argument('--birthdate', help='Plant birthdate (YYYY-MM-DD)')
 
+    import_parser = subparsers.add_parser('import-plants', help='Add every plant of a CSV or JSON lines manifest')
+    import_parser.add_argument('manifest', help='Manifest path (.csv with a header row, or .jsonl); '
+                                                'fields: name, family, image, birthdate (YYYY-MM-DD)')
+    import_parser.add_argument('--batch-size', type=int, default=500, help='Plants inserted per transaction')
+    import_parser.add_argument('--workers', type=int, help='Image and QR code worker processes')
+    import_parser.add_argument('--no-qr', action='store_true', help='Skip QR codes (render them later with regen-qr)')
+
     # Edit plant
     edit_parser = subparsers.add_parser('edit-plant', help='Edit an existing plant')
     edit_parser.add_argument('--id', type=int, required=True, help='Plant ID')
@@ -27,6 +40,7 @@ def create_parser() -> argparse.ArgumentParser:
 
     # Generate report
     subparsers.add_parser('report', help='Generate plant report')
+    subparsers.add_parser('summary', help='Show per-family collection totals')
 
     # Add leaf record
     leaf_parser = subparsers.add_parser('add-leaf', help='Add a leaf record')
@@ -36,22 +50,41 @@ def create_parser() -> argparse.ArgumentParser:
     # Leaf statistics
     stats_parser = subparsers.add_parser('leaf-stats', help='Show leaf statistics')
     stats_parser.add_argument('--id', type=int, help='Plant ID (optional, for specific plant)')
+    stats_parser.add_argument('--median', action='store_true',
+                              help='Add the median days between leaves to the export (reads every leaf record)')
 
     # Show image
     image_parser = subparsers.add_parser('show-image', help='Display plant image')
     image_parser.add_argument('--id', type=int, required=True, help='Plant ID')
 
+    # Thumbnail gallery
+    gallery_parser = subparsers.add_parser('gallery', help='Browse plant thumbnails in a scrollable grid')
+    gallery_parser.add_argument('--family', help='Only show plants of this family')
+    gallery_parser.add_argument('--query', help='Only show plants matching this search, best matches first')
+    gallery_parser.add_argument('--cache-size', type=int, default=400, help='Thumbnails kept in memory')
+
     # Search plants
     search_parser = subparsers.add_parser('search-plant', help='Search plants by name or family')
-    search_parser.add_argument('--query', required=True, help='Search term')
+    search_parser.add_argument('--query', required=True, help='Search term (each word matches as a prefix)')
+    search_parser.add_argument('--limit', type=int, help='Maximum number of results')
+    search_parser.add_argument('--fuzzy', action='store_true', help='Tolerate typos (trigram similarity)')
+    _add_output_arguments(search_parser)
 
     # QR code scanning
     subparsers.add_parser('scan', help='Scan QR code and interact with plant')
     subparsers.add_parser('list-qr', help='List all available QR codes')
+    regen_qr_parser = subparsers.add_parser('regen-qr', help='Render missing or stale QR codes')
+    regen_qr_parser.add_argument('--force', action='store_true', help='Re-render every QR code')
+    regen_qr_parser.add_argument('--workers', type=int, help='Number of worker processes')
 
     # Database migrations
     subparsers.add_parser('migrate', help='Perform database migrations')
 
+    # Image store maintenance
+    dedupe_parser = subparsers.add_parser('dedupe-images', help='Store each distinct image once and reclaim the space')
+    dedupe_parser.add_argument('--no-vacuum', action='store_true',
+                               help='Skip VACUUM (it needs free disk space up to the database size)')
+
     # Watering management
     water_parser = subparsers.add_parser('water', help='Record watering for a plant')
     water_parser.add_argument('--id', type=int, required=True, help='Plant ID')
@@ -59,6 +92,17 @@ def create_parser() -> argparse.ArgumentParser:
     water_info_parser = subparsers.add_parser('water-info', help='Show watering information')
     water_info_parser.add_argument('--id', type=int, required=True, help='Plant ID')
 
+    subparsers.add_parser('cache-stats', help='Show plant cache hits and misses (of the daemon, via client.py)')
+
+    # Daemon mode
+    serve_parser = subparsers.add_parser('serve', help='Keep the catalogue loaded and run commands from client.py')
+    serve_parser.add_argument('--socket', help='Unix socket path (default: [server] socket in config.ini)')
+
+    http_parser = subparsers.add_parser('serve-http', help='Serve the catalogue as a local HTTP/JSON API')
+    http_parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    http_parser.add_argument('--port', type=int, default=8080, help='Port to listen on (0 picks a free port)')
+    http_parser.add_argument('--workers', type=int, default=4, help='Database worker threads')
+
     return parser
 
 def validate_args(args) -> bool:
@@ -81,4 +125,28 @@ def validate_args(args) -> bool:
             print("Invalid date format. Use YYYY-MM-DD")
             return False
 
+    if args.command in ('list', 'search-plant') and args.page_size is not None and args.page_size < 1:
+        print("Page size must be at least 1")
+        return False
+
+    if args.command == 'gallery' and args.cache_size < 1:
+        print("Cache size must be at least 1")
+        return False
+
+    if args.command == 'import-plants':
+        if args.batch_size < 1:
+            print("Batch size must be at least 1")
+            return False
+        if args.workers is not None and args.workers < 1:
+            print("Workers must be at least 1")
+            return False
+
+    if args.command == 'regen-qr' and args.workers is not None and args.workers < 1:
+        print("Workers must be at least 1")
+        return False
+
+    if args.command == 'serve-http' and args.workers < 1:
+        print("Workers must be at least 1")
+        return False
+
     return True
@@ -0,0 +1,168 @@
+"""Run commands in a long-lived `serve` process over a local Unix socket
+
+The protocol is one JSON line per message. The client sends
+{"argv": [...], "cwd": ...}; the daemon answers with {"out": text} and
+{"err": text} chunks, then {"exit": status}, or with {"fallback": true}
+when the client should run the command itself.
+"""
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+from configparser import ConfigParser
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Callable, List, Optional
+
+DEFAULT_SOCKET = 'data/catalogue.sock'
+# Commands that need the caller's terminal, camera or display run in the client
+LOCAL_COMMANDS = {'scan', 'show-image', 'gallery', 'serve', 'serve-http'}
+# Output is relayed in chunks of at most this many characters
+CHUNK_SIZE = 64 * 1024
+
+
+class DaemonError(Exception):
+    """Custom exception for daemon errors"""
+    pass
+
+
+def socket_path() -> str:
+    """Get the daemon socket path from config"""
+    config = ConfigParser()
+    config.read('config.ini')
+    return config.get('server', 'socket', fallback=DEFAULT_SOCKET)
+
+
+def forward(argv: List[str], path: Optional[str] = None) -> Optional[int]:
+    """Run a command line on the daemon, relaying its output
+
+    Returns the command's exit status, or None when no daemon is listening
+    (or it asks the client to run the command itself).
+    """
+    if not hasattr(socket, 'AF_UNIX') or (argv and argv[0] in LOCAL_COMMANDS):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path or socket_path())
+    except OSError:
+        sock.close()
+        return None
+
+    with sock, sock.makefile('rwb') as stream:
+        stream.write(json.dumps({'argv': argv, 'cwd': os.getcwd()}).encode() + b'\n')
+        stream.flush()
+        for line in stream:
+            message = json.loads(line)
+            if 'out' in message:
+                sys.stdout.write(message['out'])
+                sys.stdout.flush()
+            elif 'err' in message:
+                sys.stderr.write(message['err'])
+            elif 'exit' in message:
+                return message['exit']
+            elif message.get('fallback'):
+                return None
+
+    print("Lost connection to the plant catalogue daemon", file=sys.stderr)
+    return 1
+
+
+def serve(path: str, run: Callable[[List[str]], int]) -> None:
+    """Accept command lines on `path` and execute them with `run`, one at a time
+
+    Commands share the caller's process, so stdout and stderr are redirected
+    to the requesting client while each one runs.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        raise DaemonError("Unix sockets are not supported on this platform")
+    _remove_stale_socket(path)
+
+    server = _CommandServer(path, run)
+    # Stop cleanly (and remove the socket file) on `kill`
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        os.chmod(path, 0o600)
+        print(f"Serving plant catalogue commands on {path}")
+        sys.stdout.flush()
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Remove a socket file left by a daemon that did not shut down"""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise DaemonError(f"A daemon is already serving {path}")
+    finally:
+        probe.close()
+
+
+class _CommandServer(socketserver.UnixStreamServer):
+    # Scanners burst; let them queue instead of falling back
+    request_queue_size = 128
+
+    def __init__(self, path: str, run: Callable[[List[str]], int]) -> None:
+        self.run = run
+        self.cwd = os.getcwd()
+        super().__init__(path, _CommandHandler)
+
+
+class _CommandHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        request = json.loads(line)
+        argv = request['argv']
+        # config.ini and data paths are relative to the working directory
+        if request.get('cwd') != self.server.cwd or (argv and argv[0] in LOCAL_COMMANDS):
+            self._send({'fallback': True})
+            return
+
+        out, err = _MessageStream(self, 'out'), _MessageStream(self, 'err')
+        try:
+            with redirect_stdout(out), redirect_stderr(err):
+                status = self.server.run(argv)
+            out.flush()
+            err.flush()
+            self._send({'exit': status})
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away; the command itself has completed
+            pass
+
+    def _send(self, message: dict) -> None:
+        self.wfile.write(json.dumps(message).encode() + b'\n')
+
+
+class _MessageStream:
+    """Text stream that relays writes to the client as tagged messages"""
+
+    def __init__(self, handler: _CommandHandler, key: str) -> None:
+        self.handler = handler
+        self.key = key
+        self.buffer = []
+        self.size = 0
+
+    def write(self, text: str) -> int:
+        self.buffer.append(text)
+        self.size += len(text)
+        if self.size >= CHUNK_SIZE:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        if self.buffer:
+            self.handler._send({self.key: ''.join(self.buffer)})
+            self.buffer, self.size = [], 0
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""Run a catalogue command through the `serve` daemon when one is running.
+
+Takes the same arguments as main.py. Without a daemon (or for commands
+that need this terminal) the command runs in this process instead.
+
+    python src/client.py water --id 3
+"""
+import sys
+
+from cli.daemon import forward
+
+
+def main() -> None:
+    status = forward(sys.argv[1:])
+    if status is None:
+        from main import main as run_in_process
+        run_in_process()
+    else:
+        sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
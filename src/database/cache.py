@@ -0,0 +1,99 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Set, Tuple
+
+# Returned by `PlantCache.lookup` when the key is not cached
+MISSING = object()
+
+
+class PlantCache:
+    """Bounded LRU cache of per-plant lookups
+
+    Keys are tuples whose second item is the plant ID, so every entry of a
+    plant can be dropped when that plant is written. Writes made through
+    other connections (or other processes) are detected by `sync` with
+    SQLite's `PRAGMA data_version`, which clears the whole cache; it runs
+    once per command or request rather than on every lookup.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._by_plant: Dict[int, Set[Hashable]] = {}
+        # Bumped by every invalidation, so reads that raced one are not stored
+        self._generation = 0
+        self._owner = None
+        self._data_versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, key: Tuple, owner: object) -> Tuple[Any, int]:
+        """Return the cached value (or MISSING) and the generation to pass to `store`
+
+        Entries cached for another `owner` (a previous database) are dropped first.
+        """
+        with self._lock:
+            self._own(owner)
+            value = self._entries.get(key, MISSING)
+            if value is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return value, self._generation
+
+    def store(self, key: Tuple, value: Any, generation: int) -> None:
+        """Cache a value read at `generation`, unless an invalidation happened since"""
+        with self._lock:
+            if generation != self._generation or self.maxsize <= 0:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._by_plant.setdefault(key[1], set()).add(key)
+            if len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                keys = self._by_plant[evicted[1]]
+                keys.discard(evicted)
+                if not keys:
+                    del self._by_plant[evicted[1]]
+
+    def invalidate(self, plant_id: int) -> None:
+        """Drop every entry of a plant that was just written"""
+        with self._lock:
+            self._generation += 1
+            for key in self._by_plant.pop(plant_id, ()):
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def sync(self, owner: object, conn_id: int, data_version: int) -> None:
+        """Clear the cache if connection `conn_id` of `owner` saw a commit made elsewhere
+
+        `data_version` changes whenever another connection commits; a
+        connection seen for the first time clears the cache too, since there
+        is nothing to compare with.
+        """
+        with self._lock:
+            self._own(owner)
+            if self._data_versions.get(conn_id) != data_version:
+                self._data_versions[conn_id] = data_version
+                self._clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._entries), 'maxsize': self.maxsize}
+
+    def _own(self, owner: object) -> None:
+        if owner is not self._owner:
+            self._owner = owner
+            self._data_versions = {}
+            self._clear()
+
+    def _clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        self._by_plant.clear()
@@ -0,0 +1,166 @@
+import sqlite3
+import threading
+import atexit
+from contextlib import contextmanager
+from pathlib import Path
+from queue import LifoQueue, Empty
+from configparser import ConfigParser
+from typing import Iterator, List, Optional, Union
+
+# Applied once to every connection when it is opened
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -20000",      # ~20 MB page cache
+    "PRAGMA mmap_size = 268435456",    # 256 MB memory-mapped I/O
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Size of sqlite3's per-connection prepared statement cache
+STATEMENT_CACHE_SIZE = 256
+DEFAULT_POOL_SIZE = 4
+
+
+def get_db_path() -> Path:
+    """Get database path from config file"""
+    config = ConfigParser()
+    config.read('config.ini')
+    return Path(config['database']['path'])
+
+
+class ConnectionManager:
+    """Owns the long-lived SQLite connections of this process.
+
+    Connections are kept in a small LIFO pool, so a single-threaded caller
+    always gets the same connection back. A thread keeps the connection it
+    checked out until its outermost `connection()` scope exits, which lets
+    nested calls and transactions share it.
+    """
+
+    def __init__(self, db_path: Union[str, Path], pool_size: int = DEFAULT_POOL_SIZE):
+        self.db_path = Path(db_path)
+        self.pool_size = pool_size
+        self._idle: LifoQueue = LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._local = threading.local()
+
+    def _open(self) -> sqlite3.Connection:
+        """Open a new connection and apply the tuned PRAGMAs"""
+        conn = sqlite3.connect(
+            self.db_path,
+            isolation_level=None,  # transactions are managed explicitly
+            check_same_thread=False,  # the pool hands a connection to one thread at a time
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _checkout(self) -> sqlite3.Connection:
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            conn = self._open()
+            with self._lock:
+                self._all.append(conn)
+            return conn
+
+    def _checkin(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+        self._slots.release()
+
+    def current(self) -> Optional[sqlite3.Connection]:
+        """The connection the current thread holds, if it is inside a `connection()` scope"""
+        return getattr(self._local, 'conn', None)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection for the current thread"""
+        local = self._local
+        if getattr(local, 'conn', None) is not None:
+            yield local.conn
+            return
+
+        conn = self._checkout()
+        local.conn = conn
+        try:
+            yield conn
+        finally:
+            local.conn = None
+            self._checkin(conn)
+
+    @contextmanager
+    def transaction(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        """Run a block of statements in a single transaction.
+
+        Nested scopes join the outermost one, which commits once at the end.
+        Use `immediate` for blocks that read before they write: it takes the
+        write lock up front, so a concurrent writer makes it wait instead of
+        failing with "database is locked" on its first write.
+        """
+        with self.connection() as conn:
+            if conn.in_transaction:
+                yield conn
+                return
+
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def close(self) -> None:
+        """Close every connection opened by this manager"""
+        with self._lock:
+            connections, self._all = self._all, []
+        for conn in connections:
+            conn.close()
+        self._idle = LifoQueue()
+
+
+_manager: Optional[ConnectionManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_manager() -> ConnectionManager:
+    """Return the process-wide connection manager, creating it on first use"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = ConnectionManager(get_db_path())
+    return _manager
+
+
+def configure(db_path: Union[str, Path], pool_size: int = DEFAULT_POOL_SIZE) -> ConnectionManager:
+    """Point the process-wide manager at a specific database"""
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.close()
+        _manager = ConnectionManager(db_path, pool_size)
+    return _manager
+
+
+def close() -> None:
+    """Close the process-wide manager's connections"""
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.close()
+            _manager = None
+
+
+def transaction(immediate: bool = False):
+    """Transaction scope on the process-wide manager"""
+    return get_manager().transaction(immediate)
+
+
+atexit.register(close)
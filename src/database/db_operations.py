@@ -1,93 +1,489 @@
 import sqlite3
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Optional, Dict, Tuple
-from pathlib import Path
-from configparser import ConfigParser
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterator, List, NamedTuple, Optional, Dict, Sequence, Tuple
 import csv
+import hashlib
+import math
+import time
 
 # Use absolute imports
+# NumPy, Pillow, OpenCV, qrcode and Tk are imported by the functions that
+# need them, so commands like `water` start without loading them
 from models.plant import Plant
-from utils.image_viewer import ImageViewer
+from models.plant_batch import PlantBatch
 from database.queries import *
-from utils.qr_handler import QRHandler
+from database.connection import get_manager
+from database.migrations import apply_migrations, LATEST_VERSION
+from database.rows import fetch_rows, iter_rows
+from database.cache import MISSING, PlantCache
+from utils.fuzzy import words, trigrams, similarity, match_expression
+
+if TYPE_CHECKING:
+    from utils.leaf_statistics import LeafStatistics
 
 class DatabaseError(Exception):
     """Custom exception for database operations"""
     pass
 
-def get_db_path() -> Path:
-    """Get database path from config file"""
-    config = ConfigParser()
-    config.read('config.ini')
-    return Path(config['database']['path'])
+# Fuzzy search: vocabulary words considered per query word, plants scored in
+# Python, time allowed for the index lookups, and the similarity a word needs
+FUZZY_TERMS_PER_WORD = 50
+FUZZY_CANDIDATES = 200
+FUZZY_BUDGET_MS = 100
+FUZZY_MIN_SIMILARITY = 0.3
+
+# Rows fetched per keyset page when streaming plant lists
+PAGE_SIZE = 500
+# Cached get_plant_by_id / leaf totals lookups; writes to a plant invalidate its entries
+PLANT_CACHE_SIZE = 1024
+
+# Derivative size `show-image` asks for, and how stale a derivative's
+# last use gets before reading it records a new one
+VIEWER_SIZE = 800
+DERIVATIVE_TOUCH_SECONDS = 3600
+
+_plant_cache = PlantCache(PLANT_CACHE_SIZE)
 
 def _execute_query(query: str, params: Tuple = (), fetch: bool = False) -> Optional[List[tuple]]:
-    """Execute a database query with error handling"""
+    """Execute a database query with error handling
+
+    Runs on the process-wide pooled connection. Outside a `transaction()`
+    scope every write is committed on its own. Fetched rows are namedtuples
+    named after the selected columns.
+    """
     try:
-        with sqlite3.connect(get_db_path()) as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
+        with get_manager().connection() as conn:
+            cursor = conn.execute(query, params)
             if fetch:
-                return cursor.fetchall()
-            conn.commit()
-            return cursor.lastrowid if cursor.lastrowid else None
+                return fetch_rows(cursor)
+            if query.lstrip().upper().startswith('INSERT'):
+                return cursor.lastrowid or None
+            return cursor.rowcount if cursor.rowcount > 0 else None
+    except sqlite3.Error as e:
+        raise DatabaseError(f"Database error: {e}")
+
+def _iter_query(query: str, params: Tuple = ()) -> Iterator[tuple]:
+    """Stream typed rows from a query without materializing the result"""
+    try:
+        with get_manager().connection() as conn:
+            yield from iter_rows(conn.execute(query, params))
+    except sqlite3.Error as e:
+        raise DatabaseError(f"Database error: {e}")
+
+@contextmanager
+def transaction(immediate: bool = False):
+    """Group several operations into one transaction that commits once"""
+    try:
+        with get_manager().transaction(immediate) as conn:
+            yield conn
     except sqlite3.Error as e:
         raise DatabaseError(f"Database error: {e}")
 
 # Database initialization
 def init_db() -> None:
-    """Initialize the database with required tables"""
-    _execute_query(CREATE_PLANTS_TABLE)
-    _execute_query(CREATE_LEAF_RECORDS_TABLE)
-    migrate_database()
+    """Bring the database schema up to date
+
+    Cheap when the schema is current: a single `PRAGMA user_version` read.
+    """
+    try:
+        with get_manager().connection() as conn:
+            apply_migrations(conn)
+    except sqlite3.Error as e:
+        raise DatabaseError(f"Database error: {e}")
 
 # Plant operations
-def add_plant(plant: Plant) -> int:
-    """Add a new plant to the database"""
-    plant_id = _execute_query(INSERT_PLANT, (
+class StoredImage(NamedTuple):
+    """An image just written to the image store"""
+    id: int
+    size: int
+    content_hash: str
+
+def _content_hash(image_data: bytes) -> str:
+    """Key of an image's bytes, shared by its cached derivatives"""
+    return hashlib.sha256(image_data).hexdigest()
+
+def _store_image(image_data: Optional[bytes],
+                 derivatives: Optional[Dict[int, bytes]] = None) -> Optional[StoredImage]:
+    """Save image bytes, and the renditions made while processing them, in the image store
+
+    Bytes already in the store are not saved again: the plant shares the
+    stored copy, and images.ref_count counts the plants sharing it.
+    """
+    if not image_data:
+        return None
+    content_hash = _content_hash(image_data)
+    existing = _execute_query(FIND_IMAGE_BY_HASH, (content_hash,), fetch=True)
+    if existing:
+        return StoredImage(existing[0].id, existing[0].size, content_hash)
+    image_id = _execute_query(INSERT_IMAGE, (image_data, len(image_data), content_hash))
+    _store_derivatives([(content_hash, derivatives or {})])
+    return StoredImage(image_id, len(image_data), content_hash)
+
+def _release_image(image_id: int, content_hash: Optional[str]) -> None:
+    """Delete an image once no plant refers to it, with its cached renditions"""
+    if _execute_query(DELETE_UNREFERENCED_IMAGE, (image_id,)) and content_hash:
+        _execute_query(DELETE_ORPHAN_DERIVATIVES, (content_hash, content_hash))
+
+def _plant_params(plant: Plant, image: Optional[StoredImage]) -> Tuple:
+    """INSERT_PLANT parameters of a plant with its stored image"""
+    return (
         plant.name,
         plant.family,
-        plant.image_data,
+        image.id if image else None,
+        1 if image else 0,
+        image.size if image else None,
+        image.content_hash if image else None,
         plant.image_mime_type,
         plant.birthdate.isoformat() if plant.birthdate else None
-    ))
+    )
+
+def add_plant(plant: Plant, image_data: Optional[bytes] = None,
+              image_derivatives: Optional[Dict[int, bytes]] = None) -> int:
+    """Add a new plant to the database, with its image bytes (and their renditions) if it has one"""
+    # Looks the image up before storing it, so take the write lock first
+    with transaction(immediate=True):
+        image = _store_image(image_data, image_derivatives)
+        plant_id = _execute_query(INSERT_PLANT, _plant_params(plant, image))
     
     if plant_id:
-        # Generate QR code for new plant
-        qr_handler = QRHandler()
-        qr_path = qr_handler.generate_qr(plant_id)
-        print(f"QR code generated: {qr_path}")
+        # Generate QR code for new plant; the CLI reports its path
+        from utils.qr_handler import QRHandler
+        QRHandler().save_qr_code(plant_id)
     
     return plant_id
 
-def get_all_plants() -> List[tuple]:
-    """Get all plants from the database"""
-    return _execute_query(GET_ALL_PLANTS, fetch=True) or []
+def _insert_many(conn: sqlite3.Connection, insert: str, rows: List[Tuple],
+                 max_id: str, ids_after: str) -> List[int]:
+    """executemany `insert` and return the new row IDs in order
+
+    Only valid under the write lock (BEGIN IMMEDIATE), so no other writer can
+    take IDs in between.
+    """
+    if not rows:
+        return []
+    start = conn.execute(max_id).fetchone()[0]
+    conn.executemany(insert, rows)
+    return [row[0] for row in conn.execute(ids_after, (start,))]
+
+def add_plants(plants: Sequence[Tuple[Plant, Optional[bytes], Optional[Dict[int, bytes]]]]) -> List[int]:
+    """Add a batch of (plant, image bytes, image renditions) in one transaction
+
+    Images and plants are each inserted with one executemany; an image
+    already in the store, or repeated in the batch, is stored once. Returns the
+    new plant IDs in order; if any row fails the whole batch is rolled back
+    and DatabaseError raised. Unlike `add_plant`, no QR codes are rendered;
+    pass the IDs to `QRHandler.sync_qr_codes`.
+    """
+    with transaction(immediate=True) as conn:
+        hashes = [_content_hash(data) if data else None for _, data, _ in plants]
+        stored: Dict[str, StoredImage] = {}
+        new: Dict[str, Tuple[bytes, Optional[Dict[int, bytes]]]] = {}
+        for content_hash, (_, data, derivatives) in zip(hashes, plants):
+            if not content_hash or content_hash in stored or content_hash in new:
+                continue
+            existing = conn.execute(FIND_IMAGE_BY_HASH, (content_hash,)).fetchone()
+            if existing:
+                stored[content_hash] = StoredImage(existing[0], existing[1], content_hash)
+            else:
+                new[content_hash] = (data, derivatives)
+
+        # Each distinct new image is inserted once, however many plants share it
+        image_ids = _insert_many(conn, INSERT_IMAGE, [(data, len(data), content_hash)
+                                                      for content_hash, (data, _) in new.items()],
+                                 MAX_IMAGE_ID, IMAGE_IDS_AFTER)
+        for image_id, (content_hash, (data, _)) in zip(image_ids, new.items()):
+            stored[content_hash] = StoredImage(image_id, len(data), content_hash)
+
+        rows = [_plant_params(plant, stored[content_hash] if content_hash else None)
+                for content_hash, (plant, _, _) in zip(hashes, plants)]
+        plant_ids = _insert_many(conn, INSERT_PLANT, rows, MAX_PLANT_ID, PLANT_IDS_AFTER)
+        _store_derivatives([(content_hash, derivatives or {}) for content_hash, (_, derivatives) in new.items()])
+        return plant_ids
 
-def get_plant_by_id(plant_id: int) -> Optional[tuple]:
-    """Get a plant by its ID"""
-    result = _execute_query(GET_PLANT_BY_ID, (plant_id,), fetch=True)
-    return result[0] if result else None
+def get_all_plants(fields: Tuple[str, ...] = PLANT_FIELDS) -> List[tuple]:
+    """Get all plants from the database, selecting only `fields`"""
+    return _execute_query(select_plants(fields, order_by='family, id'), fetch=True) or []
+
+def iter_all_plants(fields: Tuple[str, ...] = PLANT_FIELDS) -> Iterator[tuple]:
+    """Stream all plants from one cursor, ordered by family, selecting only `fields`"""
+    return _iter_query(select_plants(fields, order_by='family, id'))
+
+def get_collection_statistics() -> Tuple[List[tuple], tuple, Optional[float]]:
+    """Read the collection statistics from the trigger-maintained summary tables
+
+    Returns the per-family totals, the age aggregates (in days) and the
+    median age in days, read in one transaction. Costs O(families + distinct
+    birth days), however many plants there are.
+    """
+    with transaction():
+        families = _execute_query(GET_FAMILY_STATISTICS, fetch=True) or []
+        ages = _execute_query(GET_AGE_STATISTICS, fetch=True)[0]
+        median = _execute_query(GET_MEDIAN_AGE, ((ages.aged - 1) // 2, ages.aged // 2), fetch=True)[0]
+    return families, ages, median.median_age_days
+
+def get_plant_by_id(plant_id: int, fields: Tuple[str, ...] = PLANT_FIELDS) -> Optional[tuple]:
+    """Get a plant by its ID, selecting only `fields`"""
+    fields = tuple(fields)
+    return _cached_row(('plant', plant_id, fields), select_plants(fields, where=PLANT_BY_ID_WHERE))
+
+def _cached_row(key: Tuple, query: str) -> Optional[tuple]:
+    """First row of a query on the plant `key[1]`, through the plant cache
+
+    Inside a transaction the cache is bypassed, so uncommitted writes are
+    neither hidden nor cached. Missing plants are not cached. Commits made
+    by other processes are only noticed by `refresh_plant_cache`.
+    """
+    # A thread outside any connection scope cannot be in a transaction, so
+    # hits are served without checking a connection out of the pool
+    manager = get_manager()
+    held = manager.current()
+    in_transaction = held is not None and held.in_transaction
+    if not in_transaction:
+        row, generation = _plant_cache.lookup(key, manager)
+        if row is not MISSING:
+            return row
+    try:
+        with manager.connection() as conn:
+            row = next(iter(fetch_rows(conn.execute(query, (key[1],)))), None)
+    except sqlite3.Error as e:
+        raise DatabaseError(f"Database error: {e}")
+    if row is not None and not in_transaction:
+        _plant_cache.store(key, row, generation)
+    return row
+
+def refresh_plant_cache() -> None:
+    """Drop the cached plant lookups if another connection committed since the last check
+
+    Lookups trust the cache until the next call, so long-lived callers (the
+    daemon, the plant menu, the HTTP API) run this once per command, menu
+    action or request instead of reading `PRAGMA data_version` per lookup.
+    """
+    try:
+        with get_manager().connection() as conn:
+            _plant_cache.sync(get_manager(), id(conn), conn.execute(GET_DATA_VERSION).fetchone()[0])
+    except sqlite3.Error as e:
+        raise DatabaseError(f"Database error: {e}")
+
+def get_cache_stats() -> Dict[str, int]:
+    """Hit and miss counters and size of this process's plant cache"""
+    return _plant_cache.stats()
+
+def _fts_prefix_query(query: str) -> str:
+    """Turn free text into an FTS5 query matching every word as a prefix"""
+    terms = ['"' + word.replace('"', '""') + '"*' for word in query.split()]
+    return ' '.join(terms)
+
+def search_plants(query: str, fields: Tuple[str, ...] = PLANT_FIELDS,
+                  limit: Optional[int] = None) -> List[tuple]:
+    """Search plants by name or family, best matches first, selecting only `fields`
+
+    Every word must match the start of a word in the name or family.
+    """
+    match = _fts_prefix_query(query)
+    if not match:
+        return []
+    search_query = select_plants(
+        fields, join=SEARCH_PLANTS_JOIN, where=SEARCH_PLANTS_WHERE,
+        order_by=SEARCH_PLANTS_ORDER, limit=True
+    )
+    return _execute_query(search_query, (match, limit or -1), fetch=True) or []
+
+def _refresh_plant_terms(conn: sqlite3.Connection) -> None:
+    """Rebuild the vocabulary trigram index if plants changed since the last build
+
+    The rebuild takes the write lock up front, so a concurrent writer (the
+    daemon, the HTTP API) makes it wait for the connection's busy timeout
+    instead of failing with "database is locked"; the versions are checked
+    again under the lock in case another process rebuilt the index meanwhile.
+    """
+    plants_version, terms_version = conn.execute(GET_SEARCH_STATE).fetchone()
+    if plants_version == terms_version:
+        return
+    with get_manager().transaction(immediate=True):
+        plants_version, terms_version = conn.execute(GET_SEARCH_STATE).fetchone()
+        if plants_version == terms_version:
+            return
+        conn.execute(CLEAR_PLANT_TERMS_TRIGRAM)
+        conn.execute(FILL_PLANT_TERMS_TRIGRAM)
+        conn.execute(MARK_PLANT_TERMS_CURRENT)
+
+def _similar_terms(conn: sqlite3.Connection, word: str) -> Dict[str, float]:
+    """Vocabulary words similar enough to `word`, with their similarity"""
+    word_trigrams = trigrams(word)
+    cursor = conn.execute(FUZZY_TERM_CANDIDATES, (match_expression(word_trigrams), FUZZY_TERMS_PER_WORD))
+    scores = {}
+    for (term,) in cursor:
+        score = similarity(word_trigrams, trigrams(term))
+        if score >= FUZZY_MIN_SIMILARITY:
+            scores[term] = score
+    return scores
+
+def _fuzzy_candidates(query_words: List[str]) -> Optional[Tuple[List[Dict[str, float]], List[tuple]]]:
+    """Find similar vocabulary words per query word and the plants using them.
+
+    The index lookups give up after FUZZY_BUDGET_MS and return None.
+    """
+    try:
+        with get_manager().connection() as conn:
+            _refresh_plant_terms(conn)
+            deadline = time.perf_counter() + FUZZY_BUDGET_MS / 1000
+            # A truthy return from the handler interrupts the running query
+            conn.set_progress_handler(lambda: time.perf_counter() > deadline, 1000)
+            try:
+                word_terms = [_similar_terms(conn, word) for word in query_words]
+                # Every query word that matched something must match the plant
+                match = ' AND '.join(
+                    '(' + ' OR '.join(f'"{term}"' for term in terms) + ')'
+                    for terms in word_terms if terms
+                )
+                if not match:
+                    return word_terms, []
+                # Unordered: bm25 would have to score every plant of a family,
+                # and candidates are reranked by word similarity anyway
+                candidates_query = select_plants(
+                    ('id', 'name', 'family'), join=SEARCH_PLANTS_JOIN,
+                    where=SEARCH_PLANTS_WHERE, limit=True
+                )
+                return word_terms, fetch_rows(conn.execute(candidates_query, (match, FUZZY_CANDIDATES)))
+            finally:
+                conn.set_progress_handler(None, 0)
+    except sqlite3.OperationalError as e:
+        if 'interrupted' in str(e):
+            return None
+        raise DatabaseError(f"Database error: {e}")
+    except sqlite3.Error as e:
+        raise DatabaseError(f"Database error: {e}")
 
-def search_plants(query: str) -> List[tuple]:
-    """Search plants by name or family"""
-    search_params = (f'%{query}%', f'%{query}%')
-    return _execute_query(SEARCH_PLANTS, search_params, fetch=True) or []
+class FuzzySearchResult(NamedTuple):
+    """What `fuzzy_search_plants` found, best match first"""
+    plants: List[tuple]
+    # The index lookups ran out of FUZZY_BUDGET_MS, so `plants` is empty
+    timed_out: bool = False
+
+def fuzzy_search_plants(query: str, fields: Tuple[str, ...] = PLANT_FIELDS,
+                        limit: Optional[int] = None) -> FuzzySearchResult:
+    """Typo-tolerant search ranked by trigram similarity, selecting only `fields`
+
+    Query words are matched against the distinct words of plant names and
+    families, so the trigram lookups stay small however many plants share a
+    family. Only the top FUZZY_CANDIDATES plants are scored in Python.
+    """
+    query_words = words(query)
+    if not query_words:
+        return FuzzySearchResult([])
+
+    found = _fuzzy_candidates(query_words)
+    if found is None:
+        return FuzzySearchResult([], timed_out=True)
+    word_terms, candidates = found
+    scored = []
+    for candidate in candidates:
+        plant_words = set(words(f"{candidate.name} {candidate.family}"))
+        score = sum(
+            max((terms.get(word, 0.0) for word in plant_words), default=0.0)
+            for terms in word_terms
+        ) / len(query_words)
+        scored.append((score, candidate.id))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    plant_ids = [plant_id for _, plant_id in scored[:limit or None]]
+    if not plant_ids:
+        return FuzzySearchResult([])
+
+    placeholders = ', '.join('?' * len(plant_ids))
+    rows = _execute_query(select_plants(fields, where=f"id IN ({placeholders})"), tuple(plant_ids), fetch=True)
+    order = {plant_id: rank for rank, plant_id in enumerate(plant_ids)}
+    return FuzzySearchResult(sorted(rows, key=lambda row: order[row.id]))
+
+def _iter_keyset(query: str, params: Tuple, after: Tuple, next_after, limit: Optional[int],
+                 page_size: int) -> Iterator[tuple]:
+    """Yield rows of a keyset-paginated query one page at a time
+
+    `query` takes `params`, then the sort key to resume after, then the page
+    size. `next_after(row)` gives the sort key of a row. No connection or
+    read transaction is held between pages.
+    """
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        rows = _execute_query(query, (*params, *after, size), fetch=True) or []
+        yield from rows
+        if len(rows) < size:
+            return
+        if remaining is not None:
+            remaining -= len(rows)
+        after = next_after(rows[-1])
+
+def iter_plants(after_id: Optional[int] = None, limit: Optional[int] = None,
+                page_size: int = PAGE_SIZE) -> Iterator[tuple]:
+    """Stream PLANT_LIST_FIELDS rows ordered by family and id
+
+    Starts after the plant `after_id`, and stops after `limit` rows.
+    """
+    after = ('', 0)
+    if after_id is not None:
+        plant = get_plant_by_id(after_id, ('family', 'id'))
+        if not plant:
+            raise ValueError(f"Plant with ID {after_id} not found")
+        after = (plant.family, plant.id)
+    return _iter_keyset(LIST_PLANTS_PAGE, (), after, lambda row: (row.family, row.id), limit, page_size)
+
+def _search_rank(match: str, plant_id: int) -> Optional[float]:
+    """bm25 rank of a plant for an FTS5 query, or None when it does not match"""
+    result = _execute_query(GET_PLANT_SEARCH_RANK, (match, plant_id), fetch=True)
+    return result[0].rank if result else None
+
+def iter_search_plants(query: str, after_id: Optional[int] = None, limit: Optional[int] = None,
+                       page_size: int = PAGE_SIZE) -> Iterator[tuple]:
+    """Stream PLANT_LIST_FIELDS rows matching `query`, best matches first
+
+    Starts after the plant `after_id`, and stops after `limit` rows.
+    """
+    match = _fts_prefix_query(query)
+    if not match:
+        return iter(())
+
+    after = (float('-inf'), 0)
+    if after_id is not None:
+        rank = _search_rank(match, after_id)
+        if rank is None:
+            raise ValueError(f"Plant with ID {after_id} does not match '{query}'")
+        after = (rank, after_id)
+    return _iter_keyset(
+        SEARCH_PLANTS_PAGE, (match,), after,
+        lambda row: (_search_rank(match, row.id), row.id), limit, page_size
+    )
 
 def edit_plant(plant_id: int, **kwargs) -> bool:
     """Edit an existing plant's details"""
-    if not get_plant_by_id(plant_id):
-        return False
-        
-    params = (
-        kwargs.get('name'),
-        kwargs.get('family'),
-        kwargs.get('image_data'),
-        kwargs.get('image_mime_type'),
-        kwargs.get('birthdate').isoformat() if kwargs.get('birthdate') else None,
-        plant_id
-    )
-    return bool(_execute_query(UPDATE_PLANT, params))
+    # Reads the current image before writing, so take the write lock first
+    with transaction(immediate=True):
+        plant = get_plant_by_id(plant_id, ('id', 'image_id', 'image_hash'))
+        if not plant:
+            return False
+
+        image = _store_image(kwargs.get('image_data'), kwargs.get('image_derivatives'))
+        params = (
+            kwargs.get('name'),
+            kwargs.get('family'),
+            image.id if image else None,
+            1 if image else None,
+            image.size if image else None,
+            image.content_hash if image else None,
+            kwargs.get('image_mime_type'),
+            kwargs.get('birthdate').isoformat() if kwargs.get('birthdate') else None,
+            plant_id
+        )
+        updated = bool(_execute_query(UPDATE_PLANT, params))
+
+        # Drop the replaced image if no other plant shares it, so the store does not accumulate orphans
+        if updated and image and plant.image_id:
+            _release_image(plant.image_id, plant.image_hash)
+
+    # After the commit, so no concurrent reader caches the old row again
+    _plant_cache.invalidate(plant_id)
+    return updated
 
 def update_last_watered(plant_id: int, date: Optional[datetime] = None) -> bool:
     """Update the last watered date for a plant"""
@@ -97,6 +493,8 @@ def update_last_watered(plant_id: int, date: Optional[datetime] = None) -> bool:
         return True
     except DatabaseError:
         return False
+    finally:
+        _plant_cache.invalidate(plant_id)
 
 def get_watering_info(plant_id: int) -> Optional[Dict]:
     """Get watering information for a plant"""
@@ -119,86 +517,237 @@ def get_watering_info(plant_id: int) -> Optional[Dict]:
 # Leaf record operations
 def add_leaf_record(plant_id: int, date: Optional[datetime] = None) -> bool:
     """Add a new leaf record for a plant"""
-    if not get_plant_by_id(plant_id):
+    if not get_plant_by_id(plant_id, ('id',)):
         return False
 
     date = date or datetime.now()
     try:
+        # Triggers on leaf_records keep the plant's leaf totals current
         _execute_query(ADD_LEAF_RECORD, (plant_id, date.isoformat()))
-        _execute_query(UPDATE_LAST_LEAF_DATE)
         return True
     except DatabaseError:
         return False
+    finally:
+        _plant_cache.invalidate(plant_id)
 
 def get_leaf_statistics(plant_id: int) -> Optional[dict]:
-    """Get leaf statistics for a specific plant"""
-    plant = get_plant_by_id(plant_id)
-    if not plant:
+    """Get leaf statistics for a specific plant from its cached leaf totals"""
+    # The totals are cached; days since the last leaf is computed on every call
+    totals = _cached_row(('leaf_totals', plant_id), GET_LEAF_TOTALS)
+    if not totals:
         return None
 
-    records = _execute_query(GET_LEAF_RECORDS, (plant_id,), fetch=True)
-    leaf_dates = [datetime.fromisoformat(row[0]) for row in records]
-    plant_obj = Plant.from_db_row(plant)
-    plant_obj.leaf_records = leaf_dates
-    return plant_obj.calculate_leaf_statistics()
+    return Plant.leaf_statistics_from_totals(totals.total_leaves, totals.gap_days, totals.last_leaf_date)
+
+def get_all_leaf_statistics(now: Optional[datetime] = None) -> 'LeafStatistics':
+    """Compute leaf statistics for every plant in one vectorized pass over all leaf records"""
+    from utils.leaf_statistics import load_leaf_records, compute_leaf_statistics
+    try:
+        with get_manager().connection() as conn:
+            plant_ids, appeared_us = load_leaf_records(conn.execute(GET_LEAF_DATES_BY_PLANT))
+    except sqlite3.Error as e:
+        raise DatabaseError(f"Database error: {e}")
+    return compute_leaf_statistics(plant_ids, appeared_us, now)
+
+def export_leaf_data(filename: str, with_median: bool = False) -> None:
+    """Export leaf statistics for all plants to a CSV file
 
-def export_leaf_data(filename: str) -> None:
-    """Export leaf statistics for all plants to a CSV file"""
-    plants = get_all_plants()
+    Reads the per-plant leaf totals in a single query and streams them to the writer.
+    The median gap needs every leaf record, so it is only added on request.
+    """
+    batch = get_all_leaf_statistics() if with_median else None
     with open(filename, mode='w', newline='') as file:
         writer = csv.writer(file)
-        writer.writerow([
+        header = [
             'Plant ID', 'Name', 'Total Leaves', 'Avg Days Between Leaves',
             'Days Since Last Leaf'
-        ])
-
-        for plant in plants:
-            plant_id = plant[0]
-            stats = get_leaf_statistics(plant_id)
-            if stats:
-                writer.writerow([
-                    plant_id, plant[1], stats['total_leaves'],
-                    round(stats['avg_days_between_leaves'], 1) if stats['avg_days_between_leaves'] else None,
-                    stats['days_since_last_leaf']
-                ])
+        ]
+        writer.writerow(header + ['Median Days Between Leaves'] if batch else header)
+
+        for plant in _iter_query(EXPORT_LEAF_STATISTICS):
+            stats = Plant.leaf_statistics_from_totals(
+                plant.total_leaves, plant.gap_days, plant.last_leaf_date
+            )
+            row = [
+                plant.id, plant.name, stats['total_leaves'],
+                round(stats['avg_days_between_leaves'], 1) if stats['avg_days_between_leaves'] else None,
+                stats['days_since_last_leaf']
+            ]
+            if batch:
+                i = batch.index_of(plant.id)
+                median = float(batch.median_gap_days[i]) if i is not None else math.nan
+                row.append(None if math.isnan(median) else median)
+            writer.writerow(row)
 
 # Image operations
 def show_plant_image(plant_id: int) -> None:
     """Display the image for a specific plant"""
-    plant = get_plant_by_id(plant_id)
-    if not plant or not plant[3] or not plant[4]:
+    image = get_plant_image(plant_id, VIEWER_SIZE)
+    if not image:
         print("No image available for this plant")
         return
 
+    from utils.image_viewer import ImageViewer
     viewer = ImageViewer()
-    viewer.show_image(plant[3], f"Plant: {plant[1]} {plant[2]}")
+    viewer.show_image(image.data, f"Plant: {image.name} {image.family}")
+
+def get_plant_image(plant_id: int, size: Optional[int] = None) -> Optional[tuple]:
+    """Load a plant's image bytes as (data, image_mime_type, name, family, image_id)
+
+    Stored images are never modified (a new image gets a new ID), so the
+    image ID identifies the bytes. With `size`, the smallest rendition that
+    still covers `size` x `size` pixels is returned instead: a cached
+    derivative, one rendered from the original now and cached, or the
+    original itself when it is no larger or no derivative size is as large.
+    """
+    settings = _image_handler().settings if size is not None else None
+    rendition = settings.rendition_size(size) if settings else None
+    if rendition is not None:
+        cached = _execute_query(GET_PLANT_IMAGE_DERIVATIVE, (plant_id, rendition), fetch=True)
+        if cached:
+            _touch_derivative(cached[0])
+            return cached[0]
+
+    result = _execute_query(GET_PLANT_IMAGE, (plant_id,), fetch=True)
+    if not result or rendition is None:
+        return result[0] if result else None
+
+    image = result[0]
+    data = _image_handler().render(image.data, rendition)
+    if data is None:
+        return image
+    if image.image_hash:
+        _store_derivatives([(image.image_hash, {rendition: data})])
+    return image._replace(data=data, image_mime_type='image/jpeg')
+
+@lru_cache(maxsize=1)
+def _image_handler():
+    """Renders derivatives and holds the [images] settings; Pillow is imported on first use"""
+    from utils.image_handler import ImageHandler
+    return ImageHandler()
+
+def _store_derivatives(images: Sequence[Tuple[str, Dict[int, bytes]]]) -> None:
+    """Cache renditions under their original's content hash, then evict down to the configured total"""
+    now = int(time.time())
+    rows = [
+        (content_hash, size, len(data), now, data)
+        for content_hash, derivatives in images
+        for size, data in derivatives.items()
+    ]
+    if not rows:
+        return
+    with transaction() as conn:
+        conn.executemany(INSERT_IMAGE_DERIVATIVE, rows)
+        _evict_derivatives(conn)
+
+def _evict_derivatives(conn: sqlite3.Connection) -> None:
+    """Delete least recently used derivatives until they fit in derivative_cache_mb"""
+    limit = _image_handler().settings.derivative_cache_mb * 2 ** 20
+    total = conn.execute(GET_DERIVATIVE_CACHE_BYTES).fetchone()[0]
+    if total <= limit:
+        return
+    evicted = []
+    for derivative_id, size in conn.execute(GET_DERIVATIVES_BY_AGE):
+        evicted.append((derivative_id,))
+        total -= size
+        if total <= limit:
+            break
+    conn.executemany(DELETE_IMAGE_DERIVATIVE, evicted)
+
+def _touch_derivative(derivative: tuple) -> None:
+    """Mark a derivative as used, at most once per DERIVATIVE_TOUCH_SECONDS
+
+    Best effort: a busy database only makes its eviction order less exact.
+    """
+    now = int(time.time())
+    if now - derivative.last_used < DERIVATIVE_TOUCH_SECONDS:
+        return
+    try:
+        _execute_query(TOUCH_IMAGE_DERIVATIVE, (now, derivative.derivative_id))
+    except DatabaseError:
+        pass
+
+class DedupeResult(NamedTuple):
+    """What `dedupe_images` collapsed and reclaimed"""
+    duplicates: int
+    bytes_saved: int
+    size_before: int
+    size_after: int
+
+def dedupe_images(vacuum: bool = True) -> DedupeResult:
+    """Collapse images stored more than once onto one copy, then reclaim the space
+
+    Plants pointing at a duplicate are moved to the oldest copy of the same
+    bytes (the ref_count triggers follow) and the duplicate is deleted.
+    VACUUM then rebuilds the file without the free pages, including those
+    left by an earlier `vacuum=False` run; it needs up to the database's
+    size in free disk space, so `vacuum=False` skips it.
+    """
+    size_before = _execute_query(GET_DATABASE_SIZE, fetch=True)[0].bytes
+    duplicates = bytes_saved = 0
+    with transaction(immediate=True):
+        for group in _execute_query(GET_DUPLICATE_IMAGE_HASHES, fetch=True) or []:
+            for duplicate in _execute_query(GET_DUPLICATE_IMAGES, (group.content_hash, group.keep_id), fetch=True):
+                _execute_query(REPOINT_PLANT_IMAGES, (group.keep_id, duplicate.id))
+                if _execute_query(DELETE_UNREFERENCED_IMAGE, (duplicate.id,)):
+                    duplicates += 1
+                    bytes_saved += duplicate.size
+    # After the commit, as in edit_plant: moved plants now report the kept image's ID
+    _plant_cache.clear()
+
+    if vacuum and _execute_query(GET_FREELIST_COUNT, fetch=True)[0].pages:
+        _execute_query("VACUUM")
+    size_after = _execute_query(GET_DATABASE_SIZE, fetch=True)[0].bytes
+    return DedupeResult(duplicates, bytes_saved, size_before, size_after)
 
-# Add this function to db_operations.py
 def migrate_database() -> None:
     """Perform database migrations"""
     try:
-        # Add watering-related columns if they don't exist
-        _execute_query("""
-            ALTER TABLE plants 
-            ADD COLUMN last_watered DATE DEFAULT NULL
-        """, fetch=False)
-    except DatabaseError:
-        pass  # Column might already exist
+        with get_manager().connection() as conn:
+            applied = apply_migrations(conn)
+    except sqlite3.Error as e:
+        raise DatabaseError(f"Database error: {e}")
+    _plant_cache.clear()
+
+    for migration in applied:
+        print(f"Applied migration {migration.version}: {migration.description}")
+    if not applied:
+        print(f"Database schema is up to date (version {LATEST_VERSION})")
+
+    rendered = regenerate_qr_codes()
+    if rendered:
+        print(f"Generated {len(rendered)} missing or stale QR codes")
 
+def load_plant_batch(family: Optional[str] = None) -> PlantBatch:
+    """Load every plant, or those of one family, into a columnar PlantBatch, ordered by ID"""
+    query, params = (GET_PLANT_BATCH, ()) if family is None else (GET_PLANT_BATCH_BY_FAMILY, (family,))
     try:
-        _execute_query("""
-            ALTER TABLE plants 
-            ADD COLUMN watering_interval INTEGER DEFAULT 7
-        """, fetch=False)
-    except DatabaseError:
-        pass  # Column might already exist
+        with get_manager().connection() as conn:
+            return PlantBatch.from_rows(conn.execute(query, params))
+    except sqlite3.Error as e:
+        raise DatabaseError(f"Database error: {e}")
 
-    # Generate QR codes for existing plants
-    plants = get_all_plants()
-    qr_handler = QRHandler()
-    for plant in plants:
-        plant_id = plant[0]
-        qr_handler.save_qr_code(plant_id)  # Use save_qr_code instead of generate_qr
+def get_all_plant_ids() -> List[int]:
+    """Get the IDs of all plants"""
+    return [row[0] for row in _execute_query(GET_ALL_PLANT_IDS, fetch=True) or []]
+
+def get_qr_codes() -> Dict[int, Tuple[str, float]]:
+    """Payload hash and file mtime of every rendered QR code, by plant ID"""
+    return {row.plant_id: (row.payload_hash, row.mtime)
+            for row in _execute_query(GET_QR_CODES, fetch=True) or []}
+
+def record_qr_codes(entries: Sequence[Tuple[int, str, float]]) -> None:
+    """Record (plant ID, payload hash, file mtime) of freshly rendered QR codes"""
+    try:
+        with transaction() as conn:
+            conn.executemany(RECORD_QR_CODE, entries)
+    except sqlite3.Error as e:
+        raise DatabaseError(f"Database error: {e}")
+
+def regenerate_qr_codes(force: bool = False, workers: Optional[int] = None) -> List[int]:
+    """Render QR codes that are missing or stale, or all of them with `force`"""
+    from utils.qr_handler import QRHandler
+    return QRHandler().sync_qr_codes(get_all_plant_ids(), force=force, workers=workers)
 
 def update_watering_interval(plant_id: int, interval: int) -> bool:
     """Update the watering interval for a plant"""
@@ -206,4 +755,6 @@ def update_watering_interval(plant_id: int, interval: int) -> bool:
         _execute_query(UPDATE_WATERING_INTERVAL, (interval, plant_id))
         return True
     except DatabaseError:
-        return False 
+        return False
+    finally:
+        _plant_cache.invalidate(plant_id) 
@@ -0,0 +1,222 @@
+import hashlib
+import sqlite3
+from typing import Callable, List, NamedTuple, Union
+
+from database.queries import (
+    CREATE_PLANTS_TABLE,
+    CREATE_LEAF_RECORDS_TABLE,
+    ALTER_PLANTS_TABLE_ADD_WATERING,
+    ALTER_PLANTS_TABLE_ADD_WATERING_INTERVAL,
+    CREATE_IMAGES_TABLE,
+    ALTER_PLANTS_TABLE_ADD_IMAGE_ID,
+    ALTER_PLANTS_TABLE_ADD_HAS_IMAGE,
+    ALTER_PLANTS_TABLE_ADD_IMAGE_SIZE,
+    MOVE_PLANT_IMAGES,
+    LINK_MOVED_PLANT_IMAGES,
+    ALTER_PLANTS_TABLE_DROP_IMAGE_DATA,
+    CLEAR_PLANT_IMAGE_DATA,
+    ALTER_PLANTS_TABLE_ADD_LEAF_COUNT,
+    ALTER_PLANTS_TABLE_ADD_FIRST_LEAF_DATE,
+    ALTER_PLANTS_TABLE_ADD_LEAF_GAP_DAYS,
+    BACKFILL_LEAF_TOTALS,
+    CREATE_LEAF_APPEND_TRIGGER,
+    CREATE_LEAF_BACKDATED_TRIGGER,
+    CREATE_LEAF_DELETE_TRIGGER,
+    CREATE_LEAF_UPDATE_TRIGGER,
+    CREATE_LEAF_RECORDS_PLANT_DATE_INDEX,
+    CREATE_PLANTS_FAMILY_INDEX,
+    CREATE_PLANTS_FTS_TABLE,
+    CONFIGURE_PLANTS_FTS_RANK,
+    REBUILD_PLANTS_FTS,
+    CREATE_PLANTS_FTS_INSERT_TRIGGER,
+    CREATE_PLANTS_FTS_DELETE_TRIGGER,
+    CREATE_PLANTS_FTS_UPDATE_TRIGGER,
+    CREATE_PLANTS_FTS_VOCAB_TABLE,
+    CREATE_PLANT_TERMS_TRIGRAM_TABLE,
+    CREATE_SEARCH_STATE_TABLE,
+    INIT_SEARCH_STATE,
+    CREATE_SEARCH_STATE_INSERT_TRIGGER,
+    CREATE_SEARCH_STATE_DELETE_TRIGGER,
+    CREATE_SEARCH_STATE_UPDATE_TRIGGER,
+    CREATE_PLANTS_BIRTHDATE_INDEX,
+    DROP_PLANTS_BIRTHDATE_INDEX,
+    CREATE_COLLECTION_STATS_TABLE,
+    CREATE_BIRTHDATE_COUNTS_TABLE,
+    BACKFILL_COLLECTION_STATS,
+    BACKFILL_BIRTHDATE_COUNTS,
+    CREATE_COLLECTION_STATS_INSERT_TRIGGER,
+    CREATE_COLLECTION_STATS_DELETE_TRIGGER,
+    CREATE_COLLECTION_STATS_UPDATE_TRIGGER,
+    ALTER_IMAGES_TABLE_ADD_CONTENT_HASH,
+    ALTER_PLANTS_TABLE_ADD_IMAGE_HASH,
+    GET_UNHASHED_IMAGE_IDS,
+    GET_IMAGE_DATA,
+    SET_IMAGE_CONTENT_HASH,
+    BACKFILL_PLANT_IMAGE_HASHES,
+    CREATE_IMAGES_CONTENT_HASH_INDEX,
+    CREATE_IMAGE_DERIVATIVES_TABLE,
+    CREATE_IMAGE_DERIVATIVES_LAST_USED_INDEX,
+    ALTER_IMAGES_TABLE_ADD_REF_COUNT,
+    CREATE_PLANTS_IMAGE_ID_INDEX,
+    BACKFILL_IMAGE_REF_COUNTS,
+    CREATE_IMAGE_REF_COUNT_INSERT_TRIGGER,
+    CREATE_IMAGE_REF_COUNT_DELETE_TRIGGER,
+    CREATE_IMAGE_REF_COUNT_UPDATE_TRIGGER,
+    CREATE_QR_CODES_TABLE,
+)
+
+# A step is either a SQL statement or a callable receiving the connection
+Step = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    steps: List[Step]
+
+
+def _add_column_if_missing(table: str, column: str, statement: str) -> Callable[[sqlite3.Connection], None]:
+    """Build a step that only runs ALTER TABLE when the column is absent.
+
+    Databases created before versioning may already have the column.
+    """
+    def step(conn: sqlite3.Connection) -> None:
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            conn.execute(statement)
+    return step
+
+
+def _drop_plant_image_data(conn: sqlite3.Connection) -> None:
+    """Drop the inline BLOB column, or empty it on SQLite < 3.35"""
+    try:
+        conn.execute(ALTER_PLANTS_TABLE_DROP_IMAGE_DATA)
+    except sqlite3.OperationalError:
+        conn.execute(CLEAR_PLANT_IMAGE_DATA)
+
+
+def _hash_stored_images(conn: sqlite3.Connection) -> None:
+    """Record the SHA-256 of every stored image, one blob in memory at a time"""
+    for (image_id,) in conn.execute(GET_UNHASHED_IMAGE_IDS).fetchall():
+        data = conn.execute(GET_IMAGE_DATA, (image_id,)).fetchone()[0]
+        conn.execute(SET_IMAGE_CONTENT_HASH, (hashlib.sha256(data).hexdigest(), image_id))
+
+
+# Ordered list of schema changes; append new migrations to the end
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Create plants and leaf_records tables", [
+        CREATE_PLANTS_TABLE,
+        CREATE_LEAF_RECORDS_TABLE,
+    ]),
+    Migration(2, "Add watering columns to plants", [
+        _add_column_if_missing('plants', 'last_watered', ALTER_PLANTS_TABLE_ADD_WATERING),
+        _add_column_if_missing('plants', 'watering_interval', ALTER_PLANTS_TABLE_ADD_WATERING_INTERVAL),
+    ]),
+    Migration(3, "Move image BLOBs out of plants into the images table", [
+        CREATE_IMAGES_TABLE,
+        ALTER_PLANTS_TABLE_ADD_IMAGE_ID,
+        ALTER_PLANTS_TABLE_ADD_HAS_IMAGE,
+        ALTER_PLANTS_TABLE_ADD_IMAGE_SIZE,
+        MOVE_PLANT_IMAGES,
+        LINK_MOVED_PLANT_IMAGES,
+        _drop_plant_image_data,
+    ]),
+    Migration(4, "Maintain per-plant leaf totals with triggers", [
+        ALTER_PLANTS_TABLE_ADD_LEAF_COUNT,
+        ALTER_PLANTS_TABLE_ADD_FIRST_LEAF_DATE,
+        ALTER_PLANTS_TABLE_ADD_LEAF_GAP_DAYS,
+        BACKFILL_LEAF_TOTALS,
+        CREATE_LEAF_APPEND_TRIGGER,
+        CREATE_LEAF_BACKDATED_TRIGGER,
+        CREATE_LEAF_DELETE_TRIGGER,
+        CREATE_LEAF_UPDATE_TRIGGER,
+    ]),
+    Migration(5, "Index leaf records by plant and date, and plants by family", [
+        CREATE_LEAF_RECORDS_PLANT_DATE_INDEX,
+        CREATE_PLANTS_FAMILY_INDEX,
+    ]),
+    Migration(6, "Add FTS5 full-text index over plant names and families", [
+        CREATE_PLANTS_FTS_TABLE,
+        CONFIGURE_PLANTS_FTS_RANK,
+        REBUILD_PLANTS_FTS,
+        CREATE_PLANTS_FTS_INSERT_TRIGGER,
+        CREATE_PLANTS_FTS_DELETE_TRIGGER,
+        CREATE_PLANTS_FTS_UPDATE_TRIGGER,
+    ]),
+    Migration(7, "Add trigram index over the search vocabulary for fuzzy search", [
+        CREATE_PLANTS_FTS_VOCAB_TABLE,
+        CREATE_PLANT_TERMS_TRIGRAM_TABLE,
+        CREATE_SEARCH_STATE_TABLE,
+        INIT_SEARCH_STATE,
+        CREATE_SEARCH_STATE_INSERT_TRIGGER,
+        CREATE_SEARCH_STATE_DELETE_TRIGGER,
+        CREATE_SEARCH_STATE_UPDATE_TRIGGER,
+    ]),
+    Migration(8, "Index plants by birthdate for report age statistics", [
+        CREATE_PLANTS_BIRTHDATE_INDEX,
+    ]),
+    Migration(9, "Maintain per-family collection statistics with triggers", [
+        CREATE_COLLECTION_STATS_TABLE,
+        CREATE_BIRTHDATE_COUNTS_TABLE,
+        BACKFILL_COLLECTION_STATS,
+        BACKFILL_BIRTHDATE_COUNTS,
+        CREATE_COLLECTION_STATS_INSERT_TRIGGER,
+        CREATE_COLLECTION_STATS_DELETE_TRIGGER,
+        CREATE_COLLECTION_STATS_UPDATE_TRIGGER,
+        DROP_PLANTS_BIRTHDATE_INDEX,
+    ]),
+    Migration(10, "Hash stored images and cache downscaled renditions of them", [
+        _add_column_if_missing('images', 'content_hash', ALTER_IMAGES_TABLE_ADD_CONTENT_HASH),
+        _add_column_if_missing('plants', 'image_hash', ALTER_PLANTS_TABLE_ADD_IMAGE_HASH),
+        _hash_stored_images,
+        BACKFILL_PLANT_IMAGE_HASHES,
+        CREATE_IMAGES_CONTENT_HASH_INDEX,
+        CREATE_IMAGE_DERIVATIVES_TABLE,
+        CREATE_IMAGE_DERIVATIVES_LAST_USED_INDEX,
+    ]),
+    Migration(11, "Count the plants sharing each stored image", [
+        _add_column_if_missing('images', 'ref_count', ALTER_IMAGES_TABLE_ADD_REF_COUNT),
+        CREATE_PLANTS_IMAGE_ID_INDEX,
+        BACKFILL_IMAGE_REF_COUNTS,
+        CREATE_IMAGE_REF_COUNT_INSERT_TRIGGER,
+        CREATE_IMAGE_REF_COUNT_DELETE_TRIGGER,
+        CREATE_IMAGE_REF_COUNT_UPDATE_TRIGGER,
+    ]),
+    Migration(12, "Record rendered QR codes in the database instead of manifest.json", [
+        CREATE_QR_CODES_TABLE,
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Read the schema version stored in the database header"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn: sqlite3.Connection) -> List[Migration]:
+    """Bring the schema up to LATEST_VERSION and return the migrations applied.
+
+    When the schema is already current this is a single PRAGMA read.
+    """
+    if get_schema_version(conn) >= LATEST_VERSION:
+        return []
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Re-read under the write lock in case another process migrated first
+        current = get_schema_version(conn)
+        pending = [m for m in MIGRATIONS if m.version > current]
+        for migration in pending:
+            for step in migration.steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f"PRAGMA user_version = {migration.version}")
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    return pending
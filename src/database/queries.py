@@ -1,3 +1,11 @@
+from functools import lru_cache
+from typing import Dict, Tuple
+
+# Queries (and triggers) that read a whole table, or sort without an index, on purpose:
+# name -> reason, registered right after each query. tests/test_query_plans.py
+# fails on any other full scan.
+FULL_SCAN_ALLOWED: Dict[str, str] = {}
+
 CREATE_PLANTS_TABLE = '''
     CREATE TABLE IF NOT EXISTS plants (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -20,34 +28,342 @@ CREATE_LEAF_RECORDS_TABLE = '''
     )
 '''
 
-INSERT_PLANT = '''
-    INSERT INTO plants (name, family, image_data, image_mime_type, birthdate, created_at)
-    VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+CREATE_IMAGES_TABLE = '''
+    CREATE TABLE IF NOT EXISTS images (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        data BLOB NOT NULL,
+        size INTEGER NOT NULL
+    )
 '''
 
-SEARCH_PLANTS = '''
-    SELECT * FROM plants
-    WHERE name LIKE ? OR family LIKE ?
+# Selectable plant columns; has_image sits where image_data used to be
+PLANT_FIELDS = (
+    'id', 'name', 'family', 'has_image', 'image_mime_type', 'birthdate', 'created_at',
+    'last_leaf_date', 'last_watered', 'watering_interval', 'image_id', 'image_size', 'image_hash',
+)
+
+# Projections for the call sites that only need some columns
+PLANT_LIST_FIELDS = PLANT_FIELDS[:8]
+PLANT_LABEL_FIELDS = ('id', 'name', 'family')
+PLANT_REPORT_FIELDS = ('id', 'name', 'family', 'has_image', 'birthdate', 'created_at')
+
+@lru_cache(maxsize=None)
+def select_plants(fields: Tuple[str, ...] = PLANT_FIELDS, where: str = '', order_by: str = '',
+                  join: str = '', limit: bool = False) -> str:
+    """Build a SELECT on plants that returns only the requested columns
+
+    `join` adds a JOIN clause and `limit` a `LIMIT ?` placeholder.
+    """
+    unknown = set(fields) - set(PLANT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown plant columns: {', '.join(sorted(unknown))}")
+
+    query = f"SELECT {', '.join(f'plants.{field}' for field in fields)} FROM plants"
+    if join:
+        query += f" {join}"
+    if where:
+        query += f" WHERE {where}"
+    if order_by:
+        query += f" ORDER BY {order_by}"
+    if limit:
+        query += " LIMIT ?"
+    return query
+
+# Full-text search over name and family, best bm25 rank first
+SEARCH_PLANTS_JOIN = 'JOIN plants_fts ON plants_fts.rowid = plants.id'
+SEARCH_PLANTS_WHERE = 'plants_fts MATCH ?'
+SEARCH_PLANTS_ORDER = 'plants_fts.rank'
+PLANT_BY_ID_WHERE = 'id = ?'
+
+# Keyset pagination: each page resumes after the sort key of the previous
+# page's last row, so deep pages cost the same as the first one
+LIST_PLANTS_ORDER = 'plants.family, plants.id'
+LIST_PLANTS_AFTER_WHERE = '(plants.family, plants.id) > (?, ?)'
+# Search pages sort on (rank, id) so plants with equal rank keep a stable order
+SEARCH_PLANTS_PAGE_ORDER = 'plants_fts.rank, plants.id'
+SEARCH_PLANTS_AFTER_WHERE = f"{SEARCH_PLANTS_WHERE} AND (plants_fts.rank, plants.id) > (?, ?)"
+
+INSERT_PLANT = '''
+    INSERT INTO plants (name, family, image_id, has_image, image_size, image_hash, image_mime_type, birthdate,
+                        created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
 '''
 
+SEARCH_PLANTS = select_plants(
+    join=SEARCH_PLANTS_JOIN, where=SEARCH_PLANTS_WHERE, order_by=SEARCH_PLANTS_ORDER, limit=True
+)
+
 UPDATE_PLANT = '''
     UPDATE plants
     SET name = COALESCE(?, name),
         family = COALESCE(?, family),
-        image_data = COALESCE(?, image_data),
+        image_id = COALESCE(?, image_id),
+        has_image = COALESCE(?, has_image),
+        image_size = COALESCE(?, image_size),
+        image_hash = COALESCE(?, image_hash),
         image_mime_type = COALESCE(?, image_mime_type),
         birthdate = COALESCE(?, birthdate)
     WHERE id = ?
 '''
 
-GET_PLANT_BY_ID = '''
-    SELECT * FROM plants
+GET_PLANT_BY_ID = select_plants(where=PLANT_BY_ID_WHERE)
+
+GET_ALL_PLANTS = select_plants(order_by='family, id')
+
+LIST_PLANTS_PAGE = select_plants(
+    PLANT_LIST_FIELDS, where=LIST_PLANTS_AFTER_WHERE, order_by=LIST_PLANTS_ORDER, limit=True
+)
+
+SEARCH_PLANTS_PAGE = select_plants(
+    PLANT_LIST_FIELDS, join=SEARCH_PLANTS_JOIN, where=SEARCH_PLANTS_AFTER_WHERE,
+    order_by=SEARCH_PLANTS_PAGE_ORDER, limit=True
+)
+FULL_SCAN_ALLOWED['SEARCH_PLANTS_PAGE'] = 'bm25 rank is computed per match, so matches are always sorted'
+
+GET_PLANT_SEARCH_RANK = '''
+    SELECT rank
+    FROM plants_fts
+    WHERE plants_fts MATCH ? AND rowid = ?
+'''
+
+INSERT_IMAGE = '''
+    INSERT INTO images (data, size, content_hash)
+    VALUES (?, ?, ?)
+'''
+
+# IDs given to a batch inserted under the write lock: everything above the
+# previous maximum, in insertion order (AUTOINCREMENT never reuses an ID)
+MAX_PLANT_ID = 'SELECT COALESCE(MAX(id), 0) AS max_id FROM plants'
+PLANT_IDS_AFTER = 'SELECT id FROM plants WHERE id > ? ORDER BY id'
+MAX_IMAGE_ID = 'SELECT COALESCE(MAX(id), 0) AS max_id FROM images'
+IMAGE_IDS_AFTER = 'SELECT id FROM images WHERE id > ? ORDER BY id'
+
+# An image no plant refers to any more
+DELETE_UNREFERENCED_IMAGE = '''
+    DELETE FROM images
+    WHERE id = ? AND ref_count <= 0
+'''
+
+# Identical bytes already in the store, so a new plant can share them
+FIND_IMAGE_BY_HASH = '''
+    SELECT id, size
+    FROM images
+    WHERE content_hash = ?
+    ORDER BY id
+    LIMIT 1
+'''
+
+GET_PLANT_IMAGE = '''
+    SELECT images.data, plants.image_mime_type, plants.name, plants.family, images.id AS image_id,
+           plants.image_hash
+    FROM plants
+    JOIN images ON images.id = plants.image_id
+    WHERE plants.id = ?
+'''
+
+# Downscaled renditions of stored images, keyed by content hash. The blob is
+# the last column, so the bookkeeping columns stay on the row's first page
+CREATE_IMAGE_DERIVATIVES_TABLE = '''
+    CREATE TABLE IF NOT EXISTS image_derivatives (
+        id INTEGER PRIMARY KEY,
+        content_hash TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        bytes INTEGER NOT NULL,
+        last_used INTEGER NOT NULL,
+        data BLOB NOT NULL,
+        UNIQUE (content_hash, size)
+    )
+'''
+
+# Covers the cache total and the least recently used order for eviction
+CREATE_IMAGE_DERIVATIVES_LAST_USED_INDEX = '''
+    CREATE INDEX IF NOT EXISTS idx_image_derivatives_last_used
+    ON image_derivatives (last_used, bytes)
+'''
+
+CREATE_IMAGES_CONTENT_HASH_INDEX = '''
+    CREATE INDEX IF NOT EXISTS idx_images_content_hash
+    ON images (content_hash)
+'''
+
+GET_UNHASHED_IMAGE_IDS = '''
+    SELECT id
+    FROM images
+    WHERE content_hash IS NULL
+'''
+
+GET_IMAGE_DATA = '''
+    SELECT data
+    FROM images
     WHERE id = ?
 '''
 
-GET_ALL_PLANTS = '''
-    SELECT * FROM plants
-    ORDER BY family
+SET_IMAGE_CONTENT_HASH = '''
+    UPDATE images
+    SET content_hash = ?
+    WHERE id = ?
+'''
+
+ALTER_IMAGES_TABLE_ADD_REF_COUNT = '''
+    ALTER TABLE images
+    ADD COLUMN ref_count INTEGER NOT NULL DEFAULT 0
+'''
+
+CREATE_PLANTS_IMAGE_ID_INDEX = '''
+    CREATE INDEX IF NOT EXISTS idx_plants_image_id
+    ON plants (image_id)
+'''
+
+BACKFILL_IMAGE_REF_COUNTS = '''
+    UPDATE images
+    SET ref_count = (SELECT COUNT(*) FROM plants WHERE plants.image_id = images.id)
+'''
+FULL_SCAN_ALLOWED['BACKFILL_IMAGE_REF_COUNTS'] = 'one-off migration over every image'
+
+# images.ref_count counts the plants pointing at each image
+CREATE_IMAGE_REF_COUNT_INSERT_TRIGGER = '''
+    CREATE TRIGGER IF NOT EXISTS images_ref_count_after_plant_insert
+    AFTER INSERT ON plants
+    WHEN NEW.image_id IS NOT NULL
+    BEGIN
+        UPDATE images SET ref_count = ref_count + 1 WHERE id = NEW.image_id;
+    END
+'''
+
+CREATE_IMAGE_REF_COUNT_DELETE_TRIGGER = '''
+    CREATE TRIGGER IF NOT EXISTS images_ref_count_after_plant_delete
+    AFTER DELETE ON plants
+    WHEN OLD.image_id IS NOT NULL
+    BEGIN
+        UPDATE images SET ref_count = ref_count - 1 WHERE id = OLD.image_id;
+    END
+'''
+
+CREATE_IMAGE_REF_COUNT_UPDATE_TRIGGER = '''
+    CREATE TRIGGER IF NOT EXISTS images_ref_count_after_plant_update
+    AFTER UPDATE OF image_id ON plants
+    WHEN OLD.image_id IS NOT NEW.image_id
+    BEGIN
+        UPDATE images SET ref_count = ref_count - 1 WHERE id = OLD.image_id;
+        UPDATE images SET ref_count = ref_count + 1 WHERE id = NEW.image_id;
+    END
+'''
+
+# Content hashes stored more than once, with the copy to keep; reads only the index
+GET_DUPLICATE_IMAGE_HASHES = '''
+    SELECT content_hash, MIN(id) AS keep_id
+    FROM images
+    WHERE content_hash IS NOT NULL
+    GROUP BY content_hash
+    HAVING COUNT(*) > 1
+'''
+
+GET_DUPLICATE_IMAGES = '''
+    SELECT id, size
+    FROM images
+    WHERE content_hash = ? AND id != ?
+'''
+
+REPOINT_PLANT_IMAGES = '''
+    UPDATE plants
+    SET image_id = ?
+    WHERE image_id = ?
+'''
+
+GET_DATABASE_SIZE = '''
+    SELECT page_count * page_size AS bytes
+    FROM pragma_page_count(), pragma_page_size()
+'''
+
+# Pages left unused inside the file, which only VACUUM gives back
+GET_FREELIST_COUNT = 'SELECT freelist_count AS pages FROM pragma_freelist_count()'
+
+BACKFILL_PLANT_IMAGE_HASHES = '''
+    UPDATE plants
+    SET image_hash = (SELECT content_hash FROM images WHERE images.id = plants.image_id)
+    WHERE image_id IS NOT NULL
+'''
+
+INSERT_IMAGE_DERIVATIVE = '''
+    INSERT OR REPLACE INTO image_derivatives (content_hash, size, bytes, last_used, data)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+GET_PLANT_IMAGE_DERIVATIVE = '''
+    SELECT image_derivatives.data, 'image/jpeg' AS image_mime_type, plants.name, plants.family,
+           plants.image_id, image_derivatives.id AS derivative_id, image_derivatives.last_used
+    FROM plants
+    JOIN image_derivatives ON image_derivatives.content_hash = plants.image_hash
+    WHERE plants.id = ? AND image_derivatives.size = ?
+'''
+
+TOUCH_IMAGE_DERIVATIVE = '''
+    UPDATE image_derivatives
+    SET last_used = ?
+    WHERE id = ?
+'''
+
+GET_DERIVATIVE_CACHE_BYTES = 'SELECT COALESCE(SUM(bytes), 0) AS total FROM image_derivatives'
+
+GET_DERIVATIVES_BY_AGE = '''
+    SELECT id, bytes
+    FROM image_derivatives
+    ORDER BY last_used
+'''
+
+DELETE_IMAGE_DERIVATIVE = '''
+    DELETE FROM image_derivatives
+    WHERE id = ?
+'''
+
+# Renditions of an image nothing else stores the same bytes as
+DELETE_ORPHAN_DERIVATIVES = '''
+    DELETE FROM image_derivatives
+    WHERE content_hash = ?
+      AND NOT EXISTS (SELECT 1 FROM images WHERE content_hash = ?)
+'''
+
+# PlantBatch columns; birth_day counts days since 1970-01-01 (NULL without a valid birthdate)
+GET_PLANT_BATCH = '''
+    SELECT id, name, family, has_image,
+           CAST(julianday(date(birthdate)) - 2440587.5 AS INTEGER) AS birth_day
+    FROM plants
+    ORDER BY id
+'''
+FULL_SCAN_ALLOWED['GET_PLANT_BATCH'] = 'loads every plant into a PlantBatch'
+
+GET_PLANT_BATCH_BY_FAMILY = '''
+    SELECT id, name, family, has_image,
+           CAST(julianday(date(birthdate)) - 2440587.5 AS INTEGER) AS birth_day
+    FROM plants
+    WHERE family = ?
+    ORDER BY id
+'''
+
+GET_ALL_PLANT_IDS = '''
+    SELECT id FROM plants
+    ORDER BY id
+'''
+FULL_SCAN_ALLOWED['GET_ALL_PLANT_IDS'] = 'lists every plant ID for QR code regeneration'
+
+# Payload hash and file mtime of each rendered QR code, so unchanged codes are skipped
+CREATE_QR_CODES_TABLE = '''
+    CREATE TABLE IF NOT EXISTS qr_codes (
+        plant_id INTEGER PRIMARY KEY,
+        payload_hash TEXT NOT NULL,
+        mtime REAL NOT NULL
+    )
+'''
+
+GET_QR_CODES = '''
+    SELECT plant_id, payload_hash, mtime
+    FROM qr_codes
+'''
+FULL_SCAN_ALLOWED['GET_QR_CODES'] = 'regen-qr checks the rendered code of every plant'
+
+RECORD_QR_CODE = '''
+    INSERT OR REPLACE INTO qr_codes (plant_id, payload_hash, mtime)
+    VALUES (?, ?, ?)
 '''
 
 ADD_LEAF_RECORD = '''
@@ -61,12 +377,421 @@ GET_LEAF_RECORDS = '''
     ORDER BY appearance_date
 '''
 
-UPDATE_LAST_LEAF_DATE = '''
-    UPDATE plants 
-    SET last_leaf_date = (
-        SELECT MAX(appearance_date)
-        FROM leaf_records
-        WHERE leaf_records.plant_id = plants.id);
+def leaf_gap_days(earlier: str, later: str) -> str:
+    """SQL for the whole days between two ISO timestamps.
+
+    Matches `timedelta.days` exactly: calendar-day difference, minus one when
+    the later time of day is before the earlier one. Avoids julianday()
+    floating point on full timestamps.
+    """
+    return (f"(CAST(julianday(date({later})) - julianday(date({earlier})) AS INTEGER)"
+            f" - (substr({later}, 12) < substr({earlier}, 12)))")
+
+# Every leaf date, one row per plant: far fewer Python objects than one row
+# per record for the batch statistics engine
+GET_LEAF_DATES_BY_PLANT = '''
+    SELECT plant_id, group_concat(appearance_date) AS appearance_dates
+    FROM leaf_records
+    GROUP BY plant_id
+'''
+
+def recompute_leaf_totals(plant_id: str) -> str:
+    """SQL that recomputes a plant's cached leaf columns from leaf_records.
+
+    `plant_id` is an SQL expression, e.g. `NEW.plant_id` inside a trigger or
+    `plants.id` to backfill every plant.
+    """
+    return f'''
+        UPDATE plants
+        SET leaf_count = (
+                SELECT COUNT(*) FROM leaf_records WHERE plant_id = {plant_id}),
+            first_leaf_date = (
+                SELECT MIN(appearance_date) FROM leaf_records WHERE plant_id = {plant_id}),
+            last_leaf_date = (
+                SELECT MAX(appearance_date) FROM leaf_records WHERE plant_id = {plant_id}),
+            leaf_gap_days = COALESCE((
+                SELECT SUM({leaf_gap_days('previous_date', 'appearance_date')})
+                FROM (
+                    SELECT appearance_date,
+                           LAG(appearance_date) OVER (ORDER BY appearance_date) AS previous_date
+                    FROM leaf_records
+                    WHERE plant_id = {plant_id}
+                )), 0)
+        WHERE id = {plant_id};
+    '''
+
+ALTER_PLANTS_TABLE_ADD_LEAF_COUNT = '''
+    ALTER TABLE plants
+    ADD COLUMN leaf_count INTEGER NOT NULL DEFAULT 0
+'''
+
+ALTER_PLANTS_TABLE_ADD_FIRST_LEAF_DATE = '''
+    ALTER TABLE plants
+    ADD COLUMN first_leaf_date TIMESTAMP
+'''
+
+# Sum of whole days between consecutive leaves, for the average interval
+ALTER_PLANTS_TABLE_ADD_LEAF_GAP_DAYS = '''
+    ALTER TABLE plants
+    ADD COLUMN leaf_gap_days INTEGER NOT NULL DEFAULT 0
+'''
+
+BACKFILL_LEAF_TOTALS = recompute_leaf_totals('plants.id')
+FULL_SCAN_ALLOWED['BACKFILL_LEAF_TOTALS'] = 'one-off migration over every plant'
+
+# The common case, a leaf newer than the plant's last one, is an O(1) update
+CREATE_LEAF_APPEND_TRIGGER = f'''
+    CREATE TRIGGER IF NOT EXISTS leaf_records_after_insert_append
+    AFTER INSERT ON leaf_records
+    WHEN NEW.appearance_date >= COALESCE(
+        (SELECT last_leaf_date FROM plants WHERE id = NEW.plant_id), '')
+    BEGIN
+        UPDATE plants
+        SET leaf_count = leaf_count + 1,
+            first_leaf_date = COALESCE(first_leaf_date, NEW.appearance_date),
+            leaf_gap_days = leaf_gap_days
+                + COALESCE({leaf_gap_days('last_leaf_date', 'NEW.appearance_date')}, 0),
+            last_leaf_date = NEW.appearance_date
+        WHERE id = NEW.plant_id;
+    END
+'''
+
+# Back-dated leaves change an interval in the middle; recompute that plant only
+CREATE_LEAF_BACKDATED_TRIGGER = f'''
+    CREATE TRIGGER IF NOT EXISTS leaf_records_after_insert_backdated
+    AFTER INSERT ON leaf_records
+    WHEN NEW.appearance_date < (SELECT last_leaf_date FROM plants WHERE id = NEW.plant_id)
+    BEGIN
+        {recompute_leaf_totals('NEW.plant_id')}
+    END
+'''
+
+CREATE_LEAF_DELETE_TRIGGER = f'''
+    CREATE TRIGGER IF NOT EXISTS leaf_records_after_delete
+    AFTER DELETE ON leaf_records
+    BEGIN
+        {recompute_leaf_totals('OLD.plant_id')}
+    END
+'''
+
+CREATE_LEAF_UPDATE_TRIGGER = f'''
+    CREATE TRIGGER IF NOT EXISTS leaf_records_after_update
+    AFTER UPDATE OF plant_id, appearance_date ON leaf_records
+    BEGIN
+        {recompute_leaf_totals('OLD.plant_id')}
+        {recompute_leaf_totals('NEW.plant_id')}
+    END
+'''
+
+CREATE_LEAF_RECORDS_PLANT_DATE_INDEX = '''
+    CREATE INDEX IF NOT EXISTS idx_leaf_records_plant_date
+    ON leaf_records (plant_id, appearance_date)
+'''
+
+# Also serves ORDER BY family, id: every index entry ends with the rowid
+CREATE_PLANTS_FAMILY_INDEX = '''
+    CREATE INDEX IF NOT EXISTS idx_plants_family
+    ON plants (family)
+'''
+
+# Covered the report's age aggregates and its median lookup until migration 9
+CREATE_PLANTS_BIRTHDATE_INDEX = '''
+    CREATE INDEX IF NOT EXISTS idx_plants_birthdate
+    ON plants (birthdate)
+'''
+
+# Age statistics read birthdate_counts instead, so the index is only write overhead
+DROP_PLANTS_BIRTHDATE_INDEX = '''
+    DROP INDEX IF EXISTS idx_plants_birthdate
+'''
+
+# External-content FTS5 index over plants(name, family)
+CREATE_PLANTS_FTS_TABLE = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS plants_fts
+    USING fts5(name, family, content='plants', content_rowid='id')
+'''
+
+# Rank name matches above family matches
+CONFIGURE_PLANTS_FTS_RANK = '''
+    INSERT INTO plants_fts (plants_fts, rank)
+    VALUES ('rank', 'bm25(2.0, 1.0)')
+'''
+
+REBUILD_PLANTS_FTS = '''
+    INSERT INTO plants_fts (plants_fts)
+    VALUES ('rebuild')
+'''
+
+CREATE_PLANTS_FTS_INSERT_TRIGGER = '''
+    CREATE TRIGGER IF NOT EXISTS plants_fts_after_insert
+    AFTER INSERT ON plants
+    BEGIN
+        INSERT INTO plants_fts (rowid, name, family)
+        VALUES (NEW.id, NEW.name, NEW.family);
+    END
+'''
+
+CREATE_PLANTS_FTS_DELETE_TRIGGER = '''
+    CREATE TRIGGER IF NOT EXISTS plants_fts_after_delete
+    AFTER DELETE ON plants
+    BEGIN
+        INSERT INTO plants_fts (plants_fts, rowid, name, family)
+        VALUES ('delete', OLD.id, OLD.name, OLD.family);
+    END
+'''
+
+CREATE_PLANTS_FTS_UPDATE_TRIGGER = '''
+    CREATE TRIGGER IF NOT EXISTS plants_fts_after_update
+    AFTER UPDATE OF name, family ON plants
+    BEGIN
+        INSERT INTO plants_fts (plants_fts, rowid, name, family)
+        VALUES ('delete', OLD.id, OLD.name, OLD.family);
+        INSERT INTO plants_fts (rowid, name, family)
+        VALUES (NEW.id, NEW.name, NEW.family);
+    END
+'''
+
+# Distinct words of plant names and families, read from the FTS5 index
+CREATE_PLANTS_FTS_VOCAB_TABLE = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS plants_fts_vocab
+    USING fts5vocab(plants_fts, 'row')
+'''
+
+# Trigram index over that vocabulary (padded words), for typo-tolerant search
+CREATE_PLANT_TERMS_TRIGRAM_TABLE = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS plant_terms_trigram
+    USING fts5(padded, term UNINDEXED, tokenize='trigram')
+'''
+
+# The trigram index is rebuilt lazily when plants_version moves past terms_version
+CREATE_SEARCH_STATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS search_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        plants_version INTEGER NOT NULL DEFAULT 1,
+        terms_version INTEGER NOT NULL DEFAULT 0
+    )
+'''
+
+INIT_SEARCH_STATE = '''
+    INSERT OR IGNORE INTO search_state (id)
+    VALUES (1)
+'''
+
+CREATE_SEARCH_STATE_INSERT_TRIGGER = '''
+    CREATE TRIGGER IF NOT EXISTS search_state_after_plant_insert
+    AFTER INSERT ON plants
+    BEGIN
+        UPDATE search_state SET plants_version = plants_version + 1;
+    END
+'''
+FULL_SCAN_ALLOWED['CREATE_SEARCH_STATE_INSERT_TRIGGER'] = 'search_state holds a single row'
+
+CREATE_SEARCH_STATE_DELETE_TRIGGER = '''
+    CREATE TRIGGER IF NOT EXISTS search_state_after_plant_delete
+    AFTER DELETE ON plants
+    BEGIN
+        UPDATE search_state SET plants_version = plants_version + 1;
+    END
+'''
+FULL_SCAN_ALLOWED['CREATE_SEARCH_STATE_DELETE_TRIGGER'] = 'search_state holds a single row'
+
+CREATE_SEARCH_STATE_UPDATE_TRIGGER = '''
+    CREATE TRIGGER IF NOT EXISTS search_state_after_plant_update
+    AFTER UPDATE OF name, family ON plants
+    BEGIN
+        UPDATE search_state SET plants_version = plants_version + 1;
+    END
+'''
+FULL_SCAN_ALLOWED['CREATE_SEARCH_STATE_UPDATE_TRIGGER'] = 'search_state holds a single row'
+
+GET_SEARCH_STATE = '''
+    SELECT plants_version, terms_version
+    FROM search_state
+    WHERE id = 1
+'''
+
+CLEAR_PLANT_TERMS_TRIGRAM = '''
+    DELETE FROM plant_terms_trigram
+'''
+
+FILL_PLANT_TERMS_TRIGRAM = '''
+    INSERT INTO plant_terms_trigram (padded, term)
+    SELECT '  ' || term || ' ', term
+    FROM plants_fts_vocab
+'''
+
+MARK_PLANT_TERMS_CURRENT = '''
+    UPDATE search_state
+    SET terms_version = plants_version
+    WHERE id = 1
+'''
+
+# Vocabulary words sharing the most (and rarest) trigrams with a query word
+FUZZY_TERM_CANDIDATES = '''
+    SELECT term
+    FROM plant_terms_trigram
+    WHERE plant_terms_trigram MATCH ?
+    ORDER BY rank
+    LIMIT ?
+'''
+
+# Collection summary, kept current by triggers on plants so the report and
+# the summary command read O(families) rows instead of scanning plants
+CREATE_COLLECTION_STATS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS collection_stats (
+        family TEXT PRIMARY KEY,
+        plants INTEGER NOT NULL,
+        with_images INTEGER NOT NULL,
+        aged INTEGER NOT NULL,
+        birth_julianday_sum REAL NOT NULL,
+        leaf_count INTEGER NOT NULL
+    ) WITHOUT ROWID
+'''
+
+# Plants per birth day, for the median and extreme ages
+CREATE_BIRTHDATE_COUNTS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS birthdate_counts (
+        birth_day TEXT PRIMARY KEY,
+        plants INTEGER NOT NULL
+    ) WITHOUT ROWID
+'''
+
+BACKFILL_COLLECTION_STATS = '''
+    INSERT INTO collection_stats (family, plants, with_images, aged, birth_julianday_sum, leaf_count)
+    SELECT family, COUNT(*), SUM(has_image), COUNT(julianday(birthdate)),
+           TOTAL(julianday(birthdate)), SUM(leaf_count)
+    FROM plants
+    GROUP BY family
+'''
+
+BACKFILL_BIRTHDATE_COUNTS = '''
+    INSERT INTO birthdate_counts (birth_day, plants)
+    SELECT date(birthdate), COUNT(*)
+    FROM plants
+    WHERE date(birthdate) IS NOT NULL
+    GROUP BY date(birthdate)
+'''
+FULL_SCAN_ALLOWED['BACKFILL_BIRTHDATE_COUNTS'] = 'one-off migration over every plant'
+
+def add_to_collection_stats(row: str) -> str:
+    """SQL that counts a plant in the summary tables.
+
+    `row` is the trigger row alias, `NEW` or `OLD`.
+    """
+    return f'''
+        INSERT INTO collection_stats (family, plants, with_images, aged, birth_julianday_sum, leaf_count)
+        VALUES ({row}.family, 1, {row}.has_image, julianday({row}.birthdate) IS NOT NULL,
+                COALESCE(julianday({row}.birthdate), 0), {row}.leaf_count)
+        ON CONFLICT (family) DO UPDATE
+        SET plants = plants + 1,
+            with_images = with_images + excluded.with_images,
+            aged = aged + excluded.aged,
+            birth_julianday_sum = birth_julianday_sum + excluded.birth_julianday_sum,
+            leaf_count = leaf_count + excluded.leaf_count;
+        INSERT INTO birthdate_counts (birth_day, plants)
+        SELECT date({row}.birthdate), 1
+        WHERE date({row}.birthdate) IS NOT NULL
+        ON CONFLICT (birth_day) DO UPDATE
+        SET plants = plants + 1;
+    '''
+
+def remove_from_collection_stats(row: str) -> str:
+    """SQL that uncounts a plant from the summary tables, dropping emptied rows"""
+    return f'''
+        UPDATE collection_stats
+        SET plants = plants - 1,
+            with_images = with_images - {row}.has_image,
+            aged = aged - (julianday({row}.birthdate) IS NOT NULL),
+            birth_julianday_sum = birth_julianday_sum - COALESCE(julianday({row}.birthdate), 0),
+            leaf_count = leaf_count - {row}.leaf_count
+        WHERE family = {row}.family;
+        DELETE FROM collection_stats
+        WHERE family = {row}.family AND plants = 0;
+        UPDATE birthdate_counts
+        SET plants = plants - 1
+        WHERE birth_day = date({row}.birthdate);
+        DELETE FROM birthdate_counts
+        WHERE birth_day = date({row}.birthdate) AND plants = 0;
+    '''
+
+CREATE_COLLECTION_STATS_INSERT_TRIGGER = f'''
+    CREATE TRIGGER IF NOT EXISTS collection_stats_after_plant_insert
+    AFTER INSERT ON plants
+    BEGIN
+        {add_to_collection_stats('NEW')}
+    END
+'''
+
+CREATE_COLLECTION_STATS_DELETE_TRIGGER = f'''
+    CREATE TRIGGER IF NOT EXISTS collection_stats_after_plant_delete
+    AFTER DELETE ON plants
+    BEGIN
+        {remove_from_collection_stats('OLD')}
+    END
+'''
+
+# Also fires for the leaf_count updates made by the leaf_records triggers
+CREATE_COLLECTION_STATS_UPDATE_TRIGGER = f'''
+    CREATE TRIGGER IF NOT EXISTS collection_stats_after_plant_update
+    AFTER UPDATE OF family, has_image, birthdate, leaf_count ON plants
+    BEGIN
+        {remove_from_collection_stats('OLD')}
+        {add_to_collection_stats('NEW')}
+    END
+'''
+
+
+# Ages are in days; birthdates are stored as local time. Youngest and oldest
+# are measured from the start of the birth day
+GET_FAMILY_STATISTICS = '''
+    SELECT family, plants, with_images, aged,
+           julianday('now', 'localtime') - birth_julianday_sum / NULLIF(aged, 0) AS mean_age_days,
+           leaf_count
+    FROM collection_stats
+    ORDER BY family
+'''
+FULL_SCAN_ALLOWED['GET_FAMILY_STATISTICS'] = 'collection_stats holds one row per family'
+
+GET_AGE_STATISTICS = '''
+    SELECT aged,
+           julianday('now', 'localtime') - birth_julianday_sum / aged AS mean_age_days,
+           julianday('now', 'localtime') - (SELECT julianday(MAX(birth_day)) FROM birthdate_counts) AS min_age_days,
+           julianday('now', 'localtime') - (SELECT julianday(MIN(birth_day)) FROM birthdate_counts) AS max_age_days
+    FROM (
+        SELECT COALESCE(SUM(aged), 0) AS aged, TOTAL(birth_julianday_sum) AS birth_julianday_sum
+        FROM collection_stats
+    )
+'''
+FULL_SCAN_ALLOWED['GET_AGE_STATISTICS'] = 'collection_stats holds one row per family'
+
+# Birth days holding the lower and upper middle plants (0-based ranks),
+# found through running totals of birthdate_counts
+GET_MEDIAN_AGE = '''
+    WITH running AS (
+        SELECT birth_day, SUM(plants) OVER (ORDER BY birth_day) AS through
+        FROM birthdate_counts
+    )
+    SELECT julianday('now', 'localtime') - (
+               julianday((SELECT MIN(birth_day) FROM running WHERE through > ?))
+             + julianday((SELECT MIN(birth_day) FROM running WHERE through > ?))
+           ) / 2 AS median_age_days
+'''
+FULL_SCAN_ALLOWED['GET_MEDIAN_AGE'] = 'birthdate_counts holds one row per birth day'
+
+# Changes whenever another connection commits; used to keep the plant cache honest
+GET_DATA_VERSION = 'PRAGMA data_version'
+
+# Leaf statistics straight from the columns maintained by the leaf_records triggers
+GET_LEAF_TOTALS = '''
+    SELECT leaf_count AS total_leaves, leaf_gap_days AS gap_days, last_leaf_date
+    FROM plants
+    WHERE id = ?
+'''
+
+EXPORT_LEAF_STATISTICS = '''
+    SELECT id, name, leaf_count AS total_leaves, leaf_gap_days AS gap_days, last_leaf_date
+    FROM plants
+    ORDER BY family, id
 '''
 
 ALTER_PLANTS_TABLE_ADD_WATERING = '''
@@ -74,12 +799,76 @@ ALTER_PLANTS_TABLE_ADD_WATERING = '''
     ADD COLUMN last_watered TIMESTAMP
 '''
 
+ALTER_PLANTS_TABLE_ADD_WATERING_INTERVAL = '''
+    ALTER TABLE plants
+    ADD COLUMN watering_interval INTEGER DEFAULT 7
+'''
+
+ALTER_PLANTS_TABLE_ADD_IMAGE_ID = '''
+    ALTER TABLE plants
+    ADD COLUMN image_id INTEGER REFERENCES images (id)
+'''
+
+ALTER_PLANTS_TABLE_ADD_HAS_IMAGE = '''
+    ALTER TABLE plants
+    ADD COLUMN has_image INTEGER NOT NULL DEFAULT 0
+'''
+
+ALTER_PLANTS_TABLE_ADD_IMAGE_SIZE = '''
+    ALTER TABLE plants
+    ADD COLUMN image_size INTEGER
+'''
+
+# Image ids reuse the plant id when moving inline BLOBs into the image store
+MOVE_PLANT_IMAGES = '''
+    INSERT INTO images (id, data, size)
+    SELECT id, image_data, length(image_data)
+    FROM plants
+    WHERE image_data IS NOT NULL
+'''
+
+LINK_MOVED_PLANT_IMAGES = '''
+    UPDATE plants
+    SET image_id = id,
+        has_image = 1,
+        image_size = length(image_data)
+    WHERE image_data IS NOT NULL
+'''
+
+ALTER_PLANTS_TABLE_DROP_IMAGE_DATA = '''
+    ALTER TABLE plants
+    DROP COLUMN image_data
+'''
+
+CLEAR_PLANT_IMAGE_DATA = '''
+    UPDATE plants
+    SET image_data = NULL
+    WHERE image_data IS NOT NULL
+'''
+
+ALTER_IMAGES_TABLE_ADD_CONTENT_HASH = '''
+    ALTER TABLE images
+    ADD COLUMN content_hash TEXT
+'''
+
+# Copy of the image's content hash, readable without touching the image row
+ALTER_PLANTS_TABLE_ADD_IMAGE_HASH = '''
+    ALTER TABLE plants
+    ADD COLUMN image_hash TEXT
+'''
+
 UPDATE_LAST_WATERED = '''
     UPDATE plants
     SET last_watered = ?
     WHERE id = ?
 '''
 
+UPDATE_WATERING_INTERVAL = '''
+    UPDATE plants
+    SET watering_interval = ?
+    WHERE id = ?
+'''
+
 GET_WATERING_INFO = '''
     SELECT last_watered
     FROM plants
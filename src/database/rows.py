@@ -0,0 +1,31 @@
+import sqlite3
+from collections import namedtuple
+from functools import lru_cache
+from typing import Iterator, List, Tuple
+
+
+@lru_cache(maxsize=None)
+def row_type(fields: Tuple[str, ...]) -> type:
+    """Return the (cached) namedtuple class for a column projection"""
+    return namedtuple('Row', fields, rename=True)
+
+
+def _cursor_row_type(cursor: sqlite3.Cursor) -> type:
+    return row_type(tuple(column[0] for column in cursor.description))
+
+
+def fetch_rows(cursor: sqlite3.Cursor) -> List[tuple]:
+    """Fetch all rows of an executed cursor as typed rows.
+
+    The row class is resolved once per query from the cursor description,
+    so each row costs a single tuple allocation.
+    """
+    make = _cursor_row_type(cursor)._make
+    return [make(row) for row in cursor]
+
+
+def iter_rows(cursor: sqlite3.Cursor) -> Iterator[tuple]:
+    """Lazily yield typed rows from an executed cursor"""
+    make = _cursor_row_type(cursor)._make
+    for row in cursor:
+        yield make(row)
@@ -1,23 +1,21 @@
 #!/usr/bin/env python3
 import configparser
-import os
+import sys
 import logging
 from datetime import datetime
+from functools import cached_property
 from typing import List, Optional, Tuple
 from pathlib import Path
-from tabulate import tabulate
-import cv2
 import time
 
+# Only light modules at the top: tabulate, Pillow, OpenCV, qrcode, NumPy and
+# Tk are imported by the handlers that need them (see COMMANDS)
 from models.plant import Plant
 from database import db_operations as db
-from utils.image_handler import ImageHandler
-from utils.plantdata_processor import PlantDataProcessor
-from utils.report_generator import ReportGenerator
+from database.queries import PLANT_LIST_FIELDS, PLANT_LABEL_FIELDS, PLANT_REPORT_FIELDS
+from utils.report_generator import ReportGenerator, DAYS_PER_MONTH
 from cli.argument_parser import create_parser, validate_args
-from utils.qr_handler import QRHandler
-from utils.image_viewer import ImageViewer
-from utils.plant_interaction import PlantInteraction
+from utils.plant_output import PlantOutput
 
 # Configure logging
 logging.basicConfig(
@@ -28,11 +26,28 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class PlantCatalogueApp:
-    def __init__(self):
-        self.report_gen = ReportGenerator()
-        self.plantdata_processor = PlantDataProcessor(ImageHandler())
-        self.qr_handler = QRHandler()
-        self.plant_interaction = PlantInteraction()
+    PLANT_LIST_HEADERS = ['ID', 'Name', 'Family', 'Image', 'MIME Type', 'Birthdate', 'Created At', 'Last Leaf Date']
+
+    # Components are created on first use, so each command only pays for its own dependencies
+    @cached_property
+    def report_gen(self) -> ReportGenerator:
+        return ReportGenerator()
+
+    @cached_property
+    def plantdata_processor(self):
+        from utils.image_handler import ImageHandler
+        from utils.plantdata_processor import PlantDataProcessor
+        return PlantDataProcessor(ImageHandler())
+
+    @cached_property
+    def qr_handler(self):
+        from utils.qr_handler import QRHandler
+        return QRHandler()
+
+    @cached_property
+    def plant_interaction(self):
+        from utils.plant_interaction import PlantInteraction
+        return PlantInteraction()
 
     def setup(self) -> None:
         """Initialize application setup"""
@@ -45,25 +60,44 @@ class PlantCatalogueApp:
         for folder in folders:
             Path(folder).mkdir(exist_ok=True)
 
-    def list_plants(self) -> None:
-        """Display all plants in tabulated format"""
-        results = db.get_all_plants()
-        if not results:
-            print("No plants found")
+    def list_plants(self, args) -> None:
+        """Stream plants ordered by family, one page at a time"""
+        try:
+            rows = db.iter_plants(after_id=args.after_id, limit=args.page_size)
+        except ValueError as e:
+            print(e)
             return
-
-        formatted_results = self._format_plant_results(results)
-        headers = ['ID', 'Name', 'Family', 'Image', 'MIME Type', 'Birthdate', 'Created At', 'Last Leaf Date']
-        print(tabulate(formatted_results, headers=headers, tablefmt='simple'))
+        self._write_plant_page(rows, args)
 
     def add_plant(self, args) -> None:
         """Add a new plant to the database"""
         plant_data = self.plantdata_processor(args)
-        plant = Plant(**plant_data)
-        plant_id = db.add_plant(plant)
+        image_data = plant_data.pop('image_data', None)
+        derivatives = plant_data.pop('image_derivatives', None)
+        plant_id = db.add_plant(Plant(**plant_data), image_data, derivatives)
+        qr_path = self.qr_handler.get_qr_path(plant_id)
+        if qr_path.exists():
+            print(f"QR code generated: {qr_path}")
         print(f"Plant added successfully with ID: {plant_id}")
 
-    def edit_plant(self, args) -> None:
+    def import_plants(self, args) -> None:
+        """Add every plant of a CSV or JSON lines manifest"""
+        from utils.plant_import import ManifestError, PlantImporter
+        importer = PlantImporter(args.batch_size, args.workers)
+        try:
+            result = importer.run(Path(args.manifest), render_qr=not args.no_qr)
+        except (OSError, ManifestError) as e:
+            print(f"Could not import {args.manifest}: {e}")
+            return
+
+        for line, reason in sorted(result.failed):
+            print(f"Line {line}: {reason}")
+        print(f"Imported {len(result.imported)} plants in {result.seconds:.2f}s "
+              f"({result.rows_per_second:.0f} rows/s), {len(result.failed)} failed")
+        if result.qr_rendered:
+            print(f"Rendered {result.qr_rendered} QR codes in {result.qr_seconds:.2f}s")
+
+    def edit_plant(self, args) -> Optional[int]:
         """Edit an existing plant"""
         plant_data = self.plantdata_processor(args)
         if db.edit_plant(plant_id=args.id, **plant_data):
@@ -71,14 +105,40 @@ class PlantCatalogueApp:
             self._show_updated_plant(args.id)
         else:
             print("Failed to update plant")
+            return 1
 
-    def generate_report(self) -> None:
+    def generate_report(self, args) -> None:
         """Generate a plant report"""
-        plants = db.get_all_plants()
-        report_path = self.report_gen.generate_plant_report(plants)
+        # One read transaction, so the statistics match the listed plants
+        with db.transaction():
+            stats = self.report_gen.statistics_from_aggregates(*db.get_collection_statistics())
+            plants = db.iter_all_plants(PLANT_REPORT_FIELDS)
+            report_path = self.report_gen.generate_plant_report(plants, stats)
         print(f"Report generated: {report_path}")
 
-    def add_leaf_record(self, args) -> None:
+    def show_summary(self, args) -> None:
+        """Display per-family totals from the collection summary"""
+        from tabulate import tabulate
+        families, ages, _ = db.get_collection_statistics()
+        if not families:
+            print("No plants found")
+            return
+
+        rows = [
+            (row.family, row.plants, row.with_images, self._months(row.mean_age_days), row.leaf_count)
+            for row in families
+        ]
+        rows.append((
+            'Total',
+            sum(row.plants for row in families),
+            sum(row.with_images for row in families),
+            self._months(ages.mean_age_days),
+            sum(row.leaf_count for row in families),
+        ))
+        headers = ['Family', 'Plants', 'With Images', 'Avg Age (months)', 'Leaves']
+        print(tabulate(rows, headers=headers, floatfmt='.1f'))
+
+    def add_leaf_record(self, args) -> Optional[int]:
         """Add a new leaf record"""
         if not args.id:
             print("Please provide a plant ID")
@@ -89,23 +149,49 @@ class PlantCatalogueApp:
             print(f"Leaf record added for plant {args.id}")
         else:
             print("Failed to add leaf record")
+            return 1
 
     def show_leaf_stats(self, args) -> None:
         """Display leaf statistics"""
         if args.id:
             self._show_single_plant_stats(args.id)
         else:
-            self._export_all_plant_stats()
+            self._export_all_plant_stats(args.median)
 
     def search_plants(self, args) -> None:
-        """Search for plants"""
-        results = db.search_plants(args.query)
-        if results:
-            formatted_results = self._format_plant_results(results)
-            headers = ['ID', 'Name', 'Family', 'Image', 'MIME Type', 'Birthdate', 'Created At', 'Last Leaf Date']
-            print(tabulate(formatted_results, headers=headers))
+        """Search for plants, best matches first"""
+        limit = min(filter(None, (args.limit, args.page_size)), default=None)
+        if args.fuzzy:
+            # Fuzzy results are ranked in memory, so page through the ranked list
+            found = db.fuzzy_search_plants(args.query, PLANT_LIST_FIELDS, limit=args.limit)
+            if found.timed_out:
+                print(f"Fuzzy search exceeded its {db.FUZZY_BUDGET_MS} ms budget", file=sys.stderr)
+            results = found.plants
+            ids = [plant.id for plant in results]
+            if args.after_id is not None and args.after_id not in ids:
+                print(f"Plant with ID {args.after_id} does not match '{args.query}'")
+                return
+            start = ids.index(args.after_id) + 1 if args.after_id is not None else 0
+            rows = iter(results[start:start + limit] if limit else results[start:])
         else:
-            print("No plants found")
+            try:
+                rows = db.iter_search_plants(args.query, after_id=args.after_id, limit=limit)
+            except ValueError as e:
+                print(e)
+                return
+        self._write_plant_page(rows, args)
+
+    def _write_plant_page(self, rows, args) -> None:
+        """Print streamed PLANT_LIST_FIELDS rows, then where the next page starts"""
+        output = PlantOutput(args.format, self.PLANT_LIST_HEADERS, self._format_plant_row)
+        last = output.write(rows)
+        if last is None:
+            if args.format == 'table':
+                print("No plants found")
+            return
+        if output.written == args.page_size:
+            # On stderr so piped csv/jsonl output stays clean
+            print(f"Next page: --after-id {last.id}", file=sys.stderr)
 
     def show_plant_image(self, args) -> None:
         """Display plant image"""
@@ -114,7 +200,18 @@ class PlantCatalogueApp:
             return
         db.show_plant_image(args.id)
 
-    def scan_and_interact(self) -> None:
+    def show_gallery(self, args) -> None:
+        """Browse plant thumbnails in a scrollable grid"""
+        from utils.gallery import Gallery, gallery_plants
+        plants = gallery_plants(args.family, args.query)
+        if not len(plants):
+            print("No plants found")
+            return
+
+        from utils.gallery_window import GalleryWindow
+        GalleryWindow(Gallery(plants, cache_size=args.cache_size)).show()
+
+    def scan_and_interact(self, args) -> None:
         """Scan QR code and interact with plant"""
         print("Scanning plant QR code...")
         plant_id = self.qr_handler.scan_qr(show_image=True)
@@ -123,7 +220,7 @@ class PlantCatalogueApp:
             print("No QR code detected")
             return
 
-        plant = db.get_plant_by_id(plant_id)
+        plant = db.get_plant_by_id(plant_id, ('id',))
         if not plant:
             print("Plant not found")
             return
@@ -132,13 +229,12 @@ class PlantCatalogueApp:
 
     def _show_updated_plant(self, plant_id: int) -> None:
         """Show updated plant details"""
-        plant = db.get_plant_by_id(plant_id)
+        from tabulate import tabulate
+        plant = db.get_plant_by_id(plant_id, PLANT_LIST_FIELDS)
         if plant:
             print("\nUpdated plant details:")
-            headers = ['ID', 'Name', 'Family', 'Image', 'MIME Type', 'Birthdate', 'Created At', 'Last Leaf Date']
-            formatted_plant = list(plant[:8])  # ID, Name, Family, Image, MIME Type, Birthdate, Created At, Last Leaf Date
-            formatted_plant[3] = "Yes" if formatted_plant[3] else "No"
-            print(tabulate([formatted_plant], headers=headers))
+            formatted_plant = plant._replace(has_image="Yes" if plant.has_image else "No")
+            print(tabulate([formatted_plant], headers=self.PLANT_LIST_HEADERS))
 
     def _show_single_plant_stats(self, plant_id: int) -> None:
         """Show statistics for a single plant"""
@@ -147,15 +243,15 @@ class PlantCatalogueApp:
             print("No statistics available")
             return
 
-        plant = db.get_plant_by_id(plant_id)
-        print(f"\nLeaf Statistics for {plant[1]}:")
+        plant = db.get_plant_by_id(plant_id, PLANT_LABEL_FIELDS)
+        print(f"\nLeaf Statistics for {plant.name}:")
         print(f"Total leaves: {stats['total_leaves']}")
         if stats['avg_days_between_leaves']:
             print(f"Average days between leaves: {stats['avg_days_between_leaves']:.1f}")
         if stats['days_since_last_leaf'] is not None:
             print(f"Days since last leaf: {stats['days_since_last_leaf']}")
 
-    def _export_all_plant_stats(self) -> None:
+    def _export_all_plant_stats(self, with_median: bool = False) -> None:
         """Export statistics for all plants"""
         config = configparser.ConfigParser()
         config.read("config.ini")
@@ -163,10 +259,10 @@ class PlantCatalogueApp:
         reports_dir.mkdir(exist_ok=True)
         
         filename = reports_dir / f"leaf_statistics_{datetime.now().strftime('%Y%m%d')}.csv"
-        db.export_leaf_data(str(filename))
+        db.export_leaf_data(str(filename), with_median)
         print(f"Leaf statistics successfully exported to: {filename}")
 
-    def list_qr_codes(self) -> None:
+    def list_qr_codes(self, args) -> None:
         """List all available QR codes"""
         qr_dir = Path('data/qr_codes')
         if not qr_dir.exists():
@@ -181,15 +277,73 @@ class PlantCatalogueApp:
         print("\nAvailable QR codes:")
         for qr_file in qr_files:
             plant_id = int(qr_file.stem.split('_')[1])
-            plant = db.get_plant_by_id(plant_id)
+            plant = db.get_plant_by_id(plant_id, PLANT_LABEL_FIELDS)
             if plant:
-                print(f"Plant {plant_id}: {plant[1]} - {qr_file}")
+                print(f"Plant {plant_id}: {plant.name} - {qr_file}")
 
-    def migrate(self) -> None:
+    def migrate(self, args) -> None:
         """Perform database migrations"""
         db.migrate_database()
 
-    def water_plant(self, args) -> None:
+    def dedupe_images(self, args) -> None:
+        """Store each distinct image once and reclaim the space of the copies"""
+        result = db.dedupe_images(vacuum=not args.no_vacuum)
+        mib = 2 ** 20
+        if result.duplicates:
+            print(f"Removed {result.duplicates} duplicate images ({result.bytes_saved / mib:.1f} MiB of image data)")
+        else:
+            print("No duplicate images found")
+        if result.size_after != result.size_before:
+            print(f"Database size: {result.size_before / mib:.1f} MiB -> {result.size_after / mib:.1f} MiB "
+                  f"({(result.size_after - result.size_before) / mib:+.1f} MiB)")
+        if args.no_vacuum and result.duplicates:
+            print("Freed pages are reused by new data; run again without --no-vacuum to shrink the file")
+
+    def show_cache_stats(self, args) -> None:
+        """Show the plant cache counters (of the daemon, when run through client.py)"""
+        stats = db.get_cache_stats()
+        lookups = stats['hits'] + stats['misses']
+        print(f"Plant cache: {stats['hits']} hits, {stats['misses']} misses", end='')
+        print(f" ({stats['hits'] / lookups:.0%} hit rate)" if lookups else '')
+        print(f"Entries: {stats['size']} of {stats['maxsize']}")
+
+    def serve(self, args) -> None:
+        """Keep the app and its database connection warm, running commands sent by client.py"""
+        from cli.daemon import serve, socket_path
+        parser = create_parser()
+        serve(args.socket or socket_path(), lambda argv: self.run(parser, argv))
+
+    def serve_http(self, args) -> None:
+        """Serve the catalogue operations as a local HTTP/JSON API"""
+        from api.server import serve_http
+        serve_http(self, args.host, args.port, args.workers)
+
+    def run(self, parser, argv: List[str]) -> int:
+        """Run one command line against this (already set up) app; returns its exit status"""
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit as e:
+            # argparse exits after printing usage or help
+            return e.code if isinstance(e.code, int) else 1
+
+        try:
+            return dispatch(self, args)
+        except Exception as e:
+            logger.error(f"Unexpected error: {e}", exc_info=True)
+            print("An unexpected error occurred. Check errors.log for details.")
+            return 1
+
+    def regenerate_qr_codes(self, args) -> None:
+        """Render missing or stale QR codes"""
+        start = time.perf_counter()
+        rendered = db.regenerate_qr_codes(force=args.force, workers=args.workers)
+        elapsed = time.perf_counter() - start
+        if rendered:
+            print(f"Rendered {len(rendered)} QR codes in {elapsed:.2f}s")
+        else:
+            print("All QR codes are up to date")
+
+    def water_plant(self, args) -> Optional[int]:
         """Record watering for a plant"""
         if not args.id:
             print("Please provide a plant ID")
@@ -200,6 +354,7 @@ class PlantCatalogueApp:
             self._show_watering_info(args.id)
         else:
             print("Failed to record watering")
+            return 1
 
     def show_water_info(self, args) -> None:
         """Show watering information for a plant"""
@@ -223,26 +378,73 @@ class PlantCatalogueApp:
         else:
             print("Plant has never been watered")
 
-    def _format_plant_results(self, results: List[Tuple]) -> List[List]:
-        """Format plant results for display"""
-        formatted_results = []
-        for plant in results:
-            # Take only the first 8 columns and convert to list
-            formatted_plant = list(plant[:8])  # ID, Name, Family, Image, MIME Type, Birthdate, Created At, Last Leaf Date
-            
-            # Convert image data to Yes/No
-            formatted_plant[3] = "Yes" if formatted_plant[3] else "No"
-            
-            # Format dates if they exist
-            for i in [5, 6, 7]:  # birthdate, created_at, last_leaf_date
-                if formatted_plant[i]:
-                    try:
-                        date = datetime.fromisoformat(formatted_plant[i])
-                        formatted_plant[i] = date.strftime('%Y-%m-%d')
-                    except (ValueError, TypeError):
-                        pass
-            formatted_results.append(formatted_plant[:8])  # Ensure we only take first 8 columns
-        return formatted_results
+    @classmethod
+    def _format_plant_row(cls, plant: Tuple) -> Tuple:
+        """Format a PLANT_LIST_FIELDS row for display"""
+        return plant._replace(
+            has_image="Yes" if plant.has_image else "No",
+            birthdate=cls._format_date(plant.birthdate),
+            created_at=cls._format_date(plant.created_at),
+            last_leaf_date=cls._format_date(plant.last_leaf_date),
+        )
+
+    @staticmethod
+    def _months(days: Optional[float]) -> Optional[float]:
+        """Convert an age in days to months"""
+        return days / DAYS_PER_MONTH if days is not None else None
+
+    @staticmethod
+    def _parse_date(date_str: str) -> datetime:
+        """Parse a YYYY-MM-DD command line date"""
+        return datetime.strptime(date_str, '%Y-%m-%d')
+
+    @staticmethod
+    def _format_date(value: Optional[str]) -> Optional[str]:
+        """Format an ISO date string as YYYY-MM-DD, leaving other values as-is"""
+        if not value:
+            return value
+        try:
+            return datetime.fromisoformat(value).strftime('%Y-%m-%d')
+        except (ValueError, TypeError):
+            return value
+
+# Command name -> PlantCatalogueApp handler, resolved only for the command being run
+COMMANDS = {
+    'list': 'list_plants',
+    'add-plant': 'add_plant',
+    'import-plants': 'import_plants',
+    'edit-plant': 'edit_plant',
+    'report': 'generate_report',
+    'summary': 'show_summary',
+    'add-leaf': 'add_leaf_record',
+    'leaf-stats': 'show_leaf_stats',
+    'show-image': 'show_plant_image',
+    'gallery': 'show_gallery',
+    'search-plant': 'search_plants',
+    'scan': 'scan_and_interact',
+    'list-qr': 'list_qr_codes',
+    'regen-qr': 'regenerate_qr_codes',
+    'migrate': 'migrate',
+    'dedupe-images': 'dedupe_images',
+    'water': 'water_plant',
+    'water-info': 'show_water_info',
+    'cache-stats': 'show_cache_stats',
+    'serve': 'serve',
+    'serve-http': 'serve_http',
+}
+
+# Exit status of a command line that fails validation, as argparse uses for usage errors
+INVALID_ARGS_STATUS = 2
+
+def dispatch(app: PlantCatalogueApp, args) -> int:
+    """Validate parsed arguments and run the command's handler; returns the exit status"""
+    if not validate_args(args):
+        return INVALID_ARGS_STATUS
+    # A daemon's cache outlives its commands; drop it if another process wrote since
+    db.refresh_plant_cache()
+    handler = getattr(app, COMMANDS[args.command])
+    # Handlers return 1 when they report a failure, and nothing otherwise
+    return handler(args) or 0
 
 def main() -> None:
     try:
@@ -251,33 +453,13 @@ def main() -> None:
 
         parser = create_parser()
         args = parser.parse_args()
-
-        if not validate_args(args):
-            return
-
-        # Command dispatch dictionary
-        commands = {
-            'list': app.list_plants,
-            'add-plant': lambda: app.add_plant(args),
-            'edit-plant': lambda: app.edit_plant(args),
-            'report': app.generate_report,
-            'add-leaf': lambda: app.add_leaf_record(args),
-            'leaf-stats': lambda: app.show_leaf_stats(args),
-            'show-image': lambda: app.show_plant_image(args),
-            'search-plant': lambda: app.search_plants(args),
-            'scan': app.scan_and_interact,
-            'list-qr': app.list_qr_codes,
-            'migrate': app.migrate,
-            'water': lambda: app.water_plant(args),
-            'water-info': lambda: app.show_water_info(args),
-        }
-
-        # Execute the command
-        commands[args.command]()
+        status = dispatch(app, args)
 
     except Exception as e:
         logger.error(f"Unexpected error: {e}", exc_info=True)
-        print(f"An unexpected error occurred. Check errors.log for details.")
+        print("An unexpected error occurred. Check errors.log for details.")
+        status = 1
+    sys.exit(status)
 
 if __name__ == "__main__":
     main()
@@ -1,42 +1,85 @@
-from dataclasses import dataclass, field
+import logging
+import sys
 from datetime import datetime
-from typing import Optional, List, Dict
+from typing import Optional, Dict, Sequence, Union
 from statistics import mean
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+class _LazyDate:
+    """Date attribute stored as given and parsed from ISO text on first access
+
+    Text that is not an ISO date reads as None, and is logged so the bad
+    stored value can be found and fixed.
+    """
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.name = name
+        self.slot = getattr(owner, f'_{name}')
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = self.slot.__get__(instance, owner)
+        if isinstance(value, str):
+            parsed = Plant._parse_date(value)
+            if parsed is None and value:
+                logger.error(f"Plant {instance.id}: malformed {self.name} {value!r}, read as no date")
+            value = parsed
+            self.slot.__set__(instance, value)
+        return value
+
+    def __set__(self, instance, value) -> None:
+        self.slot.__set__(instance, value)
+
+
 class Plant:
-    name: str
-    family: str
-    birthdate: Optional[datetime] = None
-    id: Optional[int] = None
-    image_data: Optional[bytes] = None
-    image_mime_type: Optional[str] = None
-    created_at: Optional[datetime] = None
-    last_leaf_date: Optional[datetime] = None
-    leaf_records: List[datetime] = field(default_factory=list)
-    last_watered: Optional[datetime] = None
-
-    def __post_init__(self):
-        # Convert string dates to datetime if needed
-        if isinstance(self.birthdate, str):
-            self.birthdate = datetime.strptime(self.birthdate, '%Y-%m-%d')
-        if isinstance(self.last_watered, str):
-            self.last_watered = datetime.strptime(self.last_watered, '%Y-%m-%d')
+    """A plant, compact enough to hold by the million
+
+    Date fields keep the database text until first read. Image bytes are
+    never held; `has_image` and `image_mime_type` describe the stored image.
+    """
+    __slots__ = ('name', 'family', 'id', 'has_image', 'image_mime_type', 'leaf_records',
+                 '_birthdate', '_created_at', '_last_leaf_date', '_last_watered')
+    # Constructor order, for equality and repr
+    _FIELDS = ('name', 'family', 'birthdate', 'id', 'has_image', 'image_mime_type',
+               'created_at', 'last_leaf_date', 'leaf_records', 'last_watered')
+
+    birthdate = _LazyDate()
+    created_at = _LazyDate()
+    last_leaf_date = _LazyDate()
+    last_watered = _LazyDate()
+
+    def __init__(self, name: str, family: str, birthdate: Union[datetime, str, None] = None,
+                 id: Optional[int] = None, has_image: bool = False, image_mime_type: Optional[str] = None,
+                 created_at: Union[datetime, str, None] = None, last_leaf_date: Union[datetime, str, None] = None,
+                 leaf_records: Sequence[datetime] = (), last_watered: Union[datetime, str, None] = None):
+        self.name = name
+        # Few distinct values, shared by many plants
+        self.family = sys.intern(family) if isinstance(family, str) else family
+        self.id = id
+        self.has_image = has_image
+        self.image_mime_type = sys.intern(image_mime_type) if isinstance(image_mime_type, str) else image_mime_type
+        self.leaf_records = leaf_records
+        self.birthdate = birthdate
+        self.created_at = created_at
+        self.last_leaf_date = last_leaf_date
+        self.last_watered = last_watered
 
     @classmethod
     def from_db_row(cls, row: tuple) -> 'Plant':
-        """Create a Plant instance from a database row"""
+        """Create a Plant instance from a database row; dates are parsed when first read"""
         try:
             return cls(
                 id=row[0],
                 name=row[1],
                 family=row[2],
-                image_data=row[3],
+                has_image=bool(row[3]),
                 image_mime_type=row[4],
-                birthdate=cls._parse_date(row[5]),
-                created_at=cls._parse_date(row[6]),
-                last_leaf_date=cls._parse_date(row[7]),
-                last_watered=cls._parse_date(row[8])
+                birthdate=row[5],
+                created_at=row[6],
+                last_leaf_date=row[7],
+                last_watered=row[8]
             )
         except IndexError as e:
             raise ValueError(f"Invalid database row format: {e}")
@@ -51,6 +94,18 @@ class Plant:
         except ValueError:
             return None
 
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Plant):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._FIELDS)
+
+    # Mutable and compared by value, so unhashable, like the dataclass it replaced
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self._FIELDS)
+        return f"Plant({fields})"
+
     def calculate_leaf_statistics(self) -> Dict:
         """Calculate statistics about leaf growth"""
         if not self.leaf_records:
@@ -80,5 +135,33 @@ class Plant:
             'days_since_last_leaf': days_since_last
         }
 
+    @staticmethod
+    def leaf_statistics_from_totals(total_leaves: int, gap_days: Optional[int],
+                                    last_leaf_date: Optional[str]) -> Dict:
+        """Build the `calculate_leaf_statistics` result from aggregated totals.
+
+        `gap_days` is the sum of whole days between consecutive leaves.
+        """
+        if not total_leaves:
+            return {
+                'total_leaves': 0,
+                'avg_days_between_leaves': None,
+                'days_since_last_leaf': None
+            }
+
+        # Same types as statistics.mean over the int intervals
+        avg_days = None
+        if total_leaves > 1:
+            intervals = total_leaves - 1
+            avg_days = gap_days // intervals if gap_days % intervals == 0 else gap_days / intervals
+
+        days_since_last = (datetime.now() - datetime.fromisoformat(last_leaf_date)).days
+
+        return {
+            'total_leaves': total_leaves,
+            'avg_days_between_leaves': avg_days,
+            'days_since_last_leaf': days_since_last
+        }
+
     def __str__(self) -> str:
         return f"{self.name} ({self.family})"
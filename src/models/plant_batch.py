@@ -0,0 +1,63 @@
+import sys
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, Optional
+
+from models.plant import Plant
+
+EPOCH = date(1970, 1, 1)
+# birth_days entry of a plant without a (valid) birthdate
+NO_DAY = -2 ** 31
+
+
+class PlantBatch:
+    """Plants stored column by column, for bulk paths
+
+    IDs and image flags are packed arrays, birthdates are int32 days since
+    1970-01-01 and every distinct family string is stored once (interned),
+    so a million plants cost little more than their names.
+    """
+    __slots__ = ('ids', 'names', 'families', 'has_image', 'birth_days')
+
+    def __init__(self) -> None:
+        self.ids = array('q')
+        self.names = []
+        self.families = []
+        self.has_image = array('b')
+        self.birth_days = array('i')
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> 'PlantBatch':
+        """Build a batch from (id, name, family, has_image, birth_day) rows"""
+        batch = cls()
+        for plant_id, name, family, has_image, birth_day in rows:
+            batch.append(plant_id, name, family, has_image, birth_day)
+        return batch
+
+    def append(self, plant_id: int, name: str, family: str, has_image: bool, birth_day: Optional[int]) -> None:
+        self.ids.append(plant_id)
+        self.names.append(name)
+        self.families.append(sys.intern(family))
+        self.has_image.append(1 if has_image else 0)
+        self.birth_days.append(NO_DAY if birth_day is None else birth_day)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def birthdate(self, i: int) -> Optional[date]:
+        day = self.birth_days[i]
+        return None if day == NO_DAY else EPOCH + timedelta(days=day)
+
+    def plant(self, i: int) -> Plant:
+        """Materialize row `i` as a Plant"""
+        birthdate = self.birthdate(i)
+        return Plant(
+            name=self.names[i],
+            family=self.families[i],
+            id=self.ids[i],
+            has_image=bool(self.has_image[i]),
+            birthdate=datetime(birthdate.year, birthdate.month, birthdate.day) if birthdate else None,
+        )
+
+    def __iter__(self) -> Iterator[Plant]:
+        return (self.plant(i) for i in range(len(self)))
@@ -0,0 +1,36 @@
+import re
+import unicodedata
+from typing import FrozenSet, List
+
+# Same word boundaries as the FTS5 unicode61 tokenizer: runs of letters and digits
+_WORD = re.compile(r'[^\W_]+')
+
+
+def words(text: str) -> List[str]:
+    """Lower-cased words of `text` without diacritics, as indexed by the full-text search"""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return _WORD.findall(stripped)
+
+
+def pad(word: str) -> str:
+    """Pad a word so its first and last letters get trigrams of their own"""
+    return f"  {word} "
+
+
+def trigrams(word: str) -> FrozenSet[str]:
+    """Trigrams of a padded word, as produced by the FTS5 trigram tokenizer"""
+    padded = pad(word.lower())
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def similarity(first: FrozenSet[str], second: FrozenSet[str]) -> float:
+    """Dice coefficient between two trigram sets"""
+    if not first or not second:
+        return 0.0
+    return 2 * len(first & second) / (len(first) + len(second))
+
+
+def match_expression(word_trigrams: FrozenSet[str]) -> str:
+    """FTS5 query matching terms that contain any of the trigrams"""
+    return ' OR '.join('"' + gram.replace('"', '""') + '"' for gram in sorted(word_trigrams))
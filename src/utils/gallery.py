@@ -0,0 +1,175 @@
+import threading
+from collections import OrderedDict, deque
+from io import BytesIO
+from typing import Any, Callable, Hashable, Iterable, List, Optional, Tuple
+
+from database import db_operations as db
+from models.plant_batch import PlantBatch
+
+# Edge of a gallery cell's thumbnail in pixels
+THUMBNAIL_SIZE = 128
+# Thumbnails kept converted for display; raised to twice the visible cells if needed
+THUMBNAIL_CACHE_SIZE = 400
+
+# Cached for plants whose thumbnail could not be loaded, so they are not retried
+NO_THUMBNAIL = object()
+
+
+def gallery_plants(family: Optional[str] = None, query: Optional[str] = None) -> PlantBatch:
+    """The plants to show: all of them (or one family) by ID, or search matches best first"""
+    if not query:
+        return db.load_plant_batch(family)
+    plants = PlantBatch()
+    for row in db.iter_search_plants(query):
+        if family is None or row.family == family:
+            plants.append(row.id, row.name, row.family, row.has_image, None)
+    return plants
+
+
+def load_thumbnail(plant_id: int, size: int = THUMBNAIL_SIZE):
+    """Decode a plant's image into a PIL image of at most `size` x `size`, or None
+
+    Reads the smallest stored rendition that covers `size`, so the full
+    photo is only decoded for plants without derivatives.
+    """
+    image = db.get_plant_image(plant_id, size)
+    if not image:
+        return None
+    from PIL import Image
+    with Image.open(BytesIO(image.data)) as img:
+        img.draft('RGB', (size, size))
+        img = img.convert('RGB')
+    img.thumbnail((size, size), Image.Resampling.LANCZOS)
+    return img
+
+
+class LRUCache:
+    """Bounded mapping that drops its least recently used entry"""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if key not in self._entries:
+            return default
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ThumbnailLoader:
+    """Loads thumbnails on a background thread, only for the plants still wanted
+
+    `show` replaces the wanted plants, so plants scrolled past before their
+    turn are never loaded. `fetch(plant_id)` runs on the worker thread and
+    returns the thumbnail (or None); finished ones are collected with
+    `drain` on the caller's thread.
+    """
+
+    def __init__(self, fetch: Callable[[int], Any]) -> None:
+        self.fetch = fetch
+        self.loaded = 0
+        self._wanted: deque = deque()
+        self._done: List[Tuple[int, Any]] = []
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='thumbnail-loader', daemon=True)
+        self._thread.start()
+
+    def show(self, plant_ids: Iterable[int]) -> None:
+        """Load these plants next, in order, forgetting earlier requests"""
+        with self._condition:
+            self._wanted = deque(plant_ids)
+            self._condition.notify()
+
+    def drain(self) -> List[Tuple[int, Any]]:
+        """(plant ID, thumbnail) pairs loaded since the last call"""
+        with self._condition:
+            done, self._done = self._done, []
+        return done
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._wanted and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                plant_id = self._wanted.popleft()
+            try:
+                thumbnail = self.fetch(plant_id)
+            except Exception as e:
+                print(f"Error loading thumbnail for plant {plant_id}: {e}")
+                thumbnail = None
+            with self._condition:
+                self._done.append((plant_id, thumbnail))
+                self.loaded += 1
+
+
+class Gallery:
+    """What the gallery window shows, without any Tk
+
+    Holds the plants in display order, asks a ThumbnailLoader for the
+    thumbnails of visible cells only, and keeps a bounded cache of them.
+    `poll` moves finished thumbnails into the cache through `make_image`,
+    which the window uses to build its PhotoImages on the Tk thread.
+    """
+
+    def __init__(self, plants: PlantBatch, fetch: Callable[[int], Any] = load_thumbnail,
+                 make_image: Callable[[Any], Any] = lambda image: image,
+                 cache_size: int = THUMBNAIL_CACHE_SIZE) -> None:
+        self.plants = plants
+        self.make_image = make_image
+        self.cache = LRUCache(cache_size)
+        self.loader = ThumbnailLoader(fetch)
+
+    def __len__(self) -> int:
+        return len(self.plants)
+
+    def label(self, index: int) -> str:
+        return f"{self.plants.names[index]} ({self.plants.ids[index]})"
+
+    def thumbnail(self, index: int) -> Optional[Any]:
+        """The cell's displayable thumbnail; None while loading or without one"""
+        image = self.cache.get(self.plants.ids[index])
+        return None if image is NO_THUMBNAIL else image
+
+    def is_loading(self, index: int) -> bool:
+        return bool(self.plants.has_image[index]) and self.plants.ids[index] not in self.cache
+
+    def set_visible(self, first: int, last: int) -> None:
+        """Cells first..last-1 are on screen: load their missing thumbnails, top first"""
+        last = min(last, len(self))
+        self.cache.maxsize = max(self.cache.maxsize, 2 * (last - first))
+        self.loader.show(
+            self.plants.ids[i] for i in range(max(first, 0), last)
+            if self.plants.has_image[i] and self.plants.ids[i] not in self.cache
+        )
+
+    def poll(self) -> bool:
+        """Cache the thumbnails loaded since the last poll; True if there were any"""
+        done = self.loader.drain()
+        for plant_id, image in done:
+            self.cache.put(plant_id, NO_THUMBNAIL if image is None else self.make_image(image))
+        return bool(done)
+
+    def close(self) -> None:
+        self.loader.close()
@@ -0,0 +1,135 @@
+import tkinter as tk
+from io import BytesIO
+from tkinter import ttk
+from typing import Optional, Tuple
+
+from PIL import Image, ImageTk
+
+from database import db_operations as db
+from utils.gallery import THUMBNAIL_SIZE, Gallery
+
+CELL_PADDING = 8
+LABEL_HEIGHT = 30
+CELL_WIDTH = THUMBNAIL_SIZE + 2 * CELL_PADDING
+CELL_HEIGHT = THUMBNAIL_SIZE + LABEL_HEIGHT + 2 * CELL_PADDING
+# How often finished thumbnails are picked up from the loader
+POLL_MS = 50
+
+
+class GalleryWindow:
+    """Scrollable grid of plant thumbnails in a Tkinter window
+
+    The canvas is as tall as the whole grid, but only the cells in view
+    have items on it; they are redrawn whenever the view moves or new
+    thumbnails arrive. Loading and caching live in the headless Gallery.
+    """
+
+    def __init__(self, gallery: Gallery, title: str = "Plant Gallery") -> None:
+        self.gallery = gallery
+        self.title = title
+        self.root: Optional[tk.Tk] = None
+        self.canvas: Optional[tk.Canvas] = None
+        self.columns = 1
+        self._visible: Tuple[int, int] = (0, 0)
+
+    def show(self) -> None:
+        """Open the window and run its event loop until it is closed"""
+        try:
+            self.root = tk.Tk()
+            self.root.title(f"{self.title} ({len(self.gallery)} plants)")
+            self.root.geometry(f"{6 * CELL_WIDTH + 20}x{4 * CELL_HEIGHT}")
+            self.gallery.make_image = ImageTk.PhotoImage
+
+            scrollbar = ttk.Scrollbar(self.root, orient=tk.VERTICAL)
+            self.canvas = tk.Canvas(self.root, highlightthickness=0, yscrollcommand=self._on_scroll(scrollbar))
+            scrollbar.configure(command=self.canvas.yview)
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+            self.canvas.bind('<Configure>', lambda event: self._layout())
+            self.canvas.bind('<MouseWheel>', lambda event: self._scroll(-1 if event.delta > 0 else 1))
+            self.canvas.bind('<Button-4>', lambda event: self._scroll(-1))
+            self.canvas.bind('<Button-5>', lambda event: self._scroll(1))
+            self.canvas.bind('<Double-Button-1>', self._open_plant)
+
+            self.root.after(POLL_MS, self._poll)
+            self.root.mainloop()
+        except Exception as e:
+            print(f"Error displaying gallery: {e}")
+            if self.root:
+                self.root.destroy()
+        finally:
+            self.gallery.close()
+
+    def _on_scroll(self, scrollbar: ttk.Scrollbar):
+        def set_scrollbar(first, last) -> None:
+            scrollbar.set(first, last)
+            self._redraw()
+        return set_scrollbar
+
+    def _scroll(self, units: int) -> None:
+        self.canvas.yview_scroll(units, 'units')
+
+    def _layout(self) -> None:
+        """Fit the columns to the window width and size the scroll region to the grid"""
+        self.columns = max(1, self.canvas.winfo_width() // CELL_WIDTH)
+        rows = -(-len(self.gallery) // self.columns)
+        self.canvas.configure(scrollregion=(0, 0, self.columns * CELL_WIDTH, rows * CELL_HEIGHT),
+                              yscrollincrement=CELL_HEIGHT // 4)
+        self._visible = (0, 0)
+        self._redraw()
+
+    def _visible_cells(self) -> Tuple[int, int]:
+        top = self.canvas.canvasy(0)
+        bottom = self.canvas.canvasy(self.canvas.winfo_height())
+        first_row, last_row = int(top // CELL_HEIGHT), int(bottom // CELL_HEIGHT) + 1
+        return first_row * self.columns, min(last_row * self.columns, len(self.gallery))
+
+    def _redraw(self) -> None:
+        """Recreate the items of the cells in view; request thumbnails when the view moved"""
+        visible = self._visible_cells()
+        if visible != self._visible:
+            self._visible = visible
+            self.gallery.set_visible(*visible)
+
+        self.canvas.delete('cell')
+        for index in range(*visible):
+            row, column = divmod(index, self.columns)
+            x, y = column * CELL_WIDTH + CELL_PADDING, row * CELL_HEIGHT + CELL_PADDING
+            tags = ('cell', f"plant-{self.gallery.plants.ids[index]}")
+            thumbnail = self.gallery.thumbnail(index)
+            if thumbnail is not None:
+                self.canvas.create_image(x + THUMBNAIL_SIZE // 2, y + THUMBNAIL_SIZE // 2,
+                                         image=thumbnail, tags=tags)
+            else:
+                self.canvas.create_rectangle(x, y, x + THUMBNAIL_SIZE, y + THUMBNAIL_SIZE,
+                                             outline='#cccccc', fill='#f2f2f2', tags=tags)
+                placeholder = "Loading..." if self.gallery.is_loading(index) else "No image"
+                self.canvas.create_text(x + THUMBNAIL_SIZE // 2, y + THUMBNAIL_SIZE // 2,
+                                        text=placeholder, fill='#888888', tags=tags)
+            self.canvas.create_text(x + THUMBNAIL_SIZE // 2, y + THUMBNAIL_SIZE + 4, anchor=tk.N,
+                                    text=self.gallery.label(index), width=THUMBNAIL_SIZE, tags=tags)
+
+    def _poll(self) -> None:
+        if self.gallery.poll():
+            self._redraw()
+        self.root.after(POLL_MS, self._poll)
+
+    def _open_plant(self, event) -> None:
+        """Show the double-clicked plant's image in a window of its own"""
+        item = self.canvas.find_closest(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        tags = [tag for tag in self.canvas.gettags(item) if tag.startswith('plant-')]
+        if not tags:
+            return
+        image = db.get_plant_image(int(tags[0].split('-')[1]), db.VIEWER_SIZE)
+        if not image:
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title(f"Plant: {image.name} {image.family}")
+        with Image.open(BytesIO(image.data)) as img:
+            img.thumbnail((db.VIEWER_SIZE, db.VIEWER_SIZE), Image.Resampling.LANCZOS)
+            photo = ImageTk.PhotoImage(img.convert('RGB'))
+        label = ttk.Label(window, image=photo, padding=10)
+        label.image = photo  # Keep a reference
+        label.pack()
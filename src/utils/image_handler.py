@@ -1,22 +1,104 @@
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from pathlib import Path
+from configparser import ConfigParser
 from PIL import Image, ExifTags
 from io import BytesIO
-from dataclasses import dataclass
-from utils.image_viewer import ImageViewer
+from dataclasses import dataclass, field
+from functools import cached_property
+
+# Resampling filters accepted by the [images] resampling setting
+RESAMPLING = {
+    'nearest': Image.Resampling.NEAREST,
+    'box': Image.Resampling.BOX,
+    'bilinear': Image.Resampling.BILINEAR,
+    'hamming': Image.Resampling.HAMMING,
+    'bicubic': Image.Resampling.BICUBIC,
+    'lanczos': Image.Resampling.LANCZOS,
+}
+
+# EXIF orientation -> transpose that turns the stored pixels upright
+EXIF_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
 
 @dataclass
 class ProcessedImage:
     data: bytes
     mime_type: str
+    # Smaller JPEG renditions by bounding box size, made from the same decode
+    derivatives: Dict[int, bytes] = field(default_factory=dict)
 
 class ImageProcessingError(Exception):
     """Custom exception for image processing errors"""
     pass
 
+@dataclass
+class ImageSettings:
+    """How stored images are produced, from the [images] section of config.ini"""
+    max_size: int = 800
+    quality: int = 85
+    resampling: str = 'lanczos'
+    derivative_sizes: Tuple[int, ...] = (64, 256)
+    # Total size the stored derivatives are evicted down to, least recently used first
+    derivative_cache_mb: int = 64
+
+    @classmethod
+    def from_config(cls, path: str = 'config.ini') -> 'ImageSettings':
+        config = ConfigParser()
+        config.read(path)
+        settings = cls(
+            max_size=config.getint('images', 'max_size', fallback=cls.max_size),
+            quality=config.getint('images', 'quality', fallback=cls.quality),
+            resampling=config.get('images', 'resampling', fallback=cls.resampling).lower(),
+            derivative_cache_mb=config.getint('images', 'derivative_cache_mb', fallback=cls.derivative_cache_mb),
+        )
+        sizes = config.get('images', 'derivative_sizes', fallback=None)
+        if sizes is not None:
+            try:
+                settings.derivative_sizes = tuple(sorted({int(size) for size in sizes.split(',') if size.strip()}))
+            except ValueError:
+                raise ImageProcessingError("[images] derivative_sizes must be a comma-separated list of pixels")
+        if settings.max_size < 1:
+            raise ImageProcessingError("[images] max_size must be at least 1")
+        if not 1 <= settings.quality <= 95:
+            raise ImageProcessingError("[images] quality must be between 1 and 95")
+        if settings.resampling not in RESAMPLING:
+            raise ImageProcessingError(f"[images] resampling must be one of: {', '.join(RESAMPLING)}")
+        if any(size < 1 for size in settings.derivative_sizes):
+            raise ImageProcessingError("[images] derivative_sizes must be at least 1")
+        if settings.derivative_cache_mb < 0:
+            raise ImageProcessingError("[images] derivative_cache_mb must not be negative")
+        return settings
+
+    def rendition_size(self, size: int) -> Optional[int]:
+        """Smallest derivative size covering `size`, or None when only the original does
+
+        Sizes of `max_size` or more are skipped: stored originals already fit
+        in `max_size`, so such a derivative would never be made.
+        """
+        return next((s for s in sorted(self.derivative_sizes) if size <= s < self.max_size), None)
+
 class ImageHandler:
-    def __init__(self):
-        self.viewer = ImageViewer()
+    def __init__(self, settings: Optional[ImageSettings] = None):
+        if settings is not None:
+            self.settings = settings
+
+    @cached_property
+    def settings(self) -> ImageSettings:
+        """[images] settings, read from config.ini on first use"""
+        return ImageSettings.from_config()
+
+    @cached_property
+    def viewer(self):
+        """Tk image viewer, created (and Tk imported) on first display"""
+        from utils.image_viewer import ImageViewer
+        return ImageViewer()
 
     def display_image(self, image_data: bytes, title: str = "Plant Image") -> None:
         """Display an image using the viewer"""
@@ -30,48 +112,67 @@ class ImageHandler:
     def read_image(self, image_path: str) -> Optional[ProcessedImage]:
         """Read and process an image file"""
         try:
-            path = Path(image_path)
-            if not path.exists():
-                raise FileNotFoundError(f"Image file not found: {image_path}")
-
-            with Image.open(path) as img:
-                # Fix orientation and convert to RGB if needed
-                img = self._fix_orientation(img)
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # Resize if too large
-                img.thumbnail((800, 800), Image.Resampling.LANCZOS)
-                
-                # Save to bytes
-                buffer = BytesIO()
-                img.save(buffer, format='JPEG', quality=85, optimize=True)
-                return ProcessedImage(
-                    data=buffer.getvalue(),
-                    mime_type='image/jpeg'
-                )
+            return self.process_image(image_path)
         except Exception as e:
             print(f"Error processing image: {e}")
             return None
 
-    def _fix_orientation(self, img: Image.Image) -> Image.Image:
-        """Fix image orientation based on EXIF data"""
-        try:
-            exif = img._getexif()
-            if not exif:
-                return img
-
-            for orientation in ExifTags.TAGS.keys():
-                if ExifTags.TAGS[orientation] == 'Orientation':
-                    break
-            
-            orientation_value = exif.get(orientation)
-            if orientation_value == 3:
-                return img.rotate(180, expand=True)
-            elif orientation_value == 6:
-                return img.rotate(270, expand=True)
-            elif orientation_value == 8:
-                return img.rotate(90, expand=True)
-        except (AttributeError, KeyError, IndexError):
-            pass
+    def process_image(self, image_path: str) -> ProcessedImage:
+        """Read an image file, shrink it to `max_size`, turn it upright and encode it as JPEG
+
+        Raises instead of printing, for callers that report failures themselves.
+        """
+        path = Path(image_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Image file not found: {image_path}")
+
+        with Image.open(path) as img:
+            img = self._shrink(img, self.settings.max_size)
+            return ProcessedImage(
+                data=self._encode(img),
+                mime_type='image/jpeg',
+                derivatives=self._derivatives(img),
+            )
+
+    def render(self, image_data: bytes, size: int) -> Optional[bytes]:
+        """JPEG rendition of stored image bytes that fits `size` x `size`
+
+        Returns None when the image already fits, so the original serves as is.
+        """
+        with Image.open(BytesIO(image_data)) as img:
+            if max(img.size) <= size:
+                return None
+            return self._encode(self._shrink(img, size))
+
+    def _shrink(self, img: Image.Image, max_size: int) -> Image.Image:
+        """Decode an opened image to RGB, fit it in `max_size` x `max_size` and turn it upright"""
+        size = (max_size, max_size)
+        # Read before decoding; the output JPEG carries no EXIF, so the
+        # orientation is applied to the pixels once, at the end
+        transpose = EXIF_TRANSPOSE.get(img.getexif().get(ExifTags.Base.Orientation))
+
+        # JPEGs decode straight to RGB at 1/2, 1/4 or 1/8 scale, as long
+        # as the result still covers `size`; other formats ignore this
+        img.draft('RGB', size)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        img.thumbnail(size, RESAMPLING[self.settings.resampling])
+        if transpose is not None:
+            img = img.transpose(transpose)
         return img
+
+    def _derivatives(self, img: Image.Image) -> Dict[int, bytes]:
+        """Renditions for every derivative size smaller than `img`, each shrunk from the previous one"""
+        derivatives = {}
+        for size in sorted(self.settings.derivative_sizes, reverse=True):
+            if size < max(img.size):
+                img = img.copy()
+                img.thumbnail((size, size), RESAMPLING[self.settings.resampling])
+                derivatives[size] = self._encode(img)
+        return derivatives
+
+    def _encode(self, img: Image.Image) -> bytes:
+        buffer = BytesIO()
+        img.save(buffer, format='JPEG', quality=self.settings.quality, optimize=True)
+        return buffer.getvalue()
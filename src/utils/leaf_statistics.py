@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+from typing import Iterable, NamedTuple, Optional
+
+import numpy as np
+
+DAY_US = 86_400_000_000
+EPOCH = datetime(1970, 1, 1)
+
+
+class LeafStatistics(NamedTuple):
+    """Per-plant leaf statistics as parallel arrays, sorted by plant ID.
+
+    Gap and age columns are in whole days, counted like `timedelta.days`;
+    mean and median gaps are NaN for plants with a single leaf.
+    """
+    plant_ids: np.ndarray
+    total_leaves: np.ndarray
+    mean_gap_days: np.ndarray
+    median_gap_days: np.ndarray
+    days_since_last_leaf: np.ndarray
+
+    def index_of(self, plant_id: int) -> Optional[int]:
+        """Row of `plant_id` in the arrays, or None when it has no leaves"""
+        i = int(np.searchsorted(self.plant_ids, plant_id))
+        if i < len(self.plant_ids) and self.plant_ids[i] == plant_id:
+            return i
+        return None
+
+
+def load_leaf_records(rows: Iterable[tuple]) -> tuple:
+    """Read (plant_id, comma-separated ISO dates) rows into two int64 arrays:
+    the plant ID of every leaf record and its time in microseconds since the epoch
+    """
+    plant_ids, appeared = [], []
+    for plant_id, dates in rows:
+        # NumPy parses the ISO strings in C
+        parsed = np.array(dates.split(','), dtype='datetime64[us]').astype(np.int64)
+        plant_ids.append(np.full(len(parsed), plant_id, dtype=np.int64))
+        appeared.append(parsed)
+    if not appeared:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    return np.concatenate(plant_ids), np.concatenate(appeared)
+
+
+def compute_leaf_statistics(plant_ids: np.ndarray, appeared_us: np.ndarray,
+                            now: Optional[datetime] = None) -> LeafStatistics:
+    """Leaf statistics for every plant from all its leaf timestamps at once.
+
+    `appeared_us` holds microseconds since the epoch, one entry per leaf
+    record; the records need not be sorted.
+    """
+    now_us = ((now or datetime.now()) - EPOCH) // timedelta(microseconds=1)
+
+    # Group each plant's leaves together, in time order
+    if len(plant_ids) > 1 and not _is_sorted(plant_ids, appeared_us):
+        order = np.lexsort((appeared_us, plant_ids))
+        plant_ids, appeared_us = plant_ids[order], appeared_us[order]
+
+    count = len(plant_ids)
+    starts = np.flatnonzero(np.r_[True, plant_ids[1:] != plant_ids[:-1]]) if count else np.empty(0, np.int64)
+    totals = np.diff(np.r_[starts, count])
+    ends = starts + totals - 1
+
+    # gaps[i] is the gap before leaf i; -1 marks each plant's first leaf
+    gaps = np.empty(count, dtype=np.int64)
+    if count:
+        gaps[1:] = np.diff(appeared_us) // DAY_US
+        gaps[starts] = -1
+
+    intervals = totals - 1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        gap_sums = np.add.reduceat(np.maximum(gaps, 0), starts) if count else np.empty(0, np.int64)
+        mean_gaps = np.where(intervals > 0, gap_sums / intervals, np.nan)
+
+    return LeafStatistics(
+        plant_ids=plant_ids[starts],
+        total_leaves=totals,
+        mean_gap_days=mean_gaps,
+        median_gap_days=_median_gaps(gaps, starts, totals),
+        days_since_last_leaf=(now_us - appeared_us[ends]) // DAY_US,
+    )
+
+
+def _is_sorted(plant_ids: np.ndarray, appeared_us: np.ndarray) -> bool:
+    same_plant = plant_ids[1:] == plant_ids[:-1]
+    return bool(np.all(plant_ids[1:] >= plant_ids[:-1])
+                and np.all(~same_plant | (appeared_us[1:] >= appeared_us[:-1])))
+
+
+def _median_gaps(gaps: np.ndarray, starts: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    """Median gap per plant, sorting all gaps in one pass keyed by plant"""
+    medians = np.full(len(starts), np.nan)
+    if not len(gaps):
+        return medians
+
+    # Sort (plant, gap) pairs as one int64 key; the -1 markers sort first
+    span = int(gaps.max()) + 2
+    groups = np.repeat(np.arange(len(starts), dtype=np.int64), totals)
+    ordered = np.sort(groups * span + gaps + 1) % span - 1
+
+    intervals = totals - 1
+    has_gaps = intervals > 0
+    first = starts[has_gaps] + 1
+    lower = ordered[first + (intervals[has_gaps] - 1) // 2]
+    upper = ordered[first + intervals[has_gaps] // 2]
+    medians[has_gaps] = (lower + upper) / 2
+    return medians
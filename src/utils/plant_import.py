@@ -0,0 +1,187 @@
+import csv
+import json
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from database import db_operations as db
+from models.plant import Plant
+
+# Plants inserted per transaction
+BATCH_SIZE = 500
+MANIFEST_FIELDS = ('name', 'family', 'image', 'birthdate')
+
+# (image bytes, MIME type, renditions, error) of a row without an image
+NO_IMAGE = (None, None, None, None)
+
+class ManifestError(Exception):
+    """A manifest, or a row of one, that cannot be imported"""
+    pass
+
+@dataclass
+class ManifestRow:
+    line: int
+    name: str
+    family: str
+    image: Optional[Path] = None
+    birthdate: Optional[datetime] = None
+
+@dataclass
+class ImportResult:
+    imported: List[int] = field(default_factory=list)
+    # (manifest line, reason) of every row that was skipped
+    failed: List[Tuple[int, str]] = field(default_factory=list)
+    seconds: float = 0.0
+    qr_rendered: int = 0
+    qr_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        rows = len(self.imported) + len(self.failed)
+        return rows / self.seconds if self.seconds else 0.0
+
+def read_manifest(path: Path) -> Iterator[Tuple[int, Dict]]:
+    """Yield (line number, record) from a CSV (with header) or JSON lines manifest"""
+    suffix = path.suffix.lower()
+    if suffix not in ('.csv', '.jsonl', '.ndjson'):
+        raise ManifestError(f"Unsupported manifest type '{path.suffix}' (use .csv or .jsonl)")
+
+    with open(path, newline='', encoding='utf-8') as f:
+        if suffix == '.csv':
+            reader = csv.DictReader(f)
+            missing = {'name', 'family'} - set(reader.fieldnames or ())
+            if missing:
+                raise ManifestError(f"Manifest has no {', '.join(sorted(missing))} column")
+            for record in reader:
+                yield reader.line_num, record
+            return
+
+        for line, text in enumerate(f, start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError as e:
+                record = e
+            yield line, record
+
+def parse_row(line: int, record, base_dir: Path) -> ManifestRow:
+    """Validate one manifest record; image paths are relative to the manifest"""
+    if isinstance(record, Exception):
+        raise ManifestError(f"invalid JSON: {record}")
+    if not isinstance(record, dict):
+        raise ManifestError("expected a JSON object")
+
+    values = {key: str(record.get(key) or '').strip() for key in MANIFEST_FIELDS}
+    if not values['name'] or not values['family']:
+        raise ManifestError("name and family are required")
+
+    birthdate = None
+    if values['birthdate']:
+        try:
+            birthdate = datetime.strptime(values['birthdate'], '%Y-%m-%d')
+        except ValueError:
+            raise ManifestError(f"invalid birthdate '{values['birthdate']}' (use YYYY-MM-DD)")
+
+    image = base_dir / values['image'] if values['image'] else None
+    return ManifestRow(line, values['name'], values['family'], image, birthdate)
+
+@lru_cache(maxsize=1)
+def _image_handler():
+    """One ImageHandler per worker process, so config.ini is read once"""
+    from utils.image_handler import ImageHandler
+    return ImageHandler()
+
+def _load_image(path: str) -> Tuple[Optional[bytes], Optional[str], Optional[Dict[int, bytes]], Optional[str]]:
+    """Decode and resize one image (module level so worker processes can run it)"""
+    try:
+        image = _image_handler().process_image(path)
+    except Exception as e:
+        return None, None, None, str(e) or type(e).__name__
+    return image.data, image.mime_type, image.derivatives, None
+
+class PlantImporter:
+    """Bulk import of a plant manifest
+
+    Images are decoded and resized in a process pool while earlier batches
+    are inserted, each batch in one transaction. A batch that fails is
+    retried row by row, so a bad row only loses itself. QR codes are
+    rendered in a second parallel stage once every row is in.
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE, workers: Optional[int] = None) -> None:
+        self.batch_size = batch_size
+        self.workers = workers
+
+    def run(self, manifest: Path, render_qr: bool = True) -> ImportResult:
+        result = ImportResult()
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            batch = []
+            for row, (data, mime_type, derivatives, error) in self._with_images(self._rows(manifest, result), executor):
+                if error:
+                    result.failed.append((row.line, f"image {row.image}: {error}"))
+                    continue
+                plant = Plant(row.name, row.family, birthdate=row.birthdate, image_mime_type=mime_type)
+                batch.append((row.line, plant, data, derivatives))
+                if len(batch) == self.batch_size:
+                    self._insert(batch, result)
+                    batch = []
+            self._insert(batch, result)
+        result.seconds = time.perf_counter() - start
+
+        if render_qr and result.imported:
+            from utils.qr_handler import QRHandler
+            start = time.perf_counter()
+            result.qr_rendered = len(QRHandler().sync_qr_codes(result.imported, workers=self.workers))
+            result.qr_seconds = time.perf_counter() - start
+        return result
+
+    @staticmethod
+    def _rows(manifest: Path, result: ImportResult) -> Iterator[ManifestRow]:
+        """Valid manifest rows; invalid ones are recorded as failed"""
+        for line, record in read_manifest(manifest):
+            try:
+                yield parse_row(line, record, manifest.parent)
+            except ManifestError as e:
+                result.failed.append((line, str(e)))
+
+    def _with_images(self, rows: Iterator[ManifestRow],
+                     executor: ProcessPoolExecutor) -> Iterator[Tuple[ManifestRow, Tuple]]:
+        """Pair rows with their processed images, in manifest order
+
+        Keeps up to two batches of rows in flight, so the pool decodes the
+        next batch while the current one is inserted without the whole
+        manifest being held in memory.
+        """
+        pending: deque = deque()
+        for row in rows:
+            future: Optional[Future] = executor.submit(_load_image, str(row.image)) if row.image else None
+            pending.append((row, future))
+            if len(pending) > 2 * self.batch_size:
+                row, future = pending.popleft()
+                yield row, future.result() if future else NO_IMAGE
+        while pending:
+            row, future = pending.popleft()
+            yield row, future.result() if future else NO_IMAGE
+
+    @staticmethod
+    def _insert(batch: List[Tuple], result: ImportResult) -> None:
+        """Insert (line, plant, image bytes, renditions) rows"""
+        if not batch:
+            return
+        try:
+            result.imported.extend(db.add_plants([row[1:] for row in batch]))
+            return
+        except db.DatabaseError:
+            pass
+        for line, *row in batch:
+            try:
+                result.imported.extend(db.add_plants([tuple(row)]))
+            except db.DatabaseError as e:
+                result.failed.append((line, str(e)))
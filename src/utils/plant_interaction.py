@@ -1,19 +1,21 @@
-from typing import Optional
-from utils.qr_handler import QRHandler
+from functools import cached_property
 from database import db_operations as db
-import os
+from database.queries import PLANT_LABEL_FIELDS
 
 class PlantInteraction:
-    def __init__(self):
-        self.qr_handler = QRHandler()
-        
+    @cached_property
+    def qr_handler(self):
+        """QR handler, imported with OpenCV and qrcode on first use"""
+        from utils.qr_handler import QRHandler
+        return QRHandler()
+
     def show_plant_menu(self, plant_id: int) -> None:
         """Show interactive menu for plant"""
-        plant = db.get_plant_by_id(plant_id)
+        plant = db.get_plant_by_id(plant_id, PLANT_LABEL_FIELDS)
         
         while True:
             print("\n" * 5)
-            print(f"Plant Menu: {plant[1]} - {plant[2]}")
+            print(f"Plant Menu: {plant.name} - {plant.family}")
             print("Choose an option:")
             print("1. Add new leaf")
             print("2. View leaf statistics")
@@ -24,6 +26,7 @@ class PlantInteraction:
 
             choice = input("\nEnter choice (1-6): ")
             print("\n" * 3)
+            db.refresh_plant_cache()
             
             if choice == "1":
                 db.add_leaf_record(plant_id)
@@ -54,8 +57,8 @@ class PlantInteraction:
             print("No statistics available")
             return
 
-        plant = db.get_plant_by_id(plant_id)
-        print(f"\nLeaf Statistics for {plant[1]}:")
+        plant = db.get_plant_by_id(plant_id, PLANT_LABEL_FIELDS)
+        print(f"\nLeaf Statistics for {plant.name}:")
         print(f"Total leaves: {stats['total_leaves']}")
         if stats['avg_days_between_leaves']:
             print(f"Average days between leaves: {stats['avg_days_between_leaves']:.1f}")
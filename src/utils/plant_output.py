@@ -0,0 +1,80 @@
+import csv
+import json
+import sys
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO
+
+OUTPUT_FORMATS = ('table', 'csv', 'jsonl')
+
+
+class PlantOutput:
+    """Write plant rows as they arrive, holding at most one table chunk in memory"""
+
+    def __init__(self, output_format: str = 'table', headers: Optional[List[str]] = None,
+                 format_row: Optional[Callable[[tuple], tuple]] = None,
+                 chunk_size: int = 500, stream: TextIO = None) -> None:
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
+        self.output_format = output_format
+        self.headers = headers
+        self.format_row = format_row
+        self.chunk_size = chunk_size
+        self.stream = stream or sys.stdout
+        self.written = 0
+
+    def write(self, rows: Iterable[tuple]) -> Optional[tuple]:
+        """Write every row and return the last one (None when there were none)"""
+        writers = {
+            'table': self._write_table,
+            'csv': self._write_csv,
+            'jsonl': self._write_jsonl,
+        }
+        return writers[self.output_format](iter(rows))
+
+    def _write_table(self, rows) -> Optional[tuple]:
+        """Tabulate one chunk at a time; each chunk repeats the header"""
+        from tabulate import tabulate
+        last = None
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return last
+            if last is not None:
+                self.stream.write('\n')
+            last = chunk[-1]
+            self.written += len(chunk)
+            if self.format_row:
+                chunk = [self.format_row(row) for row in chunk]
+            self.stream.write(tabulate(chunk, headers=self.headers or 'keys', tablefmt='simple') + '\n')
+            self.stream.flush()
+
+    def _write_csv(self, rows) -> Optional[tuple]:
+        last = None
+        writer = csv.writer(self.stream)
+        for row in rows:
+            if last is None:
+                writer.writerow(row._fields)
+            writer.writerow(self._plain(row))
+            self.written += 1
+            last = row
+        return last
+
+    def _write_jsonl(self, rows) -> Optional[tuple]:
+        last = None
+        for row in rows:
+            self.stream.write(json.dumps(row_to_dict(row)) + '\n')
+            self.written += 1
+            last = row
+        return last
+
+    @staticmethod
+    def _plain(row: tuple) -> tuple:
+        """Stored values, with has_image as a boolean"""
+        if 'has_image' in row._fields:
+            row = row._replace(has_image=bool(row.has_image))
+        return row
+
+
+def row_to_dict(row: tuple) -> Dict[str, Any]:
+    """A plant row as a JSON-ready dict of its stored values, with has_image as a boolean"""
+    return dict(zip(row._fields, PlantOutput._plain(row)))
@@ -3,13 +3,14 @@ from typing import Any, Dict, Optional
 from dataclasses import dataclass
 from dateutil.relativedelta import relativedelta
 from argparse import Namespace
-from .image_handler import ImageHandler, ProcessedImage
+from .image_handler import ImageHandler
 
 @dataclass
 class PlantData:
     name: Optional[str] = None
     family: Optional[str] = None
     image_data: Optional[bytes] = None
+    image_derivatives: Optional[Dict[int, bytes]] = None
     image_mime_type: Optional[str] = None
     birthdate: Optional[datetime] = None
     created_at: Optional[datetime] = None
@@ -32,11 +33,13 @@ class PlantDataProcessor:
             processed_image = self.image_handler.read_image(args.image)
             if processed_image:
                 plant_data.image_data = processed_image.data
+                plant_data.image_derivatives = processed_image.derivatives
                 plant_data.image_mime_type = processed_image.mime_type
 
         # Calculate birthdate from age if provided
-        if args.age_months:
-            plant_data.birthdate = datetime.now() - relativedelta(months=args.age_months)
+        age_months = getattr(args, 'age_months', None)  # edit-plant has no --age-months
+        if age_months:
+            plant_data.birthdate = datetime.now() - relativedelta(months=age_months)
 
         return self._to_dict(plant_data)
 
@@ -1,45 +1,115 @@
 import qrcode
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
-import cv2
-import numpy as np
-import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from database import db_operations as db
+
+# Rendering parameters; part of the manifest hash so changing them re-renders
+QR_VERSION = 1
+QR_BOX_SIZE = 10
+QR_BORDER = 5
 
 class QRHandlerError(Exception):
     """Custom exception for QR handler errors"""
     pass
 
+def _render_qr(payload: str, qr_path: str) -> str:
+    """Render a QR code to disk (module level so worker processes can run it)"""
+    qr = qrcode.QRCode(version=QR_VERSION, box_size=QR_BOX_SIZE, border=QR_BORDER)
+    qr.add_data(payload)
+    qr.make(fit=True)
+
+    qr_image = qr.make_image(fill_color="black", back_color="white")
+    qr_image.save(qr_path)
+    return qr_path
+
 class QRHandler:
     def __init__(self):
         self.qr_dir = Path('data/qr_codes')
         self.qr_dir.mkdir(exist_ok=True)
         self.last_scanned = None
+        self._manifest: Optional[Dict[int, Tuple[str, float]]] = None
 
     def get_qr_path(self, plant_id: int) -> Path:
         """Get the path to a QR code file"""
         return self.qr_dir / f"plant_{plant_id}_qr.png"
 
+    @staticmethod
+    def _payload(plant_id: int) -> str:
+        """Data encoded in a plant's QR code"""
+        return str(plant_id)
+
+    @classmethod
+    def _payload_hash(cls, plant_id: int) -> str:
+        """Hash of the payload and rendering parameters"""
+        key = f"{cls._payload(plant_id)}|{QR_VERSION}|{QR_BOX_SIZE}|{QR_BORDER}"
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _load_manifest(self) -> Dict[int, Tuple[str, float]]:
+        """Payload hash and file mtime of every rendered code, read from the database once"""
+        if self._manifest is None:
+            self._manifest = db.get_qr_codes()
+        return self._manifest
+
+    def _record(self, plant_id: int, qr_path: Path) -> Tuple[int, str, float]:
+        """Manifest entry of a freshly rendered code, to pass to `db.record_qr_codes`"""
+        entry = (self._payload_hash(plant_id), qr_path.stat().st_mtime)
+        if self._manifest is not None:
+            self._manifest[plant_id] = entry
+        return (plant_id, *entry)
+
+    def is_current(self, plant_id: int) -> bool:
+        """Check whether the QR file exists and matches the manifest"""
+        entry = self._load_manifest().get(plant_id)
+        if not entry or entry[0] != self._payload_hash(plant_id):
+            return False
+        try:
+            return self.get_qr_path(plant_id).stat().st_mtime == entry[1]
+        except FileNotFoundError:
+            return False
+
     def save_qr_code(self, plant_id: int) -> Path:
         """Generate and save QR code for a plant ID"""
         try:
             qr_path = self.get_qr_path(plant_id)
-            
-            # Generate QR code
-            qr = qrcode.QRCode(version=1, box_size=10, border=5)
-            qr.add_data(str(plant_id))
-            qr.make(fit=True)
-            
-            # Create QR image
-            qr_image = qr.make_image(fill_color="black", back_color="white")
-            
-            # Save to file
-            qr_image.save(qr_path)
+            _render_qr(self._payload(plant_id), str(qr_path))
+            db.record_qr_codes([self._record(plant_id, qr_path)])
             return qr_path
             
         except Exception as e:
             print(f"Error generating QR code: {e}")
             return None
 
+    def sync_qr_codes(self, plant_ids: Iterable[int], force: bool = False,
+                      workers: Optional[int] = None) -> List[int]:
+        """Render missing or stale QR codes and return the plant IDs rendered.
+
+        Codes that are current according to the manifest are skipped unless
+        `force` is set. Rendering runs in a process pool of `workers`.
+        """
+        stale = [pid for pid in plant_ids if force or not self.is_current(pid)]
+        if not stale:
+            return []
+
+        rendered = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_render_qr, self._payload(pid), str(self.get_qr_path(pid))): pid
+                for pid in stale
+            }
+            for future, pid in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error generating QR code for plant {pid}: {e}")
+                    continue
+                rendered.append(self._record(pid, self.get_qr_path(pid)))
+
+        db.record_qr_codes(rendered)
+        return [pid for pid, _, _ in rendered]
+
     def scan_qr(self, show_image: bool = True) -> Optional[int]:
         """Scan QR code using webcam"""
         try:
@@ -1,10 +1,11 @@
 from pathlib import Path
 import csv
-from typing import List, Tuple, Dict
+from typing import Iterable, List, Optional, Tuple, Dict
 from configparser import ConfigParser
 from datetime import datetime
-from statistics import mean, median
-from collections import Counter
+
+# Mean Gregorian month, so ages in months match julianday arithmetic
+DAYS_PER_MONTH = 365.2425 / 12
 
 class ReportGenerator:
     def __init__(self) -> None:
@@ -17,35 +18,51 @@ class ReportGenerator:
         config.read('config.ini')
         return Path(config['reports']['output_dir'])
 
-    def generate_plant_report(self, plants: List[Tuple]) -> str:
-        """Generate a comprehensive plant report"""
+    def generate_plant_report(self, plants: Iterable[Tuple], stats: Dict) -> str:
+        """Generate a comprehensive plant report
+
+        `plants` (PLANT_REPORT_FIELDS rows) is consumed in a single pass, so
+        it can stream from a database cursor; `stats` comes from
+        `statistics_from_aggregates`.
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filepath = self.output_dir / f'plant_collection_{timestamp}.csv'
-        
-        stats = self._generate_statistics(plants)
-        self._write_report(filepath, plants, stats)
-        
+        self._write_report(filepath, stats, plants)
         return str(filepath)
 
-    def _generate_statistics(self, plants: List[Tuple]) -> Dict:
-        """Generate statistics from plant data"""
-        if not plants:
-            return self._empty_statistics()
+    @classmethod
+    def statistics_from_aggregates(cls, families: List[Tuple], ages: Tuple,
+                                   median_age_days: Optional[float]) -> Dict:
+        """Build the statistics block from SQL aggregates
+
+        `families` rows hold (family, plants, with_images); `ages` holds the
+        aged plant count and the mean, min and max age in days.
+        """
+        if not families:
+            return cls._empty_statistics()
+
+        most_common = max(families, key=lambda row: row.plants)
+        if ages.aged:
+            age_statistics = {
+                "Average Age": round(ages.mean_age_days / DAYS_PER_MONTH, 1),
+                "Median Age": round(median_age_days / DAYS_PER_MONTH, 1),
+                "Youngest": round(ages.min_age_days / DAYS_PER_MONTH, 1),
+                "Oldest": round(ages.max_age_days / DAYS_PER_MONTH, 1)
+            }
+        else:
+            age_statistics = cls._empty_statistics()["Age Statistics"]
 
-        ages = self._extract_ages(plants)
-        families = [plant[2] for plant in plants]
-        
         return {
-            "Total Plants": len(plants),
-            "Number of Families": len(set(families)),
-            "Most Common Family": Counter(families).most_common(1)[0] if families else None,
-            "Plants with Images": sum(1 for plant in plants if plant[3]),
-            "Age Statistics": self._calculate_age_statistics(ages),
-            "Family Distribution": dict(Counter(families)),
+            "Total Plants": sum(row.plants for row in families),
+            "Number of Families": len(families),
+            "Most Common Family": (most_common.family, most_common.plants),
+            "Plants with Images": sum(row.with_images for row in families),
+            "Age Statistics": age_statistics,
+            "Family Distribution": {row.family: row.plants for row in families},
             "Report Generated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
 
-    def _write_report(self, filepath: Path, plants: List[Tuple], stats: Dict) -> None:
+    def _write_report(self, filepath: Path, stats: Dict, plants: Iterable[Tuple]) -> None:
         """Write report to CSV file"""
         with open(filepath, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
@@ -82,15 +99,17 @@ class ReportGenerator:
             writer.writerow([family, count])
         writer.writerow([])
 
-    def _write_plants_section(self, writer: csv.writer, plants: List[Tuple]) -> None:
-        """Write individual plant details"""
+    def _write_plants_section(self, writer: csv.writer, plants: Iterable[Tuple]) -> None:
+        """Write individual plant details (PLANT_REPORT_FIELDS rows)"""
         writer.writerow(['Individual Plant Details'])
         writer.writerow(['ID', 'Name', 'Family', 'Image', 'Birthdate', 'Added Date'])
-        
+
         for plant in plants:
-            row = list(plant)
-            row[3] = "Yes" if isinstance(row[3], bytes) else "No"  # Replace binary data
-            writer.writerow(row)
+            writer.writerow(self._detail_row(plant))
+
+    @staticmethod
+    def _detail_row(plant: Tuple) -> Tuple:
+        return plant._replace(has_image="Yes" if plant.has_image else "No")
 
     @staticmethod
     def _empty_statistics() -> Dict:
@@ -109,34 +128,3 @@ class ReportGenerator:
             "Family Distribution": {},
             "Report Generated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
-
-    @staticmethod
-    def _extract_ages(plants: List[Tuple]) -> List[float]:
-        """Extract valid ages from plant data"""
-        ages = []
-        for plant in plants:
-            age = plant[4]
-            if age is not None:
-                try:
-                    ages.append(float(age))
-                except ValueError:
-                    continue
-        return ages
-
-    @staticmethod
-    def _calculate_age_statistics(ages: List[float]) -> Dict:
-        """Calculate statistics for plant ages"""
-        if not ages:
-            return {
-                "Average Age": 0,
-                "Median Age": 0,
-                "Youngest": 0,
-                "Oldest": 0
-            }
-        
-        return {
-            "Average Age": round(mean(ages), 1),
-            "Median Age": round(median(ages), 1),
-            "Youngest": min(ages),
-            "Oldest": max(ages)
-        }
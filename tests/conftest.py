@@ -0,0 +1,18 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from database import connection  # noqa: E402
+from database import db_operations as db  # noqa: E402
+
+
+@pytest.fixture
+def catalogue(tmp_path):
+    """A fresh, fully migrated catalogue database for one test"""
+    connection.configure(tmp_path / 'plants.db')
+    db.init_db()
+    yield db
+    connection.close()
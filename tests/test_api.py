@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import pytest
+
+from api.server import CatalogueAPI
+from main import PlantCatalogueApp
+from models.plant import Plant
+
+
+def exchange(raw: bytes, app=None) -> tuple:
+    """Send one raw HTTP request to a CatalogueAPI; returns (status, JSON body)"""
+    async def run() -> bytes:
+        api = CatalogueAPI(app, workers=1)
+        server = await asyncio.start_server(api.handle_connection, '127.0.0.1', 0)
+        try:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(raw)
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), timeout=5)
+            writer.close()
+            return response
+        finally:
+            server.close()
+            api.executor.shutdown()
+
+    head, _, body = asyncio.run(run()).partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body) if body else None
+
+
+@pytest.fixture
+def plant_id(catalogue):
+    return catalogue.add_plants([(Plant('Dionaea muscipula', 'Droseraceae'), None, None)])[0]
+
+
+def test_add_plant_prints_nothing(catalogue, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data').mkdir()
+    body = json.dumps({'name': 'Drosera capensis', 'family': 'Droseraceae'}).encode()
+    status, created = exchange(b"POST /plants HTTP/1.1\r\nConnection: close\r\nContent-Length: %d\r\n\r\n%s"
+                               % (len(body), body), app=PlantCatalogueApp())
+    assert status == 201
+    assert (tmp_path / 'data' / 'qr_codes' / f"plant_{created['id']}_qr.png").exists()
+    assert capsys.readouterr().out == ''
+
+
+def test_water_records_watering(plant_id):
+    status, info = exchange(f"POST /plants/{plant_id}/water HTTP/1.1\r\nConnection: close\r\n\r\n".encode())
+    assert status == 200
+    assert info['days_since_watered'] == 0
+
+
+def test_water_unknown_plant_is_not_found(plant_id):
+    status, body = exchange(b"POST /plants/999/water HTTP/1.1\r\nConnection: close\r\n\r\n")
+    assert status == 404
+    assert 'not found' in body['error']
+
+
+@pytest.mark.parametrize('length', ['abc', '-5', '1.5'])
+def test_malformed_content_length_is_bad_request(catalogue, length):
+    status, body = exchange(f"POST /plants HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+    assert status == 400
+    assert 'Content-Length' in body['error']
+
+
+def test_chunked_body_is_rejected(catalogue):
+    status, body = exchange(b"POST /plants HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+                            b"2\r\n{}\r\n0\r\n\r\nGET /plants HTTP/1.1\r\n\r\n")
+    assert status == 501
+    assert 'Transfer-Encoding' in body['error']
+
+
+@pytest.mark.parametrize('raw, expected', [
+    (b"GET /plants?q=" + b"x" * 100000 + b" HTTP/1.1\r\n\r\n", 414),
+    (b"GET /plants HTTP/1.1\r\nCookie: " + b"x" * 100000 + b"\r\n\r\n", 431),
+])
+def test_oversized_line_is_answered(catalogue, raw, expected):
+    status, _ = exchange(raw)
+    assert status == expected
@@ -0,0 +1,33 @@
+from cli.argument_parser import create_parser
+from main import PlantCatalogueApp
+
+
+def test_run_reports_success(catalogue, capsys):
+    assert PlantCatalogueApp().run(create_parser(), ['list']) == 0
+
+
+def test_run_reports_invalid_arguments(catalogue):
+    parser = create_parser()
+    assert PlantCatalogueApp().run(parser, []) != 0
+    assert PlantCatalogueApp().run(parser, ['add-leaf', '--id', '1', '--date', '2024-13-01']) != 0
+    assert PlantCatalogueApp().run(parser, ['no-such-command']) != 0
+    assert PlantCatalogueApp().run(parser, ['regen-qr', '--workers', '0']) != 0
+    assert PlantCatalogueApp().run(parser, ['import-plants', 'plants.csv', '--workers', '-1']) != 0
+
+
+def test_run_reports_handler_errors(catalogue, monkeypatch, tmp_path):
+    def fail(self, args):
+        raise RuntimeError("boom")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(PlantCatalogueApp, 'list_plants', fail)
+    assert PlantCatalogueApp().run(create_parser(), ['list']) == 1
+
+
+def test_run_reports_failed_commands(catalogue, monkeypatch, capsys):
+    monkeypatch.setattr(catalogue, 'update_last_watered', lambda plant_id: False)
+    parser = create_parser()
+    assert PlantCatalogueApp().run(parser, ['water', '--id', '999']) == 1
+    assert PlantCatalogueApp().run(parser, ['add-leaf', '--id', '999']) == 1
+    assert PlantCatalogueApp().run(parser, ['edit-plant', '--id', '999', '--name', 'Fern']) == 1
+    assert "Failed to" in capsys.readouterr().out
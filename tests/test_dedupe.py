@@ -0,0 +1,38 @@
+import os
+
+from database.queries import GET_FREELIST_COUNT, INSERT_IMAGE, INSERT_PLANT
+from models.plant import Plant
+
+
+def store_copies(db, data: bytes, copies: int) -> None:
+    """One image row per plant, as add_plant stored them before deduplication"""
+    content_hash = db._content_hash(data)
+    with db.transaction(immediate=True) as conn:
+        for i in range(copies):
+            image_id = conn.execute(INSERT_IMAGE, (data, len(data), content_hash)).lastrowid
+            plant = Plant(f"Drosera {i}", 'Droseraceae', image_mime_type='image/jpeg')
+            conn.execute(INSERT_PLANT, db._plant_params(plant, db.StoredImage(image_id, len(data), content_hash)))
+
+
+def free_pages(db) -> int:
+    return db._execute_query(GET_FREELIST_COUNT, fetch=True)[0].pages
+
+
+def test_rerun_vacuums_pages_left_by_no_vacuum(catalogue):
+    store_copies(catalogue, os.urandom(64 * 1024), 5)
+
+    kept = catalogue.dedupe_images(vacuum=False)
+    assert kept.duplicates == 4 and kept.size_after >= kept.size_before
+    assert free_pages(catalogue) > 0
+
+    rerun = catalogue.dedupe_images()
+    assert rerun.duplicates == 0
+    assert rerun.size_after < rerun.size_before - 4 * 64 * 1024 * 0.9
+    assert free_pages(catalogue) == 0
+
+
+def test_vacuum_is_skipped_without_free_pages(catalogue):
+    store_copies(catalogue, os.urandom(1024), 1)
+    result = catalogue.dedupe_images()
+    assert result.duplicates == 0
+    assert result.size_after == result.size_before
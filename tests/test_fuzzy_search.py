@@ -0,0 +1,35 @@
+import sqlite3
+import threading
+import time
+
+from models.plant import Plant
+
+
+def test_stale_index_rebuild_waits_for_a_concurrent_writer(catalogue, tmp_path):
+    catalogue.add_plants([(Plant('Dionaea muscipula', 'Droseraceae'), None, None)])
+
+    # Another process is in the middle of a write when the search rebuilds the index
+    writer = sqlite3.connect(tmp_path / 'plants.db', isolation_level=None, check_same_thread=False)
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("INSERT INTO plants (name, family) VALUES ('Drosera capensis', 'Droseraceae')")
+
+    def commit_later():
+        time.sleep(0.3)
+        writer.execute("COMMIT")
+
+    thread = threading.Thread(target=commit_later)
+    thread.start()
+    try:
+        rows = catalogue.fuzzy_search_plants('Droserra capensys', ('id', 'name')).plants
+    finally:
+        thread.join()
+        writer.close()
+    assert [row.name for row in rows][:1] == ['Drosera capensis']
+
+
+def test_exceeded_budget_is_reported_to_the_caller(catalogue, monkeypatch, capsys):
+    catalogue.add_plants([(Plant(f"Drosera {i}", 'Droseraceae'), None, None) for i in range(200)])
+    monkeypatch.setattr(catalogue, 'FUZZY_BUDGET_MS', -1000)
+
+    assert catalogue.fuzzy_search_plants('Droserra') == ([], True)
+    assert capsys.readouterr().out == ''
@@ -0,0 +1,115 @@
+import threading
+import time
+
+import pytest
+
+from models.plant_batch import PlantBatch
+from utils.gallery import NO_THUMBNAIL, Gallery, LRUCache, ThumbnailLoader
+
+
+def wait_until(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def batch(has_image) -> PlantBatch:
+    plants = PlantBatch()
+    for plant_id, image in enumerate(has_image, start=1):
+        plants.append(plant_id, f"Plant {plant_id}", 'Droseraceae', image, None)
+    return plants
+
+
+@pytest.fixture
+def closing():
+    """Close the loaders a test starts, even when it fails"""
+    opened = []
+    yield opened.append
+    for owner in opened:
+        owner.close()
+
+
+def test_lru_cache_drops_least_recently_used():
+    cache = LRUCache(2)
+    cache.put(1, 'a')
+    cache.put(2, 'b')
+    assert cache.get(1) == 'a'
+    cache.put(3, 'c')
+    assert 2 not in cache
+    assert (cache.get(1), cache.get(3), len(cache)) == ('a', 'c', 2)
+
+
+def test_loader_drops_requests_replaced_before_their_turn(closing):
+    started, release = threading.Event(), threading.Event()
+    fetched = []
+
+    def fetch(plant_id):
+        fetched.append(plant_id)
+        if plant_id == 1:
+            started.set()
+            release.wait(5)
+        return f"thumb {plant_id}"
+
+    loader = ThumbnailLoader(fetch)
+    closing(loader)
+    loader.show([1, 2, 3])
+    assert started.wait(5)
+    # Scrolled on while plant 1 was loading: 2 and 3 are no longer wanted
+    loader.show([7, 8])
+    release.set()
+
+    done = []
+    wait_until(lambda: done.extend(loader.drain()) or len(done) == 3)
+    assert fetched == [1, 7, 8]
+    assert done == [(1, 'thumb 1'), (7, 'thumb 7'), (8, 'thumb 8')]
+
+
+def test_loader_reports_failed_fetches_as_none(closing):
+    def fetch(plant_id):
+        raise OSError("unreadable")
+
+    loader = ThumbnailLoader(fetch)
+    closing(loader)
+    loader.show([5])
+    done = []
+    wait_until(lambda: done.extend(loader.drain()) or done)
+    assert done == [(5, None)]
+
+
+def test_gallery_loads_visible_plants_with_images_only(closing):
+    requested = []
+
+    def fetch(plant_id):
+        requested.append(plant_id)
+        return None if plant_id == 4 else f"thumb {plant_id}"
+
+    gallery = Gallery(batch([1, 0, 1, 1, 1, 1]), fetch, make_image=str.upper)
+    closing(gallery)
+    gallery.set_visible(0, 4)
+    wait_until(lambda: gallery.poll() or len(gallery.cache) == 3)
+
+    assert sorted(requested) == [1, 3, 4]
+    assert [gallery.thumbnail(i) for i in range(4)] == ['THUMB 1', None, 'THUMB 3', None]
+    # Plant 4's fetch failed: cached as NO_THUMBNAIL, so it is neither loading nor retried
+    assert gallery.cache.get(4) is NO_THUMBNAIL
+    assert not any(gallery.is_loading(i) for i in range(4))
+    assert gallery.is_loading(4) and gallery.is_loading(5)
+
+    gallery.set_visible(2, 6)
+    wait_until(lambda: gallery.poll() or len(gallery.cache) == 5)
+    assert sorted(requested) == [1, 3, 4, 5, 6]
+    assert not gallery.poll()
+
+
+def test_gallery_cache_stays_bounded_but_holds_a_screen(closing):
+    gallery = Gallery(batch([1] * 50), lambda plant_id: plant_id, cache_size=4)
+    closing(gallery)
+    for first in range(0, 50, 5):
+        gallery.set_visible(first, first + 5)
+        wait_until(lambda: gallery.poll() or not any(gallery.is_loading(i) for i in range(first, first + 5)))
+        assert len(gallery.cache) <= gallery.cache.maxsize
+        assert [gallery.thumbnail(i) for i in range(first, first + 5)] == list(range(first + 1, first + 6))
+    # Raised to twice the visible cells, and no further
+    assert gallery.cache.maxsize == 10
+    assert len(gallery.cache) == 10
@@ -0,0 +1,14 @@
+import pytest
+
+from utils.image_handler import ImageSettings
+
+
+@pytest.mark.parametrize('size, rendition', [(32, 64), (64, 64), (100, 256), (300, None), (800, None)])
+def test_rendition_size_picks_the_smallest_covering_derivative(size, rendition):
+    assert ImageSettings().rendition_size(size) == rendition
+
+
+def test_rendition_size_skips_sizes_originals_already_fit():
+    settings = ImageSettings(max_size=800, derivative_sizes=(64, 256, 800, 1200))
+    assert settings.rendition_size(500) is None
+    assert settings.rendition_size(800) is None
@@ -0,0 +1,68 @@
+import math
+import statistics
+from datetime import datetime
+
+import pytest
+
+from database.queries import EXPORT_LEAF_STATISTICS, GET_LEAF_RECORDS
+from models.plant import Plant
+
+# Leaf dates per plant: midnight dates (add-leaf --date), timestamps with
+# microseconds, a back-dated record, a single leaf and none at all
+LEAVES = {
+    'Dionaea': ['2024-01-01T00:00:00', '2024-01-11T08:30:00.250000', '2024-02-01T00:00:00',
+                '2024-01-05T23:59:59.999999'],
+    'Drosera': ['2024-03-01T12:00:00', '2024-03-04T06:00:00', '2024-03-10T18:00:00.000001'],
+    'Nepenthes': ['2024-05-05T00:00:00'],
+    'Sarracenia': [],
+}
+
+
+@pytest.fixture
+def plant_ids(catalogue):
+    """Plant ID by name, with the LEAVES recorded in the order listed"""
+    plant_ids = catalogue.add_plants([(Plant(name, 'Carnivores'), None, None) for name in LEAVES])
+    for plant_id, dates in zip(plant_ids, LEAVES.values()):
+        for date in dates:
+            assert catalogue.add_leaf_record(plant_id, datetime.fromisoformat(date))
+    return dict(zip(LEAVES, plant_ids))
+
+
+def test_export_matches_per_plant_statistics(catalogue, plant_ids):
+    rows = catalogue._execute_query(EXPORT_LEAF_STATISTICS, fetch=True)
+    assert [row.name for row in rows] == list(LEAVES)
+    for row in rows:
+        records = catalogue._execute_query(GET_LEAF_RECORDS, (row.id,), fetch=True) or []
+        expected = Plant(row.name, 'Carnivores',
+                         leaf_records=[datetime.fromisoformat(record[0]) for record in records])
+        assert Plant.leaf_statistics_from_totals(row.total_leaves, row.gap_days, row.last_leaf_date) == \
+            expected.calculate_leaf_statistics()
+
+
+def test_numpy_engine_matches_per_plant_statistics(catalogue, plant_ids):
+    batch = catalogue.get_all_leaf_statistics(datetime.now())
+
+    # Plants without leaves have no row
+    assert batch.index_of(plant_ids['Sarracenia']) is None
+    assert sorted(batch.plant_ids.tolist()) == sorted(plant_ids[name] for name, dates in LEAVES.items() if dates)
+    for name, dates in LEAVES.items():
+        if not dates:
+            continue
+        i = batch.index_of(plant_ids[name])
+        leaves = sorted(datetime.fromisoformat(date) for date in dates)
+        expected = Plant(name, 'Carnivores', leaf_records=leaves).calculate_leaf_statistics()
+        intervals = [(later - earlier).days for earlier, later in zip(leaves, leaves[1:])]
+
+        assert batch.total_leaves[i] == expected['total_leaves']
+        assert batch.days_since_last_leaf[i] == expected['days_since_last_leaf']
+        if expected['avg_days_between_leaves'] is None:
+            assert math.isnan(batch.mean_gap_days[i]) and math.isnan(batch.median_gap_days[i])
+        else:
+            assert batch.mean_gap_days[i] == pytest.approx(expected['avg_days_between_leaves'])
+            assert batch.median_gap_days[i] == statistics.median(intervals)
+
+
+def test_numpy_engine_without_leaf_records(catalogue):
+    catalogue.add_plants([(Plant('Sarracenia', 'Carnivores'), None, None)])
+    batch = catalogue.get_all_leaf_statistics()
+    assert len(batch.plant_ids) == len(batch.total_leaves) == len(batch.median_gap_days) == 0
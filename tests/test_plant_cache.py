@@ -0,0 +1,44 @@
+import sqlite3
+
+import pytest
+
+from models.plant import Plant
+
+LABEL = ('name', 'family')
+
+
+def test_own_writes_invalidate_immediately(catalogue):
+    plant_id, = catalogue.add_plants([(Plant('Drosera capensis', 'Droseraceae'), None, None)])
+    assert catalogue.get_plant_by_id(plant_id, LABEL).name == 'Drosera capensis'
+
+    assert catalogue.edit_plant(plant_id, name='Drosera aliciae')
+    assert catalogue.get_plant_by_id(plant_id, LABEL).name == 'Drosera aliciae'
+
+
+def test_other_process_writes_are_seen_after_refresh(catalogue, tmp_path):
+    plant_id, = catalogue.add_plants([(Plant('Drosera capensis', 'Droseraceae'), None, None)])
+    catalogue.refresh_plant_cache()
+    assert catalogue.get_plant_by_id(plant_id, LABEL).name == 'Drosera capensis'
+
+    other = sqlite3.connect(tmp_path / 'plants.db')
+    with other:
+        other.execute("UPDATE plants SET name = 'Drosera aliciae' WHERE id = ?", (plant_id,))
+    other.close()
+
+    # Lookups within one command trust the cache; the next command sees the write
+    hits = catalogue.get_cache_stats()['hits']
+    assert catalogue.get_plant_by_id(plant_id, LABEL).name == 'Drosera capensis'
+    assert catalogue.get_cache_stats()['hits'] == hits + 1
+    catalogue.refresh_plant_cache()
+    assert catalogue.get_plant_by_id(plant_id, LABEL).name == 'Drosera aliciae'
+
+
+def test_transactions_bypass_the_cache(catalogue):
+    plant_id, = catalogue.add_plants([(Plant('Drosera capensis', 'Droseraceae'), None, None)])
+    assert catalogue.get_plant_by_id(plant_id, LABEL).name == 'Drosera capensis'
+
+    with pytest.raises(KeyboardInterrupt), catalogue.transaction() as conn:
+        conn.execute("UPDATE plants SET name = 'Drosera aliciae' WHERE id = ?", (plant_id,))
+        assert catalogue.get_plant_by_id(plant_id, LABEL).name == 'Drosera aliciae'
+        raise KeyboardInterrupt
+    assert catalogue.get_plant_by_id(plant_id, LABEL).name == 'Drosera capensis'
@@ -0,0 +1,36 @@
+import logging
+from datetime import datetime
+
+import pytest
+
+from models.plant import Plant
+
+
+def test_dates_are_parsed_on_first_read():
+    plant = Plant.from_db_row((7, 'Drosera capensis', 'Droseraceae', 0, None, '2024-03-01T00:00:00',
+                               '2024-03-02 10:15:00', None, '2024-04-01T08:00:00'))
+    assert plant.birthdate == datetime(2024, 3, 1)
+    assert plant.created_at == datetime(2024, 3, 2, 10, 15)
+    assert plant.last_leaf_date is None
+    assert plant.last_watered == datetime(2024, 4, 1, 8)
+
+
+def test_malformed_stored_date_is_logged(caplog):
+    plant = Plant.from_db_row((7, 'Drosera capensis', 'Droseraceae', 0, None, '01/03/2024', None, None, 'soon'))
+
+    with caplog.at_level(logging.ERROR, logger='models.plant'):
+        assert plant.birthdate is None
+        assert plant.last_watered is None
+        # Logged once, when the text is first parsed
+        assert plant.birthdate is None
+    assert [record.getMessage() for record in caplog.records] == [
+        "Plant 7: malformed birthdate '01/03/2024', read as no date",
+        "Plant 7: malformed last_watered 'soon', read as no date",
+    ]
+
+
+def test_plants_compare_by_value_and_are_unhashable():
+    assert Plant('Drosera capensis', 'Droseraceae', '2024-03-01') == \
+        Plant('Drosera capensis', 'Droseraceae', datetime(2024, 3, 1))
+    with pytest.raises(TypeError):
+        hash(Plant('Drosera capensis', 'Droseraceae'))
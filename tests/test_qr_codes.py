@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+from models.plant import Plant
+
+
+@pytest.fixture
+def qr_dir(catalogue, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data').mkdir()
+    return tmp_path / 'data' / 'qr_codes'
+
+
+def test_add_plant_records_its_code_in_the_database(catalogue, qr_dir):
+    plant_id = catalogue.add_plant(Plant('Drosera capensis', 'Droseraceae'))
+
+    qr_path = qr_dir / f"plant_{plant_id}_qr.png"
+    assert catalogue.get_qr_codes()[plant_id][1] == qr_path.stat().st_mtime
+    assert not list(qr_dir.glob('*.json'))
+
+
+def test_sync_renders_only_missing_or_changed_codes(catalogue, qr_dir):
+    from utils.qr_handler import QRHandler
+
+    plant_ids = catalogue.add_plants([(Plant(f"Drosera {i}", 'Droseraceae'), None, None) for i in range(3)])
+    assert QRHandler().sync_qr_codes(plant_ids, workers=1) == plant_ids
+    assert QRHandler().sync_qr_codes(plant_ids, workers=1) == []
+
+    # A file edited since it was recorded, and one deleted
+    qr_path = qr_dir / f"plant_{plant_ids[0]}_qr.png"
+    os.utime(qr_path, (0, 0))
+    (qr_dir / f"plant_{plant_ids[2]}_qr.png").unlink()
+    assert QRHandler().sync_qr_codes(plant_ids, workers=1) == [plant_ids[0], plant_ids[2]]
+    assert QRHandler().sync_qr_codes(plant_ids, force=True, workers=1) == plant_ids
@@ -0,0 +1,76 @@
+"""Every query in `database/queries.py` uses an index, unless it is exempted
+
+Runs `EXPLAIN QUERY PLAN` for each SELECT/INSERT/UPDATE/DELETE constant, and
+for the WHEN clause and every statement of each CREATE_*_TRIGGER constant
+(with the NEW/OLD columns bound as parameters), against a freshly migrated
+database. A `SCAN <table>` without an index, or a temp B-tree for ORDER BY,
+fails the query's test unless FULL_SCAN_ALLOWED gives the reason next to
+the query.
+"""
+import re
+import sqlite3
+
+import pytest
+
+from database import queries
+from database.migrations import apply_migrations
+
+# Migration steps that only run against an older schema than the current one
+OLDER_SCHEMA_ONLY = {'MOVE_PLANT_IMAGES', 'LINK_MOVED_PLANT_IMAGES', 'CLEAR_PLANT_IMAGE_DATA'}
+
+DML = re.compile(r'^\s*(WITH|SELECT|INSERT|UPDATE|DELETE)\b', re.IGNORECASE)
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+TRIGGER = re.compile(r'\bCREATE TRIGGER\b.*?(?:\bWHEN\b(?P<when>.*?))?\bBEGIN\b(?P<body>.*)\bEND\s*$',
+                     re.IGNORECASE | re.DOTALL)
+ROW_COLUMN = re.compile(r'\b(?:NEW|OLD)\.\w+\b')
+
+
+def trigger_statements(sql: str) -> list:
+    """The WHEN clause (as a SELECT) and body statements of a trigger, NEW/OLD columns as `?`"""
+    trigger = TRIGGER.search(sql)
+    statements = [f"SELECT {trigger.group('when')}"] if trigger.group('when') else []
+    statements += [statement for statement in trigger.group('body').split(';') if statement.strip()]
+    return [ROW_COLUMN.sub('?', statement) for statement in statements]
+
+
+# name -> the statements to explain
+QUERIES = {
+    name: [value] for name, value in vars(queries).items()
+    if name.isupper() and isinstance(value, str) and DML.match(value) and name not in OLDER_SCHEMA_ONLY
+}
+QUERIES.update(
+    (name, trigger_statements(value)) for name, value in vars(queries).items()
+    if name.startswith('CREATE_') and name.endswith('_TRIGGER')
+)
+
+
+@pytest.fixture(scope='module')
+def conn(tmp_path_factory):
+    conn = sqlite3.connect(tmp_path_factory.mktemp('plans') / 'plants.db', isolation_level=None)
+    apply_migrations(conn)
+    yield conn
+    conn.close()
+
+
+def plan_problems(conn: sqlite3.Connection, sql: str) -> list:
+    """The plan lines that scan a table or sort in a temp B-tree"""
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    params = (None,) * sql.count('?')
+    problems = []
+    for _, _, _, detail in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params):
+        scan = FULL_SCAN.match(detail)
+        if (scan and scan.group(1) in tables) or detail.startswith('USE TEMP B-TREE FOR ORDER BY'):
+            problems.append(detail)
+    return problems
+
+
+@pytest.mark.parametrize('name', sorted(set(QUERIES) - set(queries.FULL_SCAN_ALLOWED)))
+def test_query_uses_an_index(conn, name):
+    assert [problem for sql in QUERIES[name] for problem in plan_problems(conn, sql)] == []
+
+
+@pytest.mark.parametrize('name', sorted(queries.FULL_SCAN_ALLOWED))
+def test_full_scan_exemption_is_still_needed(conn, name):
+    assert name in QUERIES
+    assert any(plan_problems(conn, sql) for sql in QUERIES[name]), \
+        f"{name} uses an index now; drop its FULL_SCAN_ALLOWED entry"
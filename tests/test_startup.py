@@ -0,0 +1,56 @@
+"""Commands start without loading heavy dependencies they do not use
+
+Runs commands in a fresh interpreter under `-X importtime` and fails if a
+module of OpenCV, Tk, Pillow, qrcode or NumPy was imported that the command
+does not need: `water` and `list` need none of them, `migrate` renders QR
+codes with qrcode and Pillow. benchmarks/bench_startup.py measures how long
+the imports take.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from models.plant import Plant
+
+SRC = Path(__file__).resolve().parent.parent / 'src'
+
+HEAVY_MODULES = {'cv2', 'tkinter', 'PIL', 'qrcode', 'numpy'}
+
+CONFIG = '''[database]
+path = plants.db
+
+[images]
+storage_path = images
+
+[reports]
+output_dir = reports
+'''
+
+
+def imported_modules(command: list, cwd: Path) -> set:
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', str(SRC / 'main.py'), *command],
+        cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'},
+    )
+    return {
+        line.split('|')[2].strip() for line in result.stderr.splitlines()
+        if line.startswith('import time:') and 'cumulative' not in line
+    }
+
+
+@pytest.mark.parametrize('command, needed', [
+    (['water', '--id', '1'], set()),
+    (['list', '--page-size', '50'], set()),
+    (['migrate'], {'qrcode', 'PIL'}),
+], ids=lambda param: param[0] if isinstance(param, list) else '')
+def test_command_skips_heavy_imports(catalogue, tmp_path, command, needed):
+    (tmp_path / 'config.ini').write_text(CONFIG)
+    catalogue.add_plants([(Plant('Drosera capensis', 'Droseraceae'), None, None)])
+
+    modules = imported_modules(command, tmp_path)
+    assert 'database.db_operations' in modules
+    assert {module.split('.')[0] for module in modules} & HEAVY_MODULES <= needed